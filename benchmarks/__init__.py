@@ -0,0 +1 @@
+"""Benchmarks dos scripts de dados (rodar da raiz: python -m benchmarks.<nome>)."""
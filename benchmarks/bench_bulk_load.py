@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: tempo de CARGA do migration.sql (legado x --bulk x --copy).
+
+Gera os scripts a partir de um workbook sintético e carrega cada um num
+banco vazio: SQLite em memória (padrão) ou Postgres local (--dsn, precisa de
+psycopg2; as tabelas são criadas num schema temporário e removidas no fim).
+No SQLite o --copy é simulado com executemany das linhas já resolvidas.
+
+Uso:
+    python -m benchmarks.bench_bulk_load [--courses 10] [--dsn postgresql://localhost/horarios]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.synthetic import write_workbook
+from catalog_schema import row_counts, schema_sql
+from migration import build_sql
+from migration_bulk import build_bulk_sql
+from migration_copy import COLUMNS, copy_value, resolve_tables
+from workbook import Workbook
+
+
+def load_sqlite(script):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(schema_sql("sqlite"))
+    t0 = time.perf_counter()
+    conn.executescript(script)
+    elapsed = time.perf_counter() - t0
+    counts = row_counts(conn)
+    conn.close()
+    return elapsed, counts
+
+
+def load_sqlite_rows(tables):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(schema_sql("sqlite"))
+    t0 = time.perf_counter()
+    for table, columns in COLUMNS.items():
+        marks = ", ".join("?" for _ in columns)
+        conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({marks})", tables[table])
+    conn.commit()
+    elapsed = time.perf_counter() - t0
+    counts = row_counts(conn)
+    conn.close()
+    return elapsed, counts
+
+
+def load_postgres_copy(tables, dsn):
+    import io
+
+    import psycopg2
+
+    schema = f"bench_{os.getpid()}"
+    conn = psycopg2.connect(dsn)
+    try:
+        cur = conn.cursor()
+        cur.execute(f"CREATE SCHEMA {schema}; SET search_path TO {schema};")
+        cur.execute(schema_sql("postgres"))
+        conn.commit()
+        t0 = time.perf_counter()
+        for table, columns in COLUMNS.items():
+            payload = "".join("\t".join(copy_value(v) for v in row) + "\n" for row in tables[table])
+            cur.copy_from(io.StringIO(payload), table, columns=columns)
+        conn.commit()
+        elapsed = time.perf_counter() - t0
+        counts = row_counts(conn)
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.commit()
+    finally:
+        conn.close()
+    return elapsed, counts
+
+
+def load_postgres(script, dsn):
+    import psycopg2
+
+    schema = f"bench_{os.getpid()}"
+    conn = psycopg2.connect(dsn)
+    try:
+        cur = conn.cursor()
+        cur.execute(f"CREATE SCHEMA {schema}; SET search_path TO {schema};")
+        cur.execute(schema_sql("postgres"))
+        conn.commit()
+        t0 = time.perf_counter()
+        cur.execute(script)
+        conn.commit()
+        elapsed = time.perf_counter() - t0
+        counts = row_counts(conn)
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.commit()
+    finally:
+        conn.close()
+    return elapsed, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=10)
+    parser.add_argument("--dsn", help="Postgres local (senão usa SQLite em memória)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "Horarios.xlsx")
+        sheets = write_workbook(path, courses=args.courses)
+        with Workbook(path, subject_sheets=sheets) as book:
+            scripts = [
+                ("legado", build_sql(book)),
+                ("--bulk", build_bulk_sql(book)),
+            ]
+            tables = resolve_tables(book)
+
+    target = "Postgres" if args.dsn else "SQLite (memória)"
+    print(f"📊 {args.courses} cursos sintéticos → {target}")
+
+    results = []
+    for label, sql in scripts:
+        statements = sum(1 for line in sql if line.rstrip().endswith(";"))
+        script = "\n".join(sql)
+        if args.dsn:
+            elapsed, counts = load_postgres(script, args.dsn)
+        else:
+            elapsed, counts = load_sqlite(script)
+        results.append(counts)
+        print(f"  {label:<8} {elapsed:8.3f}s  ~{statements} statements  {counts}")
+
+    if args.dsn:
+        elapsed, counts = load_postgres_copy(tables, args.dsn)
+    else:
+        elapsed, counts = load_sqlite_rows(tables)
+    results.append(counts)
+    print(f"  {'--copy':<8} {elapsed:8.3f}s  {len(COLUMNS)} COPYs  {counts}")
+
+    if any(counts != results[0] for counts in results[1:]):
+        print("❌ As cargas produziram contagens diferentes!")
+    else:
+        print(f"✅ Mesmo resultado ({results[0]['classes']} turmas)")
+
+
+if __name__ == '__main__':
+    main()
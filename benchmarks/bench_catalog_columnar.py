@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: catálogo colunar (Arrow IPC / Parquet) e snapshot binário x JSON.
+
+Usa o src/model/db_mat.json se existir (ou --input), senão disciplinas
+sintéticas no mesmo formato. Para cada formato mede:
+- escrita do catálogo normalizado (_ho em pares)
+- leitura completa (json.load x memory map / decode Parquet / abrir o .snap)
+- leitura de uma coluna só (_ho), o acesso típico dos scripts
+- tamanho em disco
+
+Uso:
+    python -m benchmarks.bench_catalog_columnar [--subjects 20000] [--input src/model/db_mat.json]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import catalog_columnar as cc
+import catalog_snapshot
+from benchmarks.synthetic import db_mat_subjects
+
+DB_MAT = "src/model/db_mat.json"
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - t0, result
+
+
+def json_read_column(path, column):
+    with open(path, "r", encoding="utf-8") as f:
+        return [s.get(column) for s in json.load(f)]
+
+
+def sorted_pairs(pairs):
+    return [list(p) for p in sorted(set(map(tuple, pairs)))]
+
+
+def snapshot_read_column(path):
+    with catalog_snapshot.CatalogSnapshot(path) as snap:
+        return [snap.ho_mask(i) for i in range(len(snap))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subjects", type=int, default=20000)
+    parser.add_argument("--input", default=DB_MAT if os.path.exists(DB_MAT) else None,
+                        help="db_mat.json real (padrão: src/model/db_mat.json, se existir)")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        print(f"{args.input}: {len(raw)} disciplinas")
+    else:
+        raw = db_mat_subjects(args.subjects)
+        print(f"sintético: {len(raw)} disciplinas (db_mat.json não encontrado)")
+
+    t_norm, subjects = timed(lambda: [cc.normalize_subject(s) for s in raw])
+    print(f"normalização (_ho matriz -> pares): {t_norm:.3f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "db.json")
+        paths = {fmt: os.path.join(tmp, f"catalog{ext}") for ext, fmt in
+                 ((".arrow", "arrow"), (".parquet", "parquet"))}
+
+        print(f"\n{'formato':<10} {'escrita':>9} {'leitura':>9} {'coluna _ho':>11} {'tamanho':>10}")
+
+        t_write, _ = timed(cc.write_json, json_path, subjects)
+        t_read, _ = timed(lambda: json.load(open(json_path, encoding="utf-8")))
+        t_col, _ = timed(json_read_column, json_path, "_ho")
+        print(f"{'json':<10} {t_write:>8.3f}s {t_read:>8.3f}s {t_col:>10.3f}s "
+              f"{os.path.getsize(json_path) / 1024:>8.0f}KB")
+
+        table = cc.to_table(subjects)
+        for fmt, path in paths.items():
+            t_write, _ = timed(cc.write_catalog, path, table)
+            t_read, read = timed(cc.read_catalog, path)
+            t_col, _ = timed(cc.read_catalog, path, ["_ho"])
+            assert read.num_rows == len(subjects)
+            print(f"{fmt:<10} {t_write:>8.3f}s {t_read:>8.3f}s {t_col:>10.3f}s "
+                  f"{os.path.getsize(path) / 1024:>8.0f}KB")
+
+        snap_path = os.path.join(tmp, "catalog.snap")
+        t_write, _ = timed(catalog_snapshot.write_snapshot, snap_path, subjects)
+        t_read, snap = timed(catalog_snapshot.CatalogSnapshot, snap_path)
+        assert len(snap) == len(subjects)
+        snap.close()
+        t_col, _ = timed(snapshot_read_column, snap_path)
+        print(f"{'snapshot':<10} {t_write:>8.3f}s {t_read:>8.3f}s {t_col:>10.3f}s "
+              f"{os.path.getsize(snap_path) / 1024:>8.0f}KB  (coluna _ho como máscaras)")
+
+        # ida e volta sem perdas
+        back = list(cc.read_subjects(paths["arrow"]))
+        expected = [{k: s[k] for k in cc.FIELDS} for s in subjects]
+        print(f"\nida e volta arrow -> dicts: {'ok' if back == expected else 'DIFERENTE'}")
+        t_dicts, _ = timed(lambda: list(cc.read_subjects(paths["arrow"])))
+        print(f"arrow -> dicts (todas as linhas): {t_dicts:.3f}s")
+
+        # o snapshot devolve _ho/_ha como pares ordenados e sem repetição
+        back = list(catalog_snapshot.read_subjects(snap_path))
+        expected = [{**s, "_ho": sorted_pairs(s["_ho"]), "_ha": sorted_pairs(s["_ha"])} for s in expected]
+        print(f"ida e volta snapshot -> dicts: {'ok' if back == expected else 'DIFERENTE'}")
+        t_dicts, _ = timed(lambda: list(catalog_snapshot.read_subjects(snap_path)))
+        print(f"snapshot -> dicts (todas as linhas): {t_dicts:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
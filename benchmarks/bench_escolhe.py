@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do escolhe.py (port do Escolhe.exc) contra um port literal do JS.
+
+O port literal percorre os 2**n subconjuntos como strings binárias, igual ao
+exc() do navegador, e serve de referência: para n pequeno as duas versões
+precisam devolver exatamente o mesmo ranking.
+
+Também compara o top-K do ranking.py com a ordenação completa.
+
+Uso:
+    python -m benchmarks.bench_escolhe [--check 4 8 12 16] [--sizes 20 25 30] [-k 10]
+"""
+
+import argparse
+import functools
+import random
+import time
+
+from escolhe import Escolhe, raw_ho
+from ranking import iter_ranked
+
+
+def synthetic_subjects(n, seed=0, days=5, hours=12, other_course=0.1):
+    """Disciplinas no formato do db.json (_re, _ho em pares, _el, course_id)."""
+    rng = random.Random(seed)
+    subjects = []
+    for i in range(n):
+        start = rng.randrange(hours - 1)
+        ho = [[d, h] for d in rng.sample(range(days), 2) for h in (start, start + 1)]
+        subjects.append({
+            "_re": f"S{i:03d}" if rng.random() > 0.05 else f"S{max(0, i - 1):03d}",
+            "_di": f"Disciplina {i}",
+            "_se": 1 + i // 6,
+            "_el": rng.random() < 0.3,
+            "_ho": ho,
+            "course_id": 2 if rng.random() < other_course else 1,
+        })
+    weights = {s["_re"]: rng.randint(0, 6) for s in subjects}
+    return subjects, weights
+
+
+class LiteralEscolhe:
+    """Tradução direta do Escolhe.js (exc/compare/existe/semColisao)."""
+
+    def __init__(self, genesis, weights, main_course_id=None, seed_indices=()):
+        self.genesis = [dict(s, _grid=[f"{d}:{h}" for d, h in raw_ho(s)]) for s in genesis]
+        self.weights = weights
+        self.main_course_id = main_course_id
+        self.seed_indices = set(seed_indices)
+
+    def sem_colisao(self, a, b):
+        other = lambda s: s.get("course_id") and self.main_course_id and s.get("course_id") != self.main_course_id
+        if other(a) or other(b):
+            return True
+        small, large = (a, b) if len(a["_grid"]) < len(b["_grid"]) else (b, a)
+        return not any(slot in large["_grid"] for slot in small["_grid"])
+
+    def compare(self, a, b):
+        max_w = lambda arr: max([0] + [self.weights.get(s["_re"], 0) for s in arr])
+        if max_w(a) != max_w(b):
+            return max_w(b) - max_w(a)
+        if len(a) != len(b):
+            return len(b) - len(a)
+        sum_w = lambda arr: sum(self.weights.get(s["_re"], 0) for s in arr)
+        return sum_w(b) - sum_w(a)
+
+    def exc(self):
+        n = len(self.genesis)
+        aux = []
+        i = 2 ** n - 1
+        while i > 0:
+            f = format(i, "b").zfill(n)
+            i -= 1
+            if any(f[s] != "1" for s in self.seed_indices):
+                continue
+            if f.count("1") >= 9:
+                continue
+            indices, subjects, valid = [], [], True
+            for j in range(n):
+                if f[j] == "1":
+                    if any(not self.sem_colisao(self.genesis[p], self.genesis[j]) for p in indices):
+                        valid = False
+                        break
+                    if any(s["_re"] == self.genesis[j]["_re"] for s in subjects):
+                        valid = False
+                        break
+                    indices.append(j)
+                    subjects.append(self.genesis[j])
+            if valid:
+                aux.append(subjects)
+        return sorted(aux, key=functools.cmp_to_key(self.compare))
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", type=int, nargs="+", default=[4, 8, 12, 16])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 25, 30])
+    parser.add_argument("-k", type=int, default=10, help="top-K do ranking.py")
+    args = parser.parse_args()
+
+    print("🔍 Conferindo ranking contra o port literal do JS")
+    for n in args.check:
+        for seed in range(3):
+            subjects, weights = synthetic_subjects(n, seed)
+            seeds = {seed % n} if seed else set()
+            lit_t, expected = timed(lambda: LiteralEscolhe(subjects, weights, 1, seeds).exc())
+            new_t, got = timed(lambda: Escolhe(subjects, weights, 1, seeds).exc())
+            same = [[s["_re"] + s["_di"] for s in g] for g in expected] == \
+                   [[s["_re"] + s["_di"] for s in g] for g in got]
+            status = "✅" if same else "❌"
+            print(f"  {status} n={n:<3} seed={seed} {len(got):>7} grades  literal {lit_t:7.3f}s  novo {new_t:7.3f}s")
+            if not same:
+                raise SystemExit(1)
+
+    print("\n⏱️  Escala (literal só até n=20)")
+    for n in args.sizes:
+        subjects, weights = synthetic_subjects(n)
+        new_t, got = timed(lambda: Escolhe(subjects, weights, 1).exc())
+        line = f"  n={n:<3} {len(got):>9} grades  novo {new_t:8.3f}s"
+        if n <= 20:
+            lit_t, _ = timed(lambda: LiteralEscolhe(subjects, weights, 1).exc())
+            line += f"  literal {lit_t:8.3f}s ({lit_t / new_t:.0f}x)"
+        else:
+            line += f"  literal ~{2 ** n:,} iterações"
+        print(line)
+
+    print(f"\n🏆 Top-{args.k} (ranking.py, branch-and-bound) vs ordenar tudo")
+    for n in args.sizes + [45, 60]:
+        subjects, weights = synthetic_subjects(n)
+        escolhe = Escolhe(subjects, weights, 1)
+        top_t, top = timed(lambda: list(iter_ranked(escolhe, args.k)))
+        line = f"  n={n:<3} top-{args.k} {top_t:8.3f}s"
+        if n <= max(args.sizes):
+            full_t, full = timed(escolhe.ranked)
+            if full[:args.k] != top:
+                raise SystemExit(f"❌ top-{args.k} diverge do ranking completo em n={n}")
+            line += f"  completo {full_t:8.3f}s ({full_t / top_t:.0f}x)"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
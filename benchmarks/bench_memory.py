@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de memória (tracemalloc) da geração do migration.sql.
+
+Para catálogos com número crescente de turmas, mede:
+- legado: lista `sql` + "\\n".join + um write (SyntheticBook)
+- streaming: iter_sql → sql_writer.write_statements sobre o SyntheticBook,
+  que gera as linhas sob demanda. Mede só a emissão do SQL: o pico cresce
+  até o lote de SCHEDULE_BATCH linhas de _ho e depois fica constante
+- workbook: o caminho real do migration.py sobre um .xlsx gerado
+  (synthetic.write_workbook) — Workbook(engine="streaming"), scan_schedule
+  (uma leitura dos _ho) e iter_sql com o schedule_map. O Workbook guarda as
+  linhas tipadas de cada aba e o schedule_map fica em memória, então aqui o
+  pico cresce com o catálogo; o ganho do streaming é não montar o script
+  inteiro (lista + join) por cima disso
+
+Uso:
+    python -m benchmarks.bench_memory [--classes 200 2000 20000 200000] [--gzip] [--no-workbook]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import SyntheticBook, write_workbook
+from migration import build_sql, iter_sql, scan_schedule
+from sql_writer import write_statements
+from workbook import Workbook
+
+# cada disciplina sintética tem 2 horários (= 2 linhas em classes)
+CLASSES_PER_SUBJECT = 2
+SUBJECTS_PER_COURSE = 60
+
+
+def legacy_write(book, path):
+    sql = build_sql(book)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(sql))
+
+
+def streaming_write(book, path, compress):
+    write_statements(iter_sql(book), path, compress=compress)
+
+
+def workbook_write(xlsx, sheets, path, compress):
+    """O que o migration.py faz no modo padrão, com a engine streaming."""
+    with Workbook(xlsx, subject_sheets=sheets, engine="streaming") as book:
+        _, schedule = scan_schedule(book)
+        write_statements(iter_sql(book, schedule), path, compress=compress)
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, nargs="+", default=[200, 2000, 20000])
+    parser.add_argument("--gzip", action="store_true", help="streaming com compressão gzip")
+    parser.add_argument("--no-workbook", action="store_true", help="não mede o caminho real (.xlsx)")
+    args = parser.parse_args()
+
+    print(f"{'turmas':>8} {'legado':>22} {'streaming':>22} {'workbook':>22}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "migration.sql")
+        xlsx = os.path.join(tmp, "Horarios.xlsx")
+        for classes in args.classes:
+            subjects = max(1, classes // CLASSES_PER_SUBJECT)
+            courses = max(1, subjects // SUBJECTS_PER_COURSE)
+            per_semester = max(1, subjects // (courses * 10))
+            book = SyntheticBook(courses=courses, subjects_per_semester=per_semester)
+
+            legacy = measure(lambda: legacy_write(book, path))
+            stream_path = path + (".gz" if args.gzip else "")
+            streaming = measure(lambda: streaming_write(book, stream_path, args.gzip))
+            results = [legacy, streaming]
+            if not args.no_workbook:
+                sheets = write_workbook(xlsx, courses=courses, subjects_per_semester=per_semester)
+                results.append(measure(lambda: workbook_write(xlsx, sheets, stream_path, args.gzip)))
+
+            cells = [f"{peak / 2**20:8.1f} MiB {elapsed:7.2f}s" for elapsed, peak in results]
+            print(f"{classes:>8} " + " ".join(f"{c:>22}" for c in cells))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do schedule_codec com disciplinas sintéticas (padrão: 10k).
+
+- conversão matriz -> pares (loop aninhado antigo) x matriz -> máscara
+- ida e volta matriz <-> pares <-> máscara <-> NumPy (sem perdas)
+- checagem de colisão: varredura de listas de pares x AND de máscaras,
+  e a matriz n x n completa em NumPy
+
+Uso:
+    python -m benchmarks.bench_schedule_codec [--subjects 10000] [--pairs 1000000]
+"""
+
+import argparse
+import random
+import time
+
+import schedule_codec as codec
+
+DAYS, HOURS = 6, 12
+
+
+def synthetic_matrices(n, seed=0):
+    rng = random.Random(seed)
+    matrices = []
+    for _ in range(n):
+        m = [[False] * HOURS for _ in range(DAYS)]
+        for _ in range(rng.randint(2, 6)):
+            m[rng.randrange(DAYS)][rng.randrange(HOURS)] = True
+        matrices.append(m)
+    return matrices
+
+
+def legacy_pairs(ho_matrix):
+    new_ho = []
+    for dia_idx, dia in enumerate(ho_matrix):
+        for hora_idx, val in enumerate(dia):
+            if val:
+                new_ho.append([dia_idx, hora_idx])
+    return new_ho
+
+
+def legacy_collides(a, b):
+    small, large = (a, b) if len(a) < len(b) else (b, a)
+    for slot in small:
+        if slot in large:
+            return True
+    return False
+
+
+def timed(label, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"  {label:<38} {time.perf_counter() - t0:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subjects", type=int, default=10000)
+    parser.add_argument("--pairs", type=int, default=1000000, help="pares aleatórios na checagem escalar")
+    args = parser.parse_args()
+
+    print(f"📊 {args.subjects} disciplinas sintéticas ({DAYS}x{HOURS})")
+    matrices = synthetic_matrices(args.subjects)
+
+    pairs = timed("matriz -> pares (loop antigo)", lambda: [legacy_pairs(m) for m in matrices])
+    masks = timed("matriz -> máscara (codec)", lambda: [codec.matrix_to_mask(m) for m in matrices])
+    packed = timed("máscaras -> NumPy uint64", lambda: codec.pack_masks(masks))
+
+    # Ida e volta sem perdas
+    assert [codec.mask_to_pairs(m) for m in masks] == pairs
+    assert [codec.mask_to_matrix(m, DAYS, HOURS) for m in masks] == matrices
+    assert codec.unpack_masks(packed) == masks
+    assert (codec.from_bool_array(codec.to_bool_array(packed)) == packed).all()
+    print("  ✅ ida e volta matriz/pares/máscara/NumPy sem perdas")
+
+    rng = random.Random(1)
+    sample = [(rng.randrange(args.subjects), rng.randrange(args.subjects)) for _ in range(args.pairs)]
+    slow = timed(f"{args.pairs} colisões (listas de pares)",
+                 lambda: sum(legacy_collides(pairs[i], pairs[j]) for i, j in sample))
+    fast = timed(f"{args.pairs} colisões (AND de máscaras)",
+                 lambda: sum(masks[i] & masks[j] != 0 for i, j in sample))
+    assert slow == fast
+
+    matrix = timed(f"matriz {args.subjects}x{args.subjects} (NumPy)", lambda: codec.collision_matrix(packed))
+    assert all(matrix[i, j] == codec.collides(masks[i], masks[j]) for i, j in sample[:1000])
+    print(f"  {int(matrix.sum())} pares em colisão (incluindo diagonal)")
+
+
+if __name__ == '__main__':
+    main()
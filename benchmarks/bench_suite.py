@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suíte de benchmarks do pipeline em várias escalas, com resultados guardados
+para comparar execuções.
+
+Para cada escala (SCALES) gera um catálogo sintético (benchmarks.synthetic)
+e mede:
+- migration: migration.py de ponta a ponta (workbook → migration.sql), modos
+  legado e --bulk
+- ho: transformações do _ho (matriz → pares, texto "Dia(HH:MM-HH:MM)" →
+  (dia, horário), pares → máscara)
+- prereqs: parsing de pré-requisitos (_re da planilha, coluna do CSV) e
+  montagem do PrereqGraph
+- combinations: ranking.top_k das grades de um período
+- prediction: predictor.predict_batch (1 processo)
+
+Cada medida é o melhor de --repeat execuções. O resultado vai para
+benchmarks/results/<data>-<revisão>.json; --compare mostra a razão de tempo
+contra uma execução anterior ("latest" = a mais recente da pasta).
+
+Uso:
+    python -m benchmarks.bench_suite [--scales small medium] [--only migration ho] [--compare latest]
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import (SyntheticBook, db_json_subjects, db_mat_subjects, write_course_csvs,
+                                  write_workbook)
+from instrumentation import git_revision
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RESULTS_VERSION = 1
+
+SCALES = {
+    "small": dict(courses=2, semesters=8, subjects_per_semester=5, prereq_density=0.3,
+                  classes_per_subject=1, slot_overlap=0.2),
+    "medium": dict(courses=10, semesters=10, subjects_per_semester=6, prereq_density=0.3,
+                   classes_per_subject=2, slot_overlap=0.2),
+    "large": dict(courses=40, semesters=10, subjects_per_semester=8, prereq_density=0.4,
+                  classes_per_subject=2, slot_overlap=0.3),
+}
+STUDENTS = {"small": 20, "medium": 50, "large": 100}
+TOP_K = 10
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def best_of(repeat, fn):
+    """(melhor tempo, retorno da última execução)"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+# =====================================
+# BENCHMARKS (cada um gera (caso, função que retorna o nº de linhas processadas))
+# =====================================
+@benchmark("migration")
+def bench_migration(scale, tmp):
+    from migration import main as migration_main
+
+    path = os.path.join(tmp, "wb.xlsx")
+    sheets = write_workbook(path, seed=0, **scale)
+    rows = scale["courses"] * scale["semesters"] * scale["subjects_per_semester"] * scale["classes_per_subject"]
+    out = os.path.join(tmp, "migration.sql")
+    quiet = ["--sheets", *sheets, "--excel", path, "-o", out]
+
+    def run(*extra):
+        def fn():
+            import contextlib
+            import io
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                migration_main([*quiet, *extra])
+            return rows
+        return fn
+
+    yield "legacy", run()
+    yield "bulk", run("--bulk")
+
+
+@benchmark("ho")
+def bench_ho(scale, tmp):
+    from convert_db_mat import transform_ho
+    from schedule_codec import to_mask
+    from schedule_parser import parse_schedules
+
+    n = scale["courses"] * scale["semesters"] * scale["subjects_per_semester"] * scale["classes_per_subject"]
+    matrices = [s["_ho"] for s in db_mat_subjects(n)]
+    yield "matrix_to_pairs", lambda: len([transform_ho(m) for m in matrices])
+
+    rows = list(SyntheticBook(**scale).subjects())
+    yield "parse_text", lambda: len(parse_schedules(rows))
+
+    pairs = [s["_ho"] for s in db_json_subjects(**scale)]
+    yield "pairs_to_mask", lambda: len([to_mask(p) for p in pairs])
+
+
+@benchmark("prereqs")
+def bench_prereqs(scale, tmp):
+    from csv_to_sql_physics import iter_subjects, parse_prerequisites_column
+    from migration import parse_requirements
+    from prereq_graph import PrereqGraph
+
+    rows = list(SyntheticBook(**scale).subjects())
+    yield "workbook_re", lambda: sum(len(parse_requirements(r.requirements)) for r in rows)
+
+    directory = os.path.join(tmp, "csv")
+    entries = write_course_csvs(directory, **{k: scale[k] for k in ("courses", "semesters",
+                                                                     "subjects_per_semester", "prereq_density")})
+    csv_rows = [r for e in entries for r in iter_subjects(os.path.join(directory, e["file"]))]
+    yield "csv_column", lambda: len(parse_prerequisites_column([r["prerequisites"] for r in csv_rows])[0])
+
+    subjects = db_json_subjects(**scale)
+    yield "graph", lambda: PrereqGraph.from_subjects(subjects).subject_count
+
+
+@benchmark("combinations")
+def bench_combinations(scale, tmp):
+    from escolhe import calculate_heights
+    from ranking import top_k
+
+    subjects = db_json_subjects(**{**scale, "courses": 1})
+    weights = calculate_heights(subjects)
+    for semester in (1, scale["semesters"] // 2):
+        genesis = [s for s in subjects if s["_se"] == semester]
+        yield f"top{TOP_K}_se{semester}_n{len(genesis)}", lambda g=genesis: len(top_k(g, TOP_K, weights))
+
+
+@benchmark("prediction")
+def bench_prediction(scale, tmp, students=20):
+    from predictor import predict_batch
+
+    subjects = db_json_subjects(**{**scale, "courses": 1})
+    codes = list(dict.fromkeys(s["_re"] for s in subjects))
+    rng = random.Random(0)
+    batch = [{"id": i, "completed": codes[:rng.randrange(len(codes) // 2)]} for i in range(students)]
+    yield f"students{students}", lambda: len(predict_batch(subjects, batch, workers=1)[0])
+
+
+# =====================================
+# EXECUÇÃO E COMPARAÇÃO
+# =====================================
+def run_suite(scales, only, repeat):
+    results = []
+    for scale_name in scales:
+        scale = SCALES[scale_name]
+        for bench_name in only:
+            with tempfile.TemporaryDirectory() as tmp:
+                options = {"students": STUDENTS[scale_name]} if bench_name == "prediction" else {}
+                for case, fn in BENCHMARKS[bench_name](scale, tmp, **options):
+                    seconds, rows = best_of(repeat, fn)
+                    result = {
+                        "bench": bench_name, "case": case, "scale": scale_name,
+                        "seconds": seconds, "rows": rows,
+                        "rows_per_sec": rows / seconds if seconds > 0 else None,
+                    }
+                    results.append(result)
+                    print(f"  {scale_name:<7} {bench_name:<13} {case:<22} {seconds:>9.4f}s {rows:>9} linhas", flush=True)
+    return results
+
+
+def save_results(results, options, directory=RESULTS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    revision = git_revision() or "norev"
+    path = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S}-{revision}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": RESULTS_VERSION,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": revision,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "options": options,
+            "scales": {name: SCALES[name] for name in options["scales"]},
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def previous_results(spec, exclude=None, directory=RESULTS_DIR):
+    if spec != "latest":
+        return spec
+    files = sorted(p for p in glob.glob(os.path.join(directory, "*.json")) if p != exclude)
+    return files[-1] if files else None
+
+
+def compare(results, path):
+    with open(path, "r", encoding="utf-8") as f:
+        old = {(r["bench"], r["case"], r["scale"]): r for r in json.load(f)["results"]}
+    print(f"\ncomparação com {path} (razão < 1 = mais rápido agora)")
+    for r in results:
+        prev = old.get((r["bench"], r["case"], r["scale"]))
+        if prev and prev["seconds"] > 0:
+            ratio = r["seconds"] / prev["seconds"]
+            flag = " ⚠️" if ratio > 1.2 else ""
+            print(f"  {r['scale']:<7} {r['bench']:<13} {r['case']:<22} {prev['seconds']:>9.4f}s → "
+                  f"{r['seconds']:>9.4f}s  x{ratio:.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline em várias escalas")
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["small", "medium"])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--no-save", action="store_true", help="não grava o resultado")
+    parser.add_argument("--compare", metavar="ARQUIVO", help="resultado anterior ('latest' = o mais recente)")
+    args = parser.parse_args(argv)
+
+    options = {"scales": args.scales, "only": args.only, "repeat": args.repeat}
+    print(f"escalas: {', '.join(args.scales)} | benchmarks: {', '.join(args.only)} | melhor de {args.repeat}")
+    results = run_suite(args.scales, args.only, args.repeat)
+
+    saved = None
+    if not args.no_save:
+        saved = save_results(results, options, args.results_dir)
+        print(f"\n💾 {saved}")
+    if args.compare:
+        previous = previous_results(args.compare, saved, args.results_dir)
+        if previous:
+            compare(results, previous)
+        else:
+            print("\n(nenhum resultado anterior para comparar)")
+
+
+if __name__ == "__main__":
+    main()
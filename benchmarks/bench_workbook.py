@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: leitura do workbook na migração.
+
+Compara o caminho antigo do migration.py (pd.read_excel por aba em cada uma
+das 3 seções SUBJECTS / REQUIREMENTS / TIME SLOTS) com o Workbook em cache
+(engines "pandas" e "streaming") num workbook sintético de 50 cursos.
+
+Uso:
+    python -m benchmarks.bench_workbook [--courses 50] [--repeat 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import write_workbook
+from workbook import Workbook
+
+
+def legacy_read(path, sheets):
+    """Caminho antigo: cada seção relê todas as abas de curso."""
+    xlsx = pd.ExcelFile(path)
+    rows = 0
+    for _section in ("SUBJECTS", "REQUIREMENTS", "TIME SLOTS"):
+        for sheet in sheets:
+            df = pd.read_excel(xlsx, sheet)
+            for _, r in df.iterrows():
+                rows += 1
+    return rows
+
+
+def cached_read(path, sheets, engine):
+    rows = 0
+    with Workbook(path, subject_sheets=sheets, engine=engine) as book:
+        for _section in ("SUBJECTS", "REQUIREMENTS", "TIME SLOTS"):
+            rows += len(book.subjects())
+    return rows
+
+
+def timed(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "Horarios.xlsx")
+        sheets = write_workbook(path, courses=args.courses)
+        print(f"📊 Workbook sintético: {args.courses} cursos, {os.path.getsize(path) / 1024:.0f} KiB")
+
+        cases = [
+            ("legado (read_excel x3)", lambda: legacy_read(path, sheets)),
+            ("Workbook pandas", lambda: cached_read(path, sheets, "pandas")),
+            ("Workbook streaming", lambda: cached_read(path, sheets, "streaming")),
+        ]
+        baseline = None
+        for label, fn in cases:
+            elapsed, rows = timed(fn, args.repeat)
+            baseline = baseline or elapsed
+            print(f"  {label:<24} {elapsed:8.3f}s  {rows} linhas  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
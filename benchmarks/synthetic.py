@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gerador de dados sintéticos no formato do Horarios.xlsx, do db.json e do CSV
+da física (import_courses.py / csv_to_sql_physics.py).
+
+Todos os formatos saem do mesmo catálogo neutro (catalog_subjects), com os
+mesmos parâmetros:
+- courses: número de cursos
+- semesters / subjects_per_semester: tamanho de cada curso
+- prereq_density: chance de cada disciplina do período anterior ser
+  pré-requisito (no máximo 3)
+- classes_per_subject: turmas por disciplina (A, B, ...)
+- slot_overlap: chance de uma turma repetir um horário já usado no mesmo
+  período (None = sorteio livre, o comportamento original)
+
+O workbook tem a aba 'cursos', uma aba de disciplinas por curso (mesmas
+colunas de engcomp/matematica) e a aba 'users'.
+"""
+
+import csv
+import json
+import os
+import random
+
+SUBJECT_COLUMNS = ['_cu', '_se', '_di', '_re', '_ap', '_at', '_el', '_ag', '_pr', '_ho', '_au', '_ha', '_da', '_cl']
+DAYS = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado"]
+SLOTS = [
+    ("07:00", "08:40"), ("08:50", "10:30"), ("10:40", "12:20"),
+    ("13:00", "14:40"), ("14:50", "16:30"), ("16:40", "18:20"),
+    ("18:30", "20:10"), ("20:20", "22:00"),
+]
+
+
+def course_codes(courses):
+    return [f"curso{i:03d}" for i in range(courses)]
+
+
+def _pick_slot(rng, used, slot_overlap):
+    """
+    Horário (dia_a, dia_b, índice em SLOTS) de uma turma. slot_overlap=None
+    sorteia livremente (comportamento original); com uma probabilidade p,
+    repete um horário já usado no semestre com chance p e senão escolhe um
+    ainda livre — p controla quantas disciplinas do período colidem.
+    """
+    if slot_overlap is not None:
+        if used and rng.random() < slot_overlap:
+            return rng.choice(used)
+        free = [(a, b, k) for a in range(5) for b in range(5) if a < b for k in range(len(SLOTS))
+                if not any(u[2] == k and {u[0], u[1]} & {a, b} for u in used)]
+        if free:
+            return rng.choice(free)
+    day_a, day_b = rng.sample(range(5), 2)
+    return day_a, day_b, rng.randrange(len(SLOTS))
+
+
+def catalog_subjects(code, semesters=10, subjects_per_semester=6, prereq_density=0.3, rng=None,
+                     classes_per_subject=1, slot_overlap=None):
+    """
+    Catálogo neutro de um curso, base de todos os formatos (planilha, db.json,
+    CSV da física): uma entrada por disciplina com
+    {course, semester, index, name, code, prereqs, min_credits, ap, at,
+    elective, classes: [(turma, dia_a, dia_b, slot)]}.
+    """
+    rng = rng or random.Random(0)
+    subjects = []
+    previous = []
+    for se in range(1, semesters + 1):
+        current = []
+        used = []
+        for k in range(subjects_per_semester):
+            prereqs = [p for p in previous if rng.random() < prereq_density][:3]
+            min_credits = se * 20 if se > 3 and rng.random() < 0.1 else 0
+            classes = []
+            for c in range(classes_per_subject):
+                if slot_overlap is None and c == 0:
+                    day_a, day_b = rng.sample(DAYS[:5], 2)
+                    slot = rng.randrange(len(SLOTS))
+                    day_a, day_b = DAYS.index(day_a), DAYS.index(day_b)
+                else:
+                    day_a, day_b, slot = _pick_slot(rng, used, slot_overlap)
+                used.append((day_a, day_b, slot))
+                classes.append((chr(ord("A") + c), day_a, day_b, slot))
+            subject = {
+                'course': code, 'semester': se, 'index': k,
+                'name': f"{code} Disciplina {se}.{k + 1}",
+                'code': f"{code.upper()}-{se}{chr(ord('A') + k)}" if k < 26 else f"{code.upper()}-{se}.{k}",
+                'prereqs': prereqs, 'min_credits': min_credits,
+                'ap': rng.randint(0, 1), 'at': rng.randint(0, 1),
+                'elective': se > semesters - 2, 'classes': classes,
+            }
+            subjects.append(subject)
+            current.append(subject)
+        previous = current
+    return subjects
+
+
+def subject_rows(code, semesters=10, subjects_per_semester=6, prereq_density=0.3, rng=None,
+                 classes_per_subject=1, slot_overlap=None):
+    """Linhas de disciplinas de um curso (listas na ordem de SUBJECT_COLUMNS), uma por turma."""
+    rows = []
+    for s in catalog_subjects(code, semesters, subjects_per_semester, prereq_density, rng,
+                              classes_per_subject, slot_overlap):
+        reqs = [p['name'] for p in s['prereqs']]
+        if s['min_credits']:
+            reqs.append(f"CREDITS>={s['min_credits']}")
+        for turma, day_a, day_b, slot in s['classes']:
+            start, end = SLOTS[slot]
+            ho = f"{DAYS[day_a]}({start}-{end}) {DAYS[day_b]}({start}-{end})"
+            rows.append([
+                code, s['semester'], s['name'], "; ".join(reqs) or None,
+                s['ap'], s['at'], s['elective'], True,
+                None, ho, None, "[]", None, turma,
+            ])
+    return rows
+
+
+def write_workbook(path, courses=50, semesters=10, subjects_per_semester=6, prereq_density=0.3, seed=0,
+                   classes_per_subject=1, slot_overlap=None):
+    """Escreve um Horarios.xlsx sintético e retorna a lista de abas de curso."""
+    from openpyxl import Workbook as XlsxWorkbook
+
+    rng = random.Random(seed)
+    codes = course_codes(courses)
+
+    wb = XlsxWorkbook(write_only=True)
+
+    ws = wb.create_sheet("cursos")
+    ws.append(['gid', '_cu', 'name', '_da', '_hd'])
+    for i, code in enumerate(codes):
+        ws.append([i, code, f"Curso {i}", "[8, 5]", str([list(s) for s in SLOTS])])
+
+    for code in codes:
+        ws = wb.create_sheet(code)
+        ws.append(SUBJECT_COLUMNS)
+        for row in subject_rows(code, semesters, subjects_per_semester, prereq_density, rng,
+                                classes_per_subject, slot_overlap):
+            ws.append(row)
+
+    ws = wb.create_sheet("users")
+    ws.append(['username', 'passwordHash', 'name', 'role', 'active', 'createdAt'])
+    ws.append(['admin', '0' * 64, 'Admin', 'admin', True, None])
+
+    wb.save(path)
+    return codes
+
+
+class SyntheticBook:
+    """
+    Substituto em memória do workbook.Workbook para benchmarks grandes.
+
+    subjects() gera as linhas sob demanda (nada fica guardado), então o custo
+    medido é só o de quem consome as linhas.
+    """
+
+    def __init__(self, courses=1, semesters=10, subjects_per_semester=6, prereq_density=0.3, seed=0,
+                 classes_per_subject=1, slot_overlap=None):
+        self.codes = course_codes(courses)
+        self.semesters = semesters
+        self.subjects_per_semester = subjects_per_semester
+        self.prereq_density = prereq_density
+        self.seed = seed
+        self.classes_per_subject = classes_per_subject
+        self.slot_overlap = slot_overlap
+
+    def courses(self):
+        from workbook import CourseRow
+        return [CourseRow(code=code, name=f"Curso {i}") for i, code in enumerate(self.codes)]
+
+    def subjects(self):
+        from workbook import SubjectRow
+        rng = random.Random(self.seed)
+        for code in self.codes:
+            for row in subject_rows(code, self.semesters, self.subjects_per_semester, self.prereq_density, rng,
+                                    self.classes_per_subject, self.slot_overlap):
+                values = dict(zip(SUBJECT_COLUMNS, row))
+                yield SubjectRow(
+                    sheet=code, course=code, semester=values['_se'], name=values['_di'],
+                    requirements=values['_re'], has_practical=bool(values['_ap']),
+                    has_theory=bool(values['_at']), elective=bool(values['_el']),
+                    schedule=values['_ho'], turma=values['_cl'],
+                )
+
+    def users(self):
+        from workbook import UserRow
+        return [UserRow('admin', '0' * 64, 'Admin', 'admin', True, None)]
+
+
+def db_mat_subjects(n=2000, semesters=10, days=6, hours=12, prereq_density=0.3, seed=0):
+    """
+    Disciplinas no formato do src/model/db_mat.json (_ho como matriz de
+    booleanos dias x horas, _pr como lista de siglas).
+    """
+    rng = random.Random(seed)
+    per_semester = max(1, n // semesters)
+    subjects, previous = [], []
+    for i in range(n):
+        se = min(semesters, i // per_semester + 1)
+        code = f"MAT{i:05d}"
+        ho = [[False] * hours for _ in range(days)]
+        for _ in range(rng.randint(2, 6)):
+            ho[rng.randrange(days)][rng.randrange(hours)] = True
+        subjects.append({
+            '_cu': 'matematica', '_se': se, '_di': f"Disciplina {i}", '_re': code,
+            '_ap': rng.choice((0, 2, 4)), '_at': rng.choice((2, 4)),
+            '_el': rng.random() < 0.2, '_ag': True,
+            '_pr': [p for p in previous if rng.random() < prereq_density][:3],
+            '_ho': ho,
+        })
+        if (i + 1) % per_semester == 0:
+            previous = [s['_re'] for s in subjects[-per_semester:]]
+    return subjects
+
+
+# =====================================
+# db.json E CSV DA FÍSICA
+# =====================================
+def _generate(courses, semesters, subjects_per_semester, prereq_density, seed, classes_per_subject, slot_overlap):
+    rng = random.Random(seed)
+    for code in course_codes(courses):
+        yield code, catalog_subjects(code, semesters, subjects_per_semester, prereq_density, rng,
+                                     classes_per_subject, slot_overlap)
+
+
+def db_json_subjects(courses=1, semesters=10, subjects_per_semester=6, prereq_density=0.3, seed=0,
+                     classes_per_subject=1, slot_overlap=None):
+    """
+    Disciplinas no formato do db.json: uma entrada por turma (mesmo _re),
+    _pr com siglas e créditos mínimos, _ho como pares [dia, horário].
+    """
+    subjects = []
+    for _, catalog in _generate(courses, semesters, subjects_per_semester, prereq_density, seed,
+                                classes_per_subject, slot_overlap):
+        for s in catalog:
+            pr = [p['code'] for p in s['prereqs']]
+            if s['min_credits']:
+                pr.append(str(s['min_credits']))
+            for turma, day_a, day_b, slot in s['classes']:
+                subjects.append({
+                    '_cu': s['course'], '_se': s['semester'], '_di': s['name'], '_re': s['code'],
+                    '_ap': 2 * s['ap'], '_at': 2 + 2 * s['at'], '_el': s['elective'], '_ag': True,
+                    '_pr': pr, '_ho': [[day_a, slot], [day_b, slot]], '_au': '', '_ha': [], '_da': [],
+                    '_cl': turma,
+                })
+    return subjects
+
+
+def write_db_json(path, **options):
+    """Grava db_json_subjects(**options) em 'path'. Retorna o número de entradas."""
+    subjects = db_json_subjects(**options)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(subjects, f, ensure_ascii=False)
+    return len(subjects)
+
+
+def write_course_csvs(directory, courses=5, semesters=10, subjects_per_semester=6, prereq_density=0.3, seed=0,
+                      first_course_id=100):
+    """
+    Um CSV por curso no formato do fisica.csv (code, name, period, credits,
+    prerequisites) + manifest.json do import_courses.py. Retorna as entradas
+    do manifesto.
+    """
+    os.makedirs(directory, exist_ok=True)
+    entries = []
+    for i, (code, catalog) in enumerate(_generate(courses, semesters, subjects_per_semester, prereq_density,
+                                                  seed, 1, None)):
+        filename = f"{code}.csv"
+        with open(os.path.join(directory, filename), 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['code', 'name', 'period', 'credits', 'prerequisites'])
+            for s in catalog:
+                pr = [p['code'] for p in s['prereqs']]
+                if s['min_credits']:
+                    pr.append(str(s['min_credits']))
+                credits = [2 + 2 * s['at'], 2 * s['ap'], 0, 0]
+                writer.writerow([s['code'], s['name'], s['semester'], json.dumps(credits), json.dumps(pr)])
+        entries.append({'file': filename, 'course_id': first_course_id + i, 'name': f"Curso {i}"})
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({'courses': entries}, f, ensure_ascii=False, indent=2)
+    return entries
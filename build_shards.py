@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shards estáticos pré-calculados para o front-end (grade e previsão).
+
+Hoje cada visita baixa as disciplinas e roda Escolhe + Grafos no navegador.
+Este passo (depois da geração do catálogo) faz esse trabalho uma vez, offline,
+e grava por curso:
+
+- <curso>.<hash>.json / .bin — previsão: siglas, nomes, período, nível
+  topológico, peso crítico (altura, o mesmo do compare()), créditos mínimos
+  e pré-requisitos diretos em CSR (pred_offsets/pred_index, índices em codes)
+- <curso>-se<N>.<hash>.json / .bin — grade de cada período: as entradas do
+  período (subject = índice em codes do curso), nível/peso, o _grid
+  normalizado (dia * horários + horário, na grade do curso) em CSR
+  (grid_offsets/grid_slots) e a matriz de colisão de horário
+- manifest.json — índice dos arquivos (sem hash no nome; é o único que não
+  pode ir para cache longo). Gravado por último.
+
+O <hash> são os 12 primeiros dígitos do SHA-256 do próprio arquivo: shards
+iguais mantêm o nome (e o cache do navegador); arquivos que já existem não
+são regravados.
+
+Matriz de colisão: só o triângulo superior, bit a bit, linha a linha. O par
+(i, j), i < j, é o bit k = i*n - i*(i+1)/2 + (j - i - 1), no byte k >> 3,
+bit k & 7 (LSB primeiro). Colisão é só sobreposição de horário; as demais
+regras do Escolhe (mesmo _re, outro curso) continuam no cliente.
+
+Formato binário (.bin), para ler com DataView/TypedArray sem parse:
+
+    "HSHD"  | versão u32 | tamanho do cabeçalho u32 | cabeçalho JSON (UTF-8) | buffer
+
+O cabeçalho tem os mesmos campos do .json, exceto os arrays numéricos, que
+ficam no buffer (little-endian, alinhados em 8 bytes) e são descritos em
+"arrays": {nome: {"dtype": "u8"|"u16"|"u32", "offset", "length"}}, com
+offset relativo ao início do buffer (que também começa alinhado em 8).
+No .json os arrays vão como listas e a matriz de colisão em base64.
+
+Uso:
+    python build_shards.py db.json [-o public/shards] [--course-index db2_courses.json]
+    python build_shards.py catalog.arrow -o public/shards --prune
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from datetime import datetime
+
+import instrumentation
+from convert import read_records
+from escolhe import raw_ho
+from generate_db2_fields import DEFAULT_GRID, file_hash, load_course_index
+from prereq_graph import PrereqGraph
+from schedule_codec import mask_to_pairs, to_mask
+
+OUTPUT_DIR = "public/shards"
+MANIFEST = "manifest.json"
+SHARD_VERSION = 1
+MAGIC = b"HSHD"
+HASH_LENGTH = 12
+ALIGN = 8
+
+# dtype do cabeçalho → typecode do módulo array com esse tamanho
+_TYPECODES = {
+    dtype: next(c for c in "BHILQ" if array(c).itemsize == size)
+    for dtype, size in (("u8", 1), ("u16", 2), ("u32", 4))
+}
+
+
+class ShardError(ValueError):
+    """Catálogo que não dá para fatiar (ciclo de pré-requisitos, horário fora da grade...)."""
+
+
+# =====================================
+# CÁLCULO
+# =====================================
+def grid_for(index, course_code):
+    """(horários, dias) da grade do curso: índice do db2 ou DEFAULT_GRID."""
+    entry = (index or {}).get("courses", {}).get(course_code)
+    if entry:
+        return entry["hours"], entry["days"]
+    return DEFAULT_GRID[0], DEFAULT_GRID[1]
+
+
+def grid_slots(pairs, hours, days):
+    """Pares [dia, horário] → índices normalizados ordenados (dia * horários + horário)."""
+    slots = []
+    for day, hour in pairs:
+        if not (0 <= day < days and 0 <= hour < hours):
+            raise ShardError(f"horário [{day}, {hour}] fora da grade {hours}x{days}")
+        slots.append(day * hours + hour)
+    return sorted(slots)
+
+
+def collision_bits(masks):
+    """Triângulo superior da matriz de colisão (ver o docstring do módulo) como bytes."""
+    n = len(masks)
+    out = bytearray((n * (n - 1) // 2 + 7) // 8)
+    k = 0
+    for i in range(n):
+        mi = masks[i]
+        for j in range(i + 1, n):
+            if mi & masks[j]:
+                out[k >> 3] |= 1 << (k & 7)
+            k += 1
+    return bytes(out)
+
+
+def collides(bits, n, i, j):
+    """Lê o par (i, j) de collision_bits (mesma conta que o front-end faz)."""
+    if i == j:
+        return False
+    if i > j:
+        i, j = j, i
+    k = i * n - i * (i + 1) // 2 + (j - i - 1)
+    return bool(bits[k >> 3] >> (k & 7) & 1)
+
+
+def course_shards(course_code, subjects, hours, days):
+    """
+    Disciplinas (db.json) de um curso → (shard do curso, {período: shard do período}).
+
+    Os shards são dicts com campos escalares/listas de texto e "arrays"
+    ({nome: lista de inteiros não negativos} ou bytes para colisões).
+    """
+    graph = PrereqGraph.from_subjects(subjects)
+    try:
+        graph.raise_for_errors(unknown=False)
+    except ValueError as e:
+        raise ShardError(f"{course_code}: {e}") from None
+
+    # uma linha por sigla (a primeira entrada de cada _re dá nome/período)
+    first = {}
+    for s in subjects:
+        if s.get("_re"):
+            first.setdefault(s["_re"], s)
+    n = len(graph.codes)
+    pred_offsets, pred_index = [0], []
+    for i in range(n):
+        preds = sorted(j for j in range(n) if graph.preds[i] >> j & 1)
+        pred_index.extend(preds)
+        pred_offsets.append(len(pred_index))
+
+    course = {
+        "kind": "course",
+        "course": course_code,
+        "grid": {"hours": hours, "days": days},
+        "subject_count": graph.subject_count,
+        "codes": graph.codes,
+        "names": [first[c].get("_di") if c in first else None for c in graph.codes],
+        "arrays": {
+            "semester": [int(first[c].get("_se") or 0) if c in first else 0 for c in graph.codes],
+            "level": graph.level,
+            "weight": graph.height,
+            "min_credits": graph.min_credits,
+            "pred_offsets": pred_offsets,
+            "pred_index": pred_index,
+        },
+    }
+
+    by_semester = defaultdict(list)
+    for s in subjects:
+        if s.get("_re"):
+            by_semester[int(s.get("_se") or 0)].append(s)
+
+    semesters = {}
+    for semester in sorted(by_semester):
+        entries = by_semester[semester]
+        masks = [to_mask(raw_ho(s)) for s in entries]
+        grid_offsets, slots = [0], []
+        try:
+            for s, mask in zip(entries, masks):
+                slots.extend(grid_slots(mask_to_pairs(mask), hours, days))
+                grid_offsets.append(len(slots))
+        except ShardError as e:
+            raise ShardError(f"{course_code} período {semester}, {s['_re']}: {e}") from None
+        index = [graph.index[s["_re"]] for s in entries]
+        semesters[semester] = {
+            "kind": "semester",
+            "course": course_code,
+            "semester": semester,
+            "grid": {"hours": hours, "days": days},
+            "count": len(entries),
+            "names": [s.get("_di") for s in entries],
+            "classes": [s.get("_cl") for s in entries],
+            "electives": [bool(s.get("_el")) for s in entries],
+            "arrays": {
+                "subject": index,
+                "level": [graph.level[i] for i in index],
+                "weight": [graph.height[i] for i in index],
+                "grid_offsets": grid_offsets,
+                "grid_slots": slots,
+                "collisions": collision_bits(masks),
+            },
+        }
+    return course, semesters
+
+
+# =====================================
+# CODIFICAÇÃO
+# =====================================
+def _dtype(values):
+    top = max(values, default=0)
+    if min(values, default=0) < 0:
+        raise ShardError("arrays dos shards não aceitam valores negativos")
+    for dtype, limit in (("u8", 1 << 8), ("u16", 1 << 16), ("u32", 1 << 32)):
+        if top < limit:
+            return dtype
+    raise ShardError(f"valor grande demais para um shard: {top}")
+
+
+def _packed(dtype, values):
+    data = array(_TYPECODES[dtype], values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def encode_json(shard):
+    """Shard → bytes do .json (arrays como listas; collisions em base64)."""
+    doc = {"version": SHARD_VERSION, **shard}
+    doc["arrays"] = {
+        name: base64.b64encode(values).decode("ascii") if isinstance(values, bytes) else list(values)
+        for name, values in shard["arrays"].items()
+    }
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_binary(shard):
+    """Shard → bytes do .bin (ver o docstring do módulo)."""
+    buffer = bytearray()
+    described = {}
+    for name, values in shard["arrays"].items():
+        if isinstance(values, bytes):
+            dtype, data = "u8", values
+        else:
+            dtype = _dtype(values)
+            data = _packed(dtype, values)
+        buffer.extend(b"\0" * (-len(buffer) % ALIGN))
+        described[name] = {"dtype": dtype, "offset": len(buffer), "length": len(values)}
+        buffer.extend(data)
+
+    header = {"version": SHARD_VERSION, **shard, "arrays": described}
+    head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # buffer alinhado: 12 bytes fixos + cabeçalho completado com espaços
+    head += b" " * (-(12 + len(head)) % ALIGN)
+    return MAGIC + struct.pack("<II", SHARD_VERSION, len(head)) + head + bytes(buffer)
+
+
+def decode_binary(data):
+    """Bytes de um .bin → shard com "arrays" como listas (collisions como bytes)."""
+    if data[:4] != MAGIC:
+        raise ShardError("não é um shard binário (assinatura inválida)")
+    version, size = struct.unpack_from("<II", data, 4)
+    if version != SHARD_VERSION:
+        raise ShardError(f"shard versão {version}, esperado {SHARD_VERSION}")
+    shard = json.loads(data[12:12 + size])
+    start = 12 + size
+    arrays = {}
+    for name, desc in shard["arrays"].items():
+        itemsize = int(desc["dtype"][1:]) // 8
+        raw = data[start + desc["offset"]:start + desc["offset"] + desc["length"] * itemsize]
+        if name == "collisions":
+            arrays[name] = bytes(raw)
+            continue
+        values = array(_TYPECODES[desc["dtype"]])
+        values.frombytes(raw)
+        if sys.byteorder != "little":
+            values.byteswap()
+        arrays[name] = values.tolist()
+    shard["arrays"] = arrays
+    return shard
+
+
+def decode_json(data):
+    """Bytes de um .json → shard (collisions de volta para bytes)."""
+    shard = json.loads(data)
+    arrays = shard["arrays"]
+    if "collisions" in arrays:
+        arrays["collisions"] = base64.b64decode(arrays["collisions"])
+    return shard
+
+
+# =====================================
+# GRAVAÇÃO
+# =====================================
+def hashed_name(stem, data, ext):
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}.{ext}"
+
+
+def write_shard(directory, stem, shard):
+    """Grava .json e .bin com hash no nome. Retorna ({formato: arquivo}, nº de arquivos novos)."""
+    files, written = {}, 0
+    for ext, data in (("json", encode_json(shard)), ("bin", encode_binary(shard))):
+        name = hashed_name(stem, data, ext)
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            written += 1
+        files[ext] = name
+    return files, written
+
+
+def group_by_course(records):
+    courses = defaultdict(list)
+    for r in records:
+        courses[r.get("_cu") or ""].append(r)
+    return courses
+
+
+def build_shards(inputs, directory=OUTPUT_DIR, course_index=None, prune=False):
+    """
+    Disciplinas (db.json / catálogo colunar) → shards + manifest.json em 'directory'.
+    Retorna (manifesto, arquivos novos, arquivos removidos).
+    """
+    index = load_course_index(course_index) if course_index else None
+    with instrumentation.stage("read"):
+        courses = group_by_course(read_records(inputs))
+    instrumentation.count("subjects", sum(len(v) for v in courses.values()))
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = {
+        "version": SHARD_VERSION,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "sources": {os.path.basename(p): file_hash(p) for p in inputs},
+        "courses": {},
+    }
+    written = 0
+    for course_code in sorted(courses):
+        hours, days = grid_for(index, course_code)
+        with instrumentation.stage("compute"):
+            course, semesters = course_shards(course_code, courses[course_code], hours, days)
+        with instrumentation.stage("write"):
+            files, n = write_shard(directory, course_code, course)
+            written += n
+            entry = {"grid": course["grid"], "subjects": course["subject_count"], "files": files, "semesters": {}}
+            for semester, shard in semesters.items():
+                files, n = write_shard(directory, f"{course_code}-se{semester}", shard)
+                written += n
+                entry["semesters"][str(semester)] = {"count": shard["count"], "files": files}
+        manifest["courses"][course_code] = entry
+    instrumentation.count("files_written", written)
+
+    path = os.path.join(directory, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+    removed = prune_shards(directory, manifest) if prune else []
+    return manifest, written, removed
+
+
+def manifest_files(manifest):
+    names = set()
+    for entry in manifest["courses"].values():
+        names.update(entry["files"].values())
+        for semester in entry["semesters"].values():
+            names.update(semester["files"].values())
+    return names
+
+
+def prune_shards(directory, manifest):
+    """Apaga shards (.json/.bin com hash no nome) que o manifesto não usa mais."""
+    keep = manifest_files(manifest)
+    removed = []
+    for name in os.listdir(directory):
+        parts = name.rsplit(".", 2)
+        if name in keep or name == MANIFEST or len(parts) != 3 or parts[2] not in ("json", "bin"):
+            continue
+        if len(parts[1]) == HASH_LENGTH and all(c in "0123456789abcdef" for c in parts[1]):
+            os.remove(os.path.join(directory, name))
+            removed.append(name)
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera os shards estáticos de grade/previsão para o front-end")
+    parser.add_argument("inputs", nargs="*", default=["db.json"], help="db.json / catálogo .arrow/.parquet")
+    parser.add_argument("--output-dir", "-o", default=OUTPUT_DIR)
+    parser.add_argument("--course-index", metavar="ARQUIVO",
+                        help="db2_courses.json (generate_db2_fields.py) com a grade de cada curso")
+    parser.add_argument("--prune", action="store_true", help="apaga shards antigos que não estão no manifesto")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with instrumentation.Run.from_args("build_shards", args):
+        try:
+            manifest, written, removed = build_shards(args.inputs, args.output_dir, args.course_index, args.prune)
+        except (ImportError, OSError, ValueError) as e:
+            instrumentation.fail(e)
+            raise SystemExit(f"❌ {e}")
+
+    for code, entry in manifest["courses"].items():
+        grid = entry["grid"]
+        print(f"  {code}: {entry['subjects']} disciplinas, {len(entry['semesters'])} períodos, "
+              f"grade {grid['hours']}x{grid['days']}")
+    total = 2 * (len(manifest["courses"]) + sum(len(e["semesters"]) for e in manifest["courses"].values()))
+    print(f"✅ {total} shards em {args.output_dir} ({written} novos, {total - written} reaproveitados)")
+    if removed:
+        print(f"🗑️  {len(removed)} shards antigos removidos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catálogo colunar (Arrow IPC ou Parquet) compartilhado pelos scripts de conversão.
+
+Em vez de cada script serializar _pr, _ho e _ha como texto JSON dentro de
+células CSV, o catálogo guarda as disciplinas com colunas tipadas:
+
+- _pr: list<string>            (siglas; créditos mínimos como "80")
+- _ho, _ha: list<[int16, 2]>   (pares [dia, hora], como no db.json)
+- _da: list<int16>
+
+e a configuração dos cursos (db2.json / aba 'cursos': name, _da, _hd) nos
+metadados do schema. O formato .arrow (IPC, sem compressão) é lido com
+memory map: colunas inteiras viram arrays sem cópia nem decode de JSON.
+
+pyarrow é opcional (pip install pyarrow); só este módulo depende dele.
+
+APIs por script:
+- convert_db_mat.py / json_to_csv.py: subjects_from_json, write_catalog,
+  read_subjects, write_json, write_csv
+- generate_db2_fields.py: courses_from_db2, read_courses
+- migration.py: catalog_from_workbook, CatalogBook (mesma interface do
+  workbook.Workbook, usado por migration.py --catalog)
+
+Uso:
+    python catalog_columnar.py build --json src/model/db.json --db2 src/model/db2.json -o catalog.arrow
+    python catalog_columnar.py build --excel Horarios.xlsx -o catalog.parquet
+    python catalog_columnar.py export catalog.arrow --json db.json --csv db.csv
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from schedule_codec import matrix_to_pairs
+from workbook import LINE, CourseRow, SubjectRow
+
+CATALOG = "catalog.arrow"
+FORMATS = {".arrow": "arrow", ".ipc": "arrow", ".feather": "arrow", ".parquet": "parquet"}
+
+# Colunas na ordem do db.json (as demais do schema são de uso interno)
+FIELDS = ['_cu', '_se', '_di', '_re', '_ap', '_at', '_el', '_ag', '_pr', '_ho', '_au', '_ha', '_da']
+CSV_FIELDS = FIELDS
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("o catálogo colunar precisa do pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def subject_schema(courses=None):
+    """
+    Schema das disciplinas. Além dos campos do db.json:
+    - _cl: turma (planilha)
+    - _ho_text: _ho original quando ele não é uma lista de pares
+      (ex.: "Segunda(07:00-08:40)" do Horarios.xlsx)
+    - _sheet, _line: aba e linha de origem na planilha, para as mensagens
+      de erro do migration.py
+    """
+    pa = _pyarrow()
+    pair = pa.list_(pa.int16(), 2)
+    metadata = {b"courses": json.dumps(courses or [], ensure_ascii=False).encode("utf-8")}
+    return pa.schema([
+        ("_cu", pa.string()),
+        ("_se", pa.int32()),
+        ("_di", pa.string()),
+        ("_re", pa.string()),
+        ("_ap", pa.int32()),
+        ("_at", pa.int32()),
+        ("_el", pa.bool_()),
+        ("_ag", pa.bool_()),
+        ("_pr", pa.list_(pa.string())),
+        ("_ho", pa.list_(pair)),
+        ("_au", pa.string()),
+        ("_ha", pa.list_(pair)),
+        ("_da", pa.list_(pa.int16())),
+        ("_cl", pa.string()),
+        ("_ho_text", pa.string()),
+        ("_sheet", pa.string()),
+        ("_line", pa.int32()),
+    ], metadata=metadata)
+
+
+# =====================================
+# NORMALIZAÇÃO (qualquer origem → tipos do catálogo)
+# =====================================
+def _missing(v):
+    return v is None or (isinstance(v, float) and v != v)
+
+
+def _decode(v):
+    """Texto JSON (ou repr Python com aspas simples) → objeto; outros valores passam direto."""
+    if not isinstance(v, str):
+        return v
+    text = v.strip()
+    if not text:
+        return None
+    if text[0] in "[{":
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                return json.loads(text.replace("'", '"'))
+            except json.JSONDecodeError:
+                return v
+    return v
+
+
+def ho_pairs(v):
+    """_ho/_ha em qualquer forma (pares, matriz bool, texto JSON) → pares, ou None se não der."""
+    v = _decode(v)
+    if _missing(v) or v == []:
+        return []
+    if not isinstance(v, list):
+        return None
+    if all(isinstance(p, list) and len(p) == 2 and all(isinstance(x, int) and not isinstance(x, bool) for x in p)
+           for p in v):
+        return [list(p) for p in v]
+    if all(isinstance(d, list) and all(isinstance(x, bool) for x in d) for d in v):
+        return matrix_to_pairs(v)
+    return None
+
+
+def _prereqs(v):
+    """_pr: lista, texto "1E, 1F" (planilha) ou JSON → lista de strings."""
+    v = _decode(v)
+    if _missing(v) or v == "":
+        return []
+    if isinstance(v, list):
+        return [str(x) for x in v]
+    return [p.strip() for p in str(v).replace(";", ",").split(",") if p.strip()]
+
+
+def _int(v, default=None):
+    if _missing(v) or v == "":
+        return default
+    return int(float(v))
+
+
+def _bool(v):
+    if _missing(v):
+        return False
+    if isinstance(v, str):
+        return v.strip().lower() in ("1", "true", "t", "sim", "s", "x")
+    return bool(v)
+
+
+def _text(v):
+    if _missing(v):
+        return None
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def normalize_subject(item):
+    """
+    Registro de disciplina (db.json, db_mat.json, linha de planilha) → dict
+    com os tipos do schema. Aplicar de novo num registro já normalizado não
+    muda nada.
+    """
+    ho = ho_pairs(item.get("_ho"))
+    da = _decode(item.get("_da"))
+    return {
+        "_cu": _text(item.get("_cu")),
+        "_se": _int(item.get("_se")),
+        "_di": _text(item.get("_di")),
+        "_re": _text(item.get("_re")),
+        "_ap": _int(item.get("_ap"), 0),
+        "_at": _int(item.get("_at"), 0),
+        "_el": _bool(item.get("_el")),
+        "_ag": _bool(item.get("_ag")),
+        "_pr": _prereqs(item.get("_pr")),
+        "_ho": ho if ho is not None else [],
+        "_au": _text(item.get("_au")),
+        "_ha": ho_pairs(item.get("_ha")) or [],
+        "_da": [int(x) for x in da] if isinstance(da, list) else [],
+        "_cl": _text(item.get("_cl")),
+        "_ho_text": _text(item.get("_ho")) if ho is None else _text(item.get("_ho_text")),
+        "_sheet": _text(item.get("_sheet")),
+        "_line": _int(item.get(LINE, item.get("_line"))),
+    }
+
+
+def normalize_course(item):
+    """Configuração de curso (db2.json ou aba 'cursos') → {_cu, name, _da, _hd}."""
+    da, hd = _decode(item.get("_da")), _decode(item.get("_hd"))
+    return {
+        "_cu": _text(item.get("_cu")),
+        "name": _text(item.get("name")),
+        "_da": da if isinstance(da, list) else [],
+        "_hd": hd if isinstance(hd, list) else [],
+    }
+
+
+# =====================================
+# ESCRITA / LEITURA
+# =====================================
+def catalog_format(path, fmt=None):
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"extensão desconhecida {ext!r} (use {', '.join(FORMATS)})")
+    return FORMATS[ext]
+
+
+def to_table(subjects, courses=None):
+    """Disciplinas (já normalizadas ou não) → pyarrow.Table."""
+    pa = _pyarrow()
+    schema = subject_schema([normalize_course(c) for c in courses or []])
+    rows = [normalize_subject(s) for s in subjects]
+    return pa.Table.from_pylist(rows, schema=schema)
+
+
+def write_catalog(path, subjects, courses=None, fmt=None):
+    """Grava o catálogo (atômico: .tmp + os.replace). Retorna o número de disciplinas."""
+    pa = _pyarrow()
+    table = subjects if isinstance(subjects, pa.Table) else to_table(subjects, courses)
+    fmt = catalog_format(path, fmt)
+    tmp = path + ".tmp"
+    if fmt == "arrow":
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp)
+    os.replace(tmp, path)
+    return table.num_rows
+
+
+def read_catalog(path, columns=None, fmt=None):
+    """
+    Catálogo como pyarrow.Table. Arrow IPC é lido por memory map (sem cópia);
+    Parquet é decodificado, só das colunas pedidas.
+    """
+    pa = _pyarrow()
+    if catalog_format(path, fmt) == "arrow":
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        return table.select(columns) if columns else table
+    import pyarrow.parquet as pq
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+
+def read_courses(path, fmt=None):
+    """Configuração dos cursos guardada nos metadados do schema."""
+    pa = _pyarrow()
+    if catalog_format(path, fmt) == "arrow":
+        schema = pa.ipc.open_file(pa.memory_map(path, "r")).schema
+    else:
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(path)
+    return json.loads((schema.metadata or {}).get(b"courses", b"[]"))
+
+
+def read_subjects(path, columns=None, fmt=None):
+    """Gera as disciplinas como dicts (formato do db.json), lote a lote."""
+    table = read_catalog(path, columns, fmt)
+    for batch in table.to_batches():
+        for row in batch.to_pylist():
+            yield {k: row[k] for k in FIELDS if k in row}
+
+
+# =====================================
+# ADAPTADORES DOS SCRIPTS
+# =====================================
+def subjects_from_json(path):
+    """db.json / db_mat.json (lista de disciplinas) — convert_db_mat.py, json_to_csv.py."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [normalize_subject(s) for s in json.load(f)]
+
+
+def courses_from_db2(path):
+    """db2.json — generate_db2_fields.py."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [normalize_course(c) for c in json.load(f)]
+
+
+def catalog_from_workbook(book):
+    """Abas de disciplinas e 'cursos' do Horarios.xlsx — migration.py. Retorna (subjects, courses)."""
+    subjects = []
+    for sheet in book.subject_sheets:
+        subjects.extend(normalize_subject({**r, "_sheet": sheet}) for r in book.sheet(sheet))
+    courses = [normalize_course(r) for r in book.sheet("cursos")]
+    return subjects, courses
+
+
+def write_json(path, subjects):
+    """Lista de disciplinas no formato do db.json (campos de FIELDS)."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{k: s.get(k) for k in FIELDS} for s in subjects], f, ensure_ascii=False, indent=2)
+
+
+def write_csv(path, subjects, lists="json"):
+    """
+    CSV para o Google Sheets. lists="json": listas como JSON (convert_db_mat.save_csv);
+    lists="text": _pr como "A, B" e _ho/_ha como str() (json_to_csv.py).
+    """
+    import csv
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for s in subjects:
+            row = dict(s)
+            if lists == "text":
+                row["_pr"] = ", ".join(str(x) for x in row.get("_pr") or [])
+                row["_ho"] = str(row.get("_ho") or [])
+                row["_ha"] = str(row.get("_ha") or [])
+            else:
+                for k in ("_pr", "_ho", "_ha", "_da"):
+                    row[k] = json.dumps(row.get(k) or [], ensure_ascii=False)
+                row["_el"] = str(row.get("_el")).lower()
+                row["_ag"] = str(row.get("_ag")).lower()
+            writer.writerow(row)
+
+
+class CatalogBook:
+    """
+    Catálogo com a mesma interface do workbook.Workbook (courses(),
+    subjects(), users()), para o migration.py ler do arquivo colunar.
+
+    O catálogo não guarda usuários: users() é sempre vazio.
+    """
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = fmt
+        self._courses = None
+        self._subjects = None
+
+    def courses(self):
+        if self._courses is None:
+            self._courses = [
+                CourseRow(code=c["_cu"], name=c["name"], grid=json.dumps(c["_da"]), hours=json.dumps(c["_hd"]))
+                for c in read_courses(self.path, self.fmt)
+            ]
+        return self._courses
+
+    def subjects(self):
+        if self._subjects is None:
+            table = read_catalog(self.path, fmt=self.fmt)
+            rows = []
+            for i, s in enumerate(table.to_pylist()):
+                if s["_ho_text"] is not None:
+                    schedule = s["_ho_text"]
+                elif s["_ho"]:
+                    schedule = json.dumps(s["_ho"], separators=(",", ":"))
+                else:
+                    schedule = None
+                rows.append(SubjectRow(
+                    sheet=s["_sheet"] or s["_cu"], course=s["_cu"], semester=s["_se"], name=s["_di"],
+                    requirements=s["_re"], has_practical=bool(s["_ap"]), has_theory=bool(s["_at"]),
+                    elective=s["_el"], schedule=schedule, turma=s["_cl"] or "A", line=s["_line"] or i + 2,
+                ))
+            self._subjects = rows
+        return self._subjects
+
+    def users(self):
+        return []
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =====================================
+# CLI
+# =====================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Catálogo colunar (Arrow/Parquet) das disciplinas")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="gera o catálogo a partir de JSON e/ou do Horarios.xlsx")
+    build.add_argument("--json", nargs="*", default=[], help="db.json / db_mat.json (listas de disciplinas)")
+    build.add_argument("--db2", help="db2.json com a configuração dos cursos")
+    build.add_argument("--excel", help="Horarios.xlsx (abas de disciplinas + 'cursos')")
+    build.add_argument("--sheets", nargs="+", help="abas de disciplinas (padrão: as do workbook.py)")
+    build.add_argument("--output", "-o", default=CATALOG)
+
+    export = sub.add_parser("export", help="catálogo → db.json e/ou CSV")
+    export.add_argument("catalog")
+    export.add_argument("--json")
+    export.add_argument("--csv")
+    export.add_argument("--csv-lists", choices=("json", "text"), default="json",
+                        help="json: como o convert_db_mat.py; text: como o json_to_csv.py")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            subjects, courses = [], []
+            for path in args.json:
+                subjects.extend(subjects_from_json(path))
+            if args.excel:
+                from workbook import Workbook
+                with Workbook(args.excel, subject_sheets=args.sheets) as book:
+                    s, c = catalog_from_workbook(book)
+                subjects.extend(s)
+                courses.extend(c)
+            if args.db2:
+                courses.extend(courses_from_db2(args.db2))
+            n = write_catalog(args.output, subjects, courses)
+            print(f"✅ {args.output}: {n} disciplinas, {len(courses)} cursos")
+        else:
+            subjects = list(read_subjects(args.catalog))
+            if args.json:
+                write_json(args.json, subjects)
+                print(f"💾 JSON salvo: {args.json}")
+            if args.csv:
+                write_csv(args.csv, subjects, args.csv_lists)
+                print(f"💾 CSV salvo: {args.csv}")
+    except (ImportError, OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Esquema mínimo das tabelas carregadas pelo migration.py e pelo
+csv_to_sql_physics.py (ver horarios.sql,
+scripts/migrations/20260127_fix_time_slots_schema.sql e
+scripts/migrations/20260223_migrate_subject_credits_to_array.sql).
+
+Usado para carregar os scripts gerados num Postgres local ou num SQLite
+"stand-in" sem depender do Supabase.
+"""
+
+TABLES = ["courses", "subjects", "subject_requirements", "days", "time_slots", "classes", "users"]
+
+_SCHEMA = """
+CREATE TABLE courses (
+  id {pk},
+  code VARCHAR(20) NOT NULL,
+  name VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE subjects (
+  id {pk},
+  course_id INT NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+  semester INT,
+  name VARCHAR(150) NOT NULL,
+  has_practical BOOLEAN DEFAULT FALSE,
+  has_theory BOOLEAN DEFAULT TRUE,
+  elective BOOLEAN DEFAULT FALSE,
+  acronym VARCHAR(20),
+  active BOOLEAN DEFAULT TRUE,
+  workload INT DEFAULT 0,
+  category VARCHAR(20),
+  optional BOOLEAN DEFAULT FALSE,
+  credits {int_array}
+);
+
+CREATE TABLE subject_requirements (
+  id {pk},
+  subject_id INT NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+  type VARCHAR(20) NOT NULL,
+  prerequisite_subject_id INT REFERENCES subjects(id) ON DELETE CASCADE,
+  min_credits INT
+);
+
+CREATE TABLE days (
+  id {pk},
+  name VARCHAR(20) NOT NULL UNIQUE
+);
+
+CREATE TABLE time_slots (
+  id {pk},
+  start_time TIME NOT NULL,
+  end_time TIME NOT NULL,
+  course_id INT REFERENCES courses(id) ON DELETE CASCADE,
+  CONSTRAINT uq_time_slot_per_course UNIQUE (start_time, end_time, course_id)
+);
+
+CREATE TABLE classes (
+  subject_id INT NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+  class VARCHAR(10) NOT NULL,
+  day_id INT NOT NULL REFERENCES days(id),
+  time_slot_id INT NOT NULL REFERENCES time_slots(id) ON DELETE CASCADE,
+  PRIMARY KEY (subject_id, class, day_id, time_slot_id)
+);
+
+CREATE TABLE users (
+  id {pk},
+  username VARCHAR(50) NOT NULL UNIQUE,
+  password_hash TEXT NOT NULL,
+  name VARCHAR(100),
+  role VARCHAR(20) NOT NULL,
+  active BOOLEAN DEFAULT TRUE,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def schema_sql(dialect="sqlite"):
+    """DDL das tabelas do catálogo para 'sqlite' ou 'postgres'."""
+    if dialect == "postgres":
+        return _SCHEMA.format(pk="SERIAL PRIMARY KEY", int_array="INT[]")
+    if dialect == "sqlite":
+        # sem arrays no SQLite: credits fica como texto JSON ("[1, 2, 0, 0]")
+        return _SCHEMA.format(pk="INTEGER PRIMARY KEY", int_array="TEXT")
+    raise ValueError(f"dialeto desconhecido: {dialect!r}")
+
+
+def row_counts(conn):
+    """{tabela: linhas} para conferir se duas cargas produziram o mesmo resultado."""
+    cur = conn.cursor()
+    counts = {}
+    for table in TABLES:
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        counts[table] = cur.fetchone()[0]
+    return counts
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Snapshot binário e versionado do catálogo de disciplinas (.snap).
+
+O db.json (indent=2) e o CSV com JSON nas células são lentos de interpretar
+e várias vezes maiores que os dados. O snapshot guarda:
+
+- registros de tamanho fixo (RECORD, 64 bytes) por disciplina
+- uma tabela de strings internadas (_cu, _di, _re, _au, _cl e as siglas do
+  _pr aparecem uma vez só no arquivo)
+- _ho e _ha como máscaras de bits (schedule_codec, 2 palavras u64)
+- _pr (ids de string) e _da (inteiros) em CSR: offsets (n + 1) + valores
+
+O leitor (CatalogSnapshot) abre o arquivo com mmap e não decodifica nada
+antecipadamente: snapshot[i] é uma visão do registro i que lê cada campo do
+mapa quando pedido, e os arrays CSR são memoryviews sobre o próprio mapa.
+Abrir um catálogo de dezenas de milhares de disciplinas custa um mmap.
+
+Layout (little-endian; seções alinhadas em 8 bytes):
+
+    cabeçalho  HEADER: "HCAT", versão u16, reservado u16, tamanho do
+               registro u32, registros u32, strings u32, reservado u32
+    seções     SECTIONS x (offset u64, tamanho u64), na ordem de SECTIONS
+    dados      as seções
+
+No registro, string ausente (None) é NO_STRING e inteiro ausente é NO_INT.
+Ao ler, _ho/_ha voltam como pares [dia, hora] ordenados e sem repetição; o
+_cl (turma) só aparece quando foi gravado (o db.json não tem), e o _ho em
+texto da planilha (_ho_text) não entra no snapshot.
+
+Uso:
+    python catalog_snapshot.py build db.json [catalog.arrow ...] -o catalog.snap [--db2 src/model/db2.json]
+    python catalog_snapshot.py export catalog.snap --json db.json
+    python catalog_snapshot.py info catalog.snap
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import instrumentation
+from catalog_columnar import courses_from_db2, normalize_subject
+from schedule_codec import WORDS, mask_to_pairs, to_mask
+
+SNAPSHOT = "catalog.snap"
+MAGIC = b"HCAT"
+VERSION = 1
+ALIGN = 8
+
+HEADER = struct.Struct("<4sHHIIII")
+SECTION = struct.Struct("<QQ")
+SECTIONS = ("records", "string_offsets", "strings", "pr_offsets", "pr_values", "da_offsets", "da_values", "courses")
+
+# _cu _di _re _au _cl | _se _ap _at | flags | _ho | _ha
+RECORD = struct.Struct(f"<5I3hB5x{WORDS}Q{WORDS}Q")
+STRING_FIELDS = ("_cu", "_di", "_re", "_au", "_cl")
+INT_FIELDS = ("_se", "_ap", "_at")
+FLAG_EL, FLAG_AG = 1, 2
+
+NO_STRING = 0xFFFFFFFF
+NO_INT = -0x8000
+WORD_MASK = (1 << 64) - 1
+
+
+class SnapshotError(ValueError):
+    """Arquivo que não é um snapshot válido, ou registro que não cabe no formato."""
+
+
+# =====================================
+# ESCRITA
+# =====================================
+class _Strings:
+    """Tabela de strings internadas: texto → id (ordem de primeira aparição)."""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def add(self, text):
+        if text is None:
+            return NO_STRING
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = self.ids[text] = len(self.values)
+            self.values.append(text)
+        return sid
+
+
+def _words(mask):
+    return [(mask >> (64 * w)) & WORD_MASK for w in range(WORDS)]
+
+
+def _small_int(subject, field):
+    v = subject[field]
+    if v is None:
+        return NO_INT
+    if not NO_INT < v < 0x8000:
+        raise SnapshotError(f"{field}={v} fora do intervalo do snapshot (disciplina {subject['_re']!r})")
+    return v
+
+
+def _u32(values):
+    data = array("I" if array("I").itemsize == 4 else "L", values)
+    return _little(data)
+
+
+def _i32(values):
+    data = array("i" if array("i").itemsize == 4 else "l", values)
+    return _little(data)
+
+
+def _little(data):
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def encode_snapshot(subjects, courses=None):
+    """Disciplinas (qualquer formato aceito por normalize_subject) → bytes do snapshot."""
+    strings = _Strings()
+    records = bytearray()
+    pr_offsets, pr_values = [0], []
+    da_offsets, da_values = [0], []
+    count = 0
+    for item in subjects:
+        s = normalize_subject(item)
+        try:
+            ho, ha = to_mask(s["_ho"]), to_mask(s["_ha"])
+        except ValueError as e:
+            raise SnapshotError(f"disciplina {s['_re']!r}: {e}") from None
+        flags = (FLAG_EL if s["_el"] else 0) | (FLAG_AG if s["_ag"] else 0)
+        records += RECORD.pack(
+            *(strings.add(s[f]) for f in STRING_FIELDS),
+            *(_small_int(s, f) for f in INT_FIELDS),
+            flags, *_words(ho), *_words(ha),
+        )
+        pr_values.extend(strings.add(p) for p in s["_pr"])
+        pr_offsets.append(len(pr_values))
+        da_values.extend(s["_da"])
+        da_offsets.append(len(da_values))
+        count += 1
+
+    encoded = [v.encode("utf-8") for v in strings.values]
+    string_offsets = [0]
+    for b in encoded:
+        string_offsets.append(string_offsets[-1] + len(b))
+
+    sections = {
+        "records": bytes(records),
+        "string_offsets": _u32(string_offsets),
+        "strings": b"".join(encoded),
+        "pr_offsets": _u32(pr_offsets),
+        "pr_values": _u32(pr_values),
+        "da_offsets": _u32(da_offsets),
+        "da_values": _i32(da_values),
+        "courses": json.dumps(courses or [], ensure_ascii=False).encode("utf-8"),
+    }
+
+    head_size = HEADER.size + SECTION.size * len(SECTIONS)
+    offset = head_size + (-head_size % ALIGN)
+    table, body = [], bytearray(offset - head_size)
+    for name in SECTIONS:
+        data = sections[name]
+        table.append(SECTION.pack(offset, len(data)))
+        body += data
+        pad = -len(data) % ALIGN
+        body += b"\0" * pad
+        offset += len(data) + pad
+
+    header = HEADER.pack(MAGIC, VERSION, 0, RECORD.size, count, len(strings.values), 0)
+    return header + b"".join(table) + bytes(body)
+
+
+def write_snapshot(path, subjects, courses=None):
+    """Grava o snapshot de forma atômica. Retorna o número de disciplinas."""
+    data = encode_snapshot(subjects, courses)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return HEADER.unpack_from(data)[4]
+
+
+# =====================================
+# LEITURA (mmap)
+# =====================================
+class SubjectView:
+    """Visão preguiçosa de um registro: cada atributo é lido do mapa quando acessado."""
+
+    __slots__ = ("_snap", "index")
+
+    def __init__(self, snap, index):
+        self._snap = snap
+        self.index = index
+
+    def __getitem__(self, field):
+        return self._snap.field(self.index, field)
+
+    def get(self, field, default=None):
+        value = self._snap.field(self.index, field)
+        return default if value is None else value
+
+    @property
+    def ho_mask(self):
+        return self._snap.ho_mask(self.index)
+
+    def to_dict(self):
+        """Registro completo no formato do db.json (campos de catalog_columnar.FIELDS + _cl)."""
+        return self._snap.subject(self.index)
+
+    def __repr__(self):
+        return f"<SubjectView {self.index} {self['_re']!r}>"
+
+
+class CatalogSnapshot:
+    """
+    Snapshot aberto com mmap (somente leitura). Context manager.
+
+        with CatalogSnapshot("catalog.snap") as snap:
+            len(snap), snap[0]["_di"], snap.find("1A"), snap.ho_mask(3)
+    """
+
+    def __init__(self, path=SNAPSHOT):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f"{path}: arquivo vazio") from None
+        self._view = memoryview(self._map)
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+        self._strings = {}
+        self._by_code = None
+
+    def _parse_header(self):
+        if len(self._map) < HEADER.size or self._map[:4] != MAGIC:
+            raise SnapshotError(f"{self.path}: não é um snapshot do catálogo")
+        _, version, _, record_size, count, n_strings, _ = HEADER.unpack_from(self._map)
+        if version != VERSION:
+            raise SnapshotError(f"{self.path}: snapshot versão {version}, esperado {VERSION}")
+        if record_size != RECORD.size:
+            raise SnapshotError(f"{self.path}: registro de {record_size} bytes, esperado {RECORD.size}")
+        self.count = count
+        self.string_count = n_strings
+        self._sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, size = SECTION.unpack_from(self._map, HEADER.size + i * SECTION.size)
+            if offset + size > len(self._map):
+                raise SnapshotError(f"{self.path}: seção {name} truncada")
+            self._sections[name] = (offset, size)
+        self._records_at = self._sections["records"][0]
+        self._string_offsets = self._array("string_offsets", "I")
+        self._pr_offsets = self._array("pr_offsets", "I")
+        self._pr_values = self._array("pr_values", "I")
+        self._da_offsets = self._array("da_offsets", "I")
+        self._da_values = self._array("da_values", "i")
+
+    def _section(self, name):
+        offset, size = self._sections[name]
+        return self._view[offset:offset + size]
+
+    def _array(self, name, typecode):
+        """Seção como array de inteiros: memoryview sem cópia (ou cópia em máquina big-endian)."""
+        raw = self._section(name)
+        if sys.byteorder == "little":
+            return raw.cast(typecode)
+        data = array(typecode)
+        data.frombytes(raw)
+        data.byteswap()
+        return data
+
+    # -------------------------------------
+    # Acesso
+    # -------------------------------------
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return SubjectView(self, index)
+
+    def __iter__(self):
+        return (SubjectView(self, i) for i in range(self.count))
+
+    def string(self, sid):
+        if sid == NO_STRING:
+            return None
+        text = self._strings.get(sid)
+        if text is None:
+            lo, hi = self._string_offsets[sid], self._string_offsets[sid + 1]
+            offset = self._sections["strings"][0]
+            text = self._strings[sid] = str(self._view[offset + lo:offset + hi], "utf-8")
+        return text
+
+    def _record(self, index):
+        return RECORD.unpack_from(self._map, self._records_at + index * RECORD.size)
+
+    def field(self, index, field):
+        """Um campo do registro (mesmos nomes e tipos do db.json)."""
+        if field in STRING_FIELDS:
+            sid = struct.unpack_from("<I", self._map, self._records_at + index * RECORD.size
+                                     + 4 * STRING_FIELDS.index(field))[0]
+            return self.string(sid)
+        if field == "_pr":
+            return self.prereqs(index)
+        if field == "_da":
+            return self._da_values[self._da_offsets[index]:self._da_offsets[index + 1]].tolist()
+        r = self._record(index)
+        if field in INT_FIELDS:
+            value = r[5 + INT_FIELDS.index(field)]
+            return None if value == NO_INT else value
+        if field == "_el":
+            return bool(r[8] & FLAG_EL)
+        if field == "_ag":
+            return bool(r[8] & FLAG_AG)
+        if field == "_ho":
+            return mask_to_pairs(self.ho_mask(index))
+        if field == "_ha":
+            return mask_to_pairs(self.ha_mask(index))
+        raise KeyError(field)
+
+    def _mask(self, r, start):
+        mask = 0
+        for w in range(WORDS):
+            mask |= r[start + w] << (64 * w)
+        return mask
+
+    def ho_mask(self, index):
+        """_ho como máscara (schedule_codec) — o que Escolhe/ranking usam, sem montar os pares."""
+        return self._mask(self._record(index), 9)
+
+    def ha_mask(self, index):
+        return self._mask(self._record(index), 9 + WORDS)
+
+    def prereq_ids(self, index):
+        """ids de string do _pr (lista: nenhuma visão do mapa sai do objeto, e close() sempre fecha)."""
+        return self._pr_values[self._pr_offsets[index]:self._pr_offsets[index + 1]].tolist()
+
+    def prereqs(self, index):
+        return [self.string(sid) for sid in self.prereq_ids(index)]
+
+    def subject(self, index):
+        """Registro completo no formato do db.json, com o _cl quando houver turma."""
+        r = self._record(index)
+        strings = dict(zip(STRING_FIELDS, (self.string(sid) for sid in r[:5])))
+        ints = {f: (None if v == NO_INT else v) for f, v in zip(INT_FIELDS, r[5:8])}
+        subject = {
+            "_cu": strings["_cu"],
+            "_se": ints["_se"],
+            "_di": strings["_di"],
+            "_re": strings["_re"],
+            "_ap": ints["_ap"],
+            "_at": ints["_at"],
+            "_el": bool(r[8] & FLAG_EL),
+            "_ag": bool(r[8] & FLAG_AG),
+            "_pr": self.prereqs(index),
+            "_ho": mask_to_pairs(self._mask(r, 9)),
+            "_au": strings["_au"],
+            "_ha": mask_to_pairs(self._mask(r, 9 + WORDS)),
+            "_da": self._da_values[self._da_offsets[index]:self._da_offsets[index + 1]].tolist(),
+        }
+        if strings["_cl"] is not None:
+            subject["_cl"] = strings["_cl"]
+        return subject
+
+    def find(self, code):
+        """Índices dos registros com _re == code (índice montado na primeira chamada)."""
+        if self._by_code is None:
+            self._by_code = {}
+            for i in range(self.count):
+                self._by_code.setdefault(self.field(i, "_re"), []).append(i)
+        return self._by_code.get(code, [])
+
+    def courses(self):
+        """Configuração dos cursos gravada junto (db2.json normalizado), se houver."""
+        return json.loads(str(self._section("courses"), "utf-8") or "[]")
+
+    # -------------------------------------
+    # Ciclo de vida
+    # -------------------------------------
+    def close(self):
+        if self._map is None:
+            return
+        mapped, self._map = self._map, None
+        for name in ("_string_offsets", "_pr_offsets", "_pr_values", "_da_offsets", "_da_values"):
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self._view.release()
+        try:
+            mapped.close()
+        except BufferError:
+            # alguém ainda segura uma visão do mapa: ele é desfeito quando ela for liberada
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def read_subjects(path):
+    """Disciplinas do snapshot como dicts no formato do db.json."""
+    with CatalogSnapshot(path) as snap:
+        for i in range(len(snap)):
+            yield snap.subject(i)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot binário do catálogo de disciplinas")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="db.json / catálogo colunar → snapshot")
+    build.add_argument("inputs", nargs="+", help="db.json / db_mat.json / catálogo .arrow/.parquet")
+    build.add_argument("--db2", help="db2.json com a configuração dos cursos")
+    build.add_argument("--output", "-o", default=SNAPSHOT)
+
+    export = sub.add_parser("export", help="snapshot → db.json")
+    export.add_argument("snapshot")
+    export.add_argument("--json", required=True)
+
+    info = sub.add_parser("info", help="resumo do snapshot")
+    info.add_argument("snapshot")
+
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with instrumentation.Run.from_args("catalog_snapshot", args):
+        try:
+            if args.command == "build":
+                from convert import read_records
+                courses = courses_from_db2(args.db2) if args.db2 else []
+                with instrumentation.stage("build"):
+                    n = write_snapshot(args.output, read_records(args.inputs), courses)
+                instrumentation.count("subjects", n)
+                print(f"✅ {args.output}: {n} disciplinas, {os.path.getsize(args.output) / 1024:.0f}KB")
+            elif args.command == "export":
+                from catalog_columnar import write_json
+                with instrumentation.stage("read"):
+                    subjects = list(read_subjects(args.snapshot))
+                with instrumentation.stage("write"):
+                    write_json(args.json, subjects)
+                instrumentation.count("subjects", len(subjects))
+                print(f"💾 JSON salvo: {args.json}")
+            else:
+                with CatalogSnapshot(args.snapshot) as snap:
+                    print(f"{args.snapshot}: versão {VERSION}, {len(snap)} disciplinas, "
+                          f"{snap.string_count} strings, {len(snap.courses())} cursos")
+                    for name, (_, size) in snap._sections.items():
+                        print(f"  {name:<16} {size:>10} bytes")
+        except (ImportError, OSError, ValueError) as e:
+            instrumentation.fail(e)
+            raise SystemExit(f"❌ {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ponto de entrada único das conversões de catálogo (convert_db_mat.py,
+json_to_csv.py, generate_db2_fields.py e catalog_columnar.py).
+
+Cada disciplina passa uma única vez por um pipeline de estágios:
+
+    leitura → normalize_ho → defaults → exportadores (json, csv, csv-text, catalog)
+
+A entrada é lida em streaming (json_stream) e cada registro é entregue a
+todas as saídas pedidas, sem reler o arquivo por saída.
+
+Estágios e exportadores ficam em registros (STAGES, EXPORTERS); outros podem
+ser plugados pela linha de comando como módulo:função. Um estágio recebe um
+registro (dict) e devolve o registro (ou None para descartá-lo).
+
+Uso:
+    python convert.py src/model/db_mat.json -o src/model/db_mat_transformed.json -o db_mat_matematica.csv
+    python convert.py db.json -o csv-text:db.csv -o catalog.arrow --profile
+    python convert.py db.json --stages normalize_ho meu_modulo:corrige_siglas -o db.csv
+    python convert.py --db2 src/model/db2.json --db2-dir .
+
+O antigo src/transform_ho.py (só _ho matriz → pares, sem defaults) é:
+    python convert.py src/model/db_mat.json --stages normalize_ho -o src/model/db_new.json
+"""
+
+import argparse
+import csv
+import importlib
+import os
+import sys
+import time
+import tracemalloc
+
+import catalog_columnar
+import catalog_snapshot
+import convert_db_mat
+import json_to_csv
+from catalog_columnar import ho_pairs
+from generate_db2_fields import export_course_config
+from json_stream import AtomicTextFile, JsonArrayWriter, iter_json_array
+
+DEFAULT_STAGES = ("normalize_ho", "defaults")
+BATCH_SIZE = 1024
+
+STAGES = {}
+EXPORTERS = {}
+EXTENSIONS = {".json": "json", ".csv": "csv", ".arrow": "catalog", ".parquet": "catalog"}
+
+
+def stage(name):
+    """Registra uma função registro → registro como estágio."""
+    def register(fn):
+        STAGES[name] = fn
+        return fn
+    return register
+
+
+def exporter(name):
+    """
+    Registra uma classe exportadora: Exporter(path); write(registro); close()
+    grava a saída e abort() a descarta (o arquivo de destino não muda).
+    """
+    def register(cls):
+        EXPORTERS[name] = cls
+        return cls
+    return register
+
+
+def load_plugin(spec):
+    """'modulo:atributo' → objeto importado."""
+    module, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"plugin inválido {spec!r} (use modulo:funcao)")
+    return getattr(importlib.import_module(module), attr)
+
+
+# =====================================
+# ESTÁGIOS
+# =====================================
+@stage("normalize_ho")
+def normalize_ho(record):
+    """_ho/_ha como lista de pares [dia, hora] (aceita matriz bool do db_mat.json ou texto JSON)."""
+    for key in ("_ho", "_ha"):
+        if key in record:
+            pairs = ho_pairs(record[key])
+            if pairs is not None:
+                record[key] = pairs
+    return record
+
+
+@stage("defaults")
+def fill_defaults(record):
+    """Campos faltantes e ordem do db.json (convert_db_mat.fill_defaults)."""
+    return convert_db_mat.fill_defaults(record)
+
+
+# =====================================
+# EXPORTADORES
+# =====================================
+@exporter("json")
+class JsonExporter:
+    """Lista no formato do db.json (indent=2)."""
+
+    def __init__(self, path):
+        self._writer = JsonArrayWriter(path).open()
+
+    def write(self, record):
+        self._writer.write(record)
+
+    def close(self):
+        self._writer.close()
+
+    def abort(self):
+        self._writer.abort()
+
+
+@exporter("csv")
+class CsvExporter:
+    """CSV para o Google Sheets com listas em JSON (convert_db_mat.save_csv)."""
+
+    def __init__(self, path):
+        self._row = convert_db_mat.csv_row
+        self._f = AtomicTextFile(path, newline="")
+        self._writer = csv.DictWriter(self._f, fieldnames=convert_db_mat.CSV_FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, record):
+        self._writer.writerow(self._row(record))
+
+    def close(self):
+        self._f.commit()
+
+    def abort(self):
+        self._f.abort()
+
+
+@exporter("csv-text")
+class TextCsvExporter(CsvExporter):
+    """CSV com _pr como "A, B" e _ho/_ha como str() (json_to_csv.py)."""
+
+    def __init__(self, path):
+        self._row = lambda r: json_to_csv.csv_row(dict(r))
+        self._f = AtomicTextFile(path, newline="")
+        self._writer = csv.DictWriter(self._f, fieldnames=json_to_csv.fieldnames, extrasaction="ignore")
+        self._writer.writeheader()
+
+
+@exporter("catalog")
+class CatalogExporter:
+    """Catálogo colunar (.arrow/.parquet), gravado em lotes de BATCH_SIZE registros."""
+
+    def __init__(self, path):
+        self._pa = catalog_columnar._pyarrow()
+        self.path, self._tmp = path, path + ".tmp"
+        self._schema = catalog_columnar.subject_schema()
+        if catalog_columnar.catalog_format(path) == "arrow":
+            self._sink = self._pa.OSFile(self._tmp, "wb")
+            self._writer = self._pa.ipc.new_file(self._sink, self._schema)
+        else:
+            import pyarrow.parquet as pq
+            self._sink = None
+            self._writer = pq.ParquetWriter(self._tmp, self._schema)
+        self._batch = []
+
+    def _flush(self):
+        if self._batch:
+            self._writer.write_batch(self._pa.RecordBatch.from_pylist(self._batch, schema=self._schema))
+            self._batch = []
+
+    def write(self, record):
+        self._batch.append(catalog_columnar.normalize_subject(record))
+        if len(self._batch) >= BATCH_SIZE:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        try:
+            self._writer.close()
+            if self._sink is not None:
+                self._sink.close()
+        finally:
+            if os.path.exists(self._tmp):
+                os.remove(self._tmp)
+
+
+def parse_output(spec):
+    """'formato:caminho' ou só 'caminho' (formato pela extensão) → (formato, caminho)."""
+    fmt, sep, path = spec.partition(":")
+    if sep and fmt in EXPORTERS:
+        return fmt, path
+    ext = os.path.splitext(spec)[1].lower()
+    if ext not in EXTENSIONS:
+        raise ValueError(f"formato de saída desconhecido para {spec!r} (use {', '.join(EXPORTERS)}:caminho)")
+    return EXTENSIONS[ext], spec
+
+
+# =====================================
+# PERFIL
+# =====================================
+class Profiler:
+    """Tempo acumulado e pico de memória alocada (tracemalloc) por estágio."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.seconds = {}
+        self.peak = {}
+        self.calls = {}
+        self.total_peak = 0
+        if enabled:
+            tracemalloc.start()
+
+    def call(self, name, fn, *args):
+        if not self.enabled:
+            return fn(*args)
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        result = fn(*args)
+        self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        self.total_peak = max(self.total_peak, peak)
+        peak -= before
+        self.peak[name] = max(self.peak.get(name, 0), peak)
+        self.calls[name] = self.calls.get(name, 0) + 1
+        return result
+
+    def iterate(self, name, iterable):
+        """Mede o tempo gasto em next() (a leitura)."""
+        it = iter(iterable)
+        while True:
+            try:
+                item = self.call(name, next, it)
+            except StopIteration:
+                return
+            yield item
+
+    def report(self, file=sys.stderr):
+        if not self.enabled:
+            return
+        tracemalloc.stop()
+        print(f"\n{'estágio':<24} {'chamadas':>9} {'tempo':>9} {'pico mem':>10}", file=file)
+        for name, seconds in self.seconds.items():
+            print(f"{name:<24} {self.calls[name]:>9} {seconds:>8.3f}s {self.peak[name] / 1024:>8.1f}KB", file=file)
+        print(f"{'(pico do processo)':<24} {'':>9} {'':>9} {self.total_peak / 1024:>8.1f}KB", file=file)
+
+
+# =====================================
+# PIPELINE
+# =====================================
+class Pipeline:
+    """
+    stages: lista de (nome, função registro → registro | None)
+    exporters: lista de (nome, exportador)
+    """
+
+    def __init__(self, stages, exporters, profiler=None):
+        self.stages = list(stages)
+        self.exporters = list(exporters)
+        self.profiler = profiler or Profiler()
+
+    def run(self, records):
+        """
+        Passa cada registro pelos estágios e por todos os exportadores. Retorna (lidos, gravados).
+
+        Só grava as saídas (close) se tudo passou; se a leitura, um estágio ou
+        um exportador falhar, todas são descartadas (abort) e os arquivos de
+        destino ficam como estavam.
+        """
+        read = written = 0
+        call = self.profiler.call
+        try:
+            for record in self.profiler.iterate("read", records):
+                read += 1
+                for name, fn in self.stages:
+                    record = call(name, fn, record)
+                    if record is None:
+                        break
+                else:
+                    for name, out in self.exporters:
+                        call(f"export:{name}", out.write, record)
+                    written += 1
+        except BaseException:
+            self.abort()
+            raise
+        for name, out in self.exporters:
+            call(f"export:{name}", out.close)
+        return read, written
+
+    def abort(self):
+        for _, out in self.exporters:
+            abort = getattr(out, "abort", None)  # exportadores externos podem não ter abort()
+            if abort is not None:
+                try:
+                    abort()
+                except Exception:
+                    pass
+
+
+def open_exporters(outputs):
+    """[(formato, caminho)] → [(formato, exportador)]; se um falhar ao abrir, descarta os já abertos."""
+    exporters = []
+    try:
+        for fmt, path in outputs:
+            exporters.append((fmt, EXPORTERS[fmt](path)))
+    except BaseException:
+        Pipeline([], exporters).abort()
+        raise
+    return exporters
+
+
+def read_records(paths):
+    """Disciplinas de vários arquivos (JSON em streaming, catálogo colunar ou snapshot), em sequência."""
+    for path in paths:
+        ext = os.path.splitext(path)[1].lower()
+        if ext in (".arrow", ".parquet"):
+            yield from catalog_columnar.read_subjects(path)
+        elif ext == ".snap":
+            yield from catalog_snapshot.read_subjects(path)
+        else:
+            yield from iter_json_array(path)
+
+
+def resolve_stages(names):
+    stages = []
+    for name in names:
+        if name in STAGES:
+            stages.append((name, STAGES[name]))
+        else:
+            stages.append((name, load_plugin(name)))
+    return stages
+
+
+def export_db2(path, directory, profiler, force=False):
+    """db2.json → db2_courses.{csv,json,sql} (generate_db2_fields). Retorna (índice, gerado)."""
+    return profiler.call("export:db2", export_course_config, path, directory, force)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conversões do catálogo em um único pipeline")
+    parser.add_argument("inputs", nargs="*", help="db.json / db_mat.json / catálogo .arrow/.parquet / snapshot .snap")
+    parser.add_argument("--output", "-o", action="append", default=[], metavar="[FORMATO:]ARQUIVO",
+                        help=f"saída (repetível); formatos: {', '.join(EXPORTERS)}")
+    parser.add_argument("--stages", nargs="*", default=list(DEFAULT_STAGES), metavar="ESTÁGIO",
+                        help=f"estágios em ordem: {', '.join(STAGES)} ou modulo:funcao")
+    parser.add_argument("--exporter", action="append", default=[], metavar="NOME=MODULO:CLASSE",
+                        help="registra um exportador externo")
+    parser.add_argument("--db2", help="db2.json: gera a configuração consolidada dos cursos (db2_courses.*)")
+    parser.add_argument("--db2-dir", default=".")
+    parser.add_argument("--force", action="store_true", help="com --db2: regrava mesmo se o db2.json não mudou")
+    parser.add_argument("--profile", action="store_true", help="tempo e pico de memória por estágio (stderr)")
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.db2:
+        parser.error("nada a converter: informe arquivos de entrada e/ou --db2")
+    if args.inputs and not args.output:
+        parser.error("informe ao menos uma saída com -o")
+
+    profiler = Profiler(args.profile)
+    try:
+        for spec in args.exporter:
+            name, _, target = spec.partition("=")
+            EXPORTERS[name] = load_plugin(target)
+
+        if args.inputs:
+            stages = resolve_stages(args.stages)
+            outputs = [parse_output(o) for o in args.output]
+            read, written = Pipeline(stages, open_exporters(outputs), profiler).run(read_records(args.inputs))
+            print(f"✅ {read} disciplinas lidas, {written} gravadas em {len(outputs)} saída(s)")
+            for fmt, path in outputs:
+                print(f"  💾 {fmt}: {path}")
+
+        if args.db2:
+            index, generated = export_db2(args.db2, args.db2_dir, profiler, args.force)
+            if generated:
+                print(f"✅ configuração de {len(index['courses'])} curso(s) em {args.db2_dir}/db2_courses.*")
+            else:
+                print(f"⏭️  {args.db2} não mudou; db2_courses.* mantidos")
+    except (ImportError, OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        profiler.report()
+
+
+if __name__ == '__main__':
+    main()
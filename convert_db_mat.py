@@ -7,11 +7,26 @@ Transformações:
 1. _ho: [[false, false...], [...]] → [[dia, hora], [dia, hora]]
 2. Adicionar campos faltantes: _au, _ha, _da
 3. Exportar como CSV para importar no Google Sheets
+
+Uso:
+    python convert_db_mat.py [--input src/model/db_mat.json] [--stream]
+
+Com --stream o arquivo é lido item a item e o JSON e o CSV são gravados na
+mesma passada, com memória constante (para exportações grandes).
 """
 
+import argparse
 import json
 import csv
 
+import instrumentation
+from json_stream import AtomicTextFile, JsonArrayWriter, iter_json_array
+from schedule_codec import matrix_to_pairs
+
+INPUT = 'src/model/db_mat.json'
+JSON_OUTPUT = 'src/model/db_mat_transformed.json'
+CSV_OUTPUT = 'db_mat_matematica.csv'
+
 def transform_ho(ho_matrix):
     """
     Transforma matriz de horários em lista de coordenadas
@@ -19,65 +34,60 @@ def transform_ho(ho_matrix):
     De: [[false, true, false...], [true, false...], ...]
     Para: [[0, 1], [1, 0], ...]
     """
-    new_ho = []
-    if not isinstance(ho_matrix, list):
-        return []
+    return matrix_to_pairs(ho_matrix)
+
+CSV_FIELDS = ['_cu', '_se', '_di', '_re', '_ap', '_at', '_el', '_ag', '_pr', '_ho', '_au', '_ha', '_da']
+
+def transform_item(item):
+    """Uma disciplina do db_mat.json → registro no formato do db.json"""
+    # Transformar _ho
+    if '_ho' in item:
+        item['_ho'] = transform_ho(item['_ho'])
+    
+    return fill_defaults(item)
+
+def fill_defaults(item):
+    """Completa os campos faltantes e ordena como no db.json"""
+    if '_ho' not in item:
+        item['_ho'] = []
+    
+    # Adicionar campos faltantes se não existirem
+    if '_au' not in item:
+        item['_au'] = ''
+    
+    if '_ha' not in item:
+        item['_ha'] = []
     
-    for dia_idx, dia in enumerate(ho_matrix):
-        if not isinstance(dia, list):
-            continue
-        for hora_idx, val in enumerate(dia):
-            if val:  # Se True ou truthy
-                new_ho.append([dia_idx, hora_idx])
+    if '_da' not in item:
+        item['_da'] = ''
     
-    return new_ho
+    # Garantir ordem dos campos (igual ao db.json)
+    return {
+        '_cu': item.get('_cu', 'matematica'),
+        '_se': item.get('_se', 0),
+        '_di': item.get('_di', ''),
+        '_re': item.get('_re', ''),
+        '_ap': item.get('_ap', 0),
+        '_at': item.get('_at', 0),
+        '_el': item.get('_el', False),
+        '_ag': item.get('_ag', False),
+        '_pr': item.get('_pr', []),
+        '_ho': item['_ho'],
+        '_au': item['_au'],
+        '_ha': item['_ha'],
+        '_da': item['_da']
+    }
 
-def transform_db_mat():
+def transform_db_mat(filename=INPUT):
     """Transforma db_mat.json para o formato padrão"""
     
-    print("📖 Lendo db_mat.json...")
-    with open('src/model/db_mat.json', 'r', encoding='utf-8') as f:
+    print(f"📖 Lendo {filename}...")
+    with open(filename, 'r', encoding='utf-8') as f:
         db = json.load(f)
     
     print(f"✅ {len(db)} disciplinas carregadas")
     
-    transformed = []
-    
-    for idx, item in enumerate(db):
-        # Transformar _ho
-        if '_ho' in item:
-            item['_ho'] = transform_ho(item['_ho'])
-        else:
-            item['_ho'] = []
-        
-        # Adicionar campos faltantes se não existirem
-        if '_au' not in item:
-            item['_au'] = ''
-        
-        if '_ha' not in item:
-            item['_ha'] = []
-        
-        if '_da' not in item:
-            item['_da'] = ''
-        
-        # Garantir ordem dos campos (igual ao db.json)
-        ordered_item = {
-            '_cu': item.get('_cu', 'matematica'),
-            '_se': item.get('_se', 0),
-            '_di': item.get('_di', ''),
-            '_re': item.get('_re', ''),
-            '_ap': item.get('_ap', 0),
-            '_at': item.get('_at', 0),
-            '_el': item.get('_el', False),
-            '_ag': item.get('_ag', False),
-            '_pr': item.get('_pr', []),
-            '_ho': item['_ho'],
-            '_au': item['_au'],
-            '_ha': item['_ha'],
-            '_da': item['_da']
-        }
-        
-        transformed.append(ordered_item)
+    transformed = [transform_item(item) for item in db]
     
     print(f"✅ {len(transformed)} disciplinas transformadas")
     
@@ -89,6 +99,16 @@ def save_json(data, filename):
         json.dump(data, f, ensure_ascii=False, indent=2)
     print(f"💾 JSON salvo: {filename}")
 
+def csv_row(item):
+    """Converte listas e booleanos para strings"""
+    row = item.copy()
+    row['_pr'] = json.dumps(row['_pr'], ensure_ascii=False) if row['_pr'] else '[]'
+    row['_ho'] = json.dumps(row['_ho'], ensure_ascii=False) if row['_ho'] else '[]'
+    row['_ha'] = json.dumps(row['_ha'], ensure_ascii=False) if row['_ha'] else '[]'
+    row['_el'] = str(row['_el']).lower()
+    row['_ag'] = str(row['_ag']).lower()
+    return row
+
 def save_csv(data, filename):
     """Salva dados em CSV para Google Sheets"""
     
@@ -96,50 +116,93 @@ def save_csv(data, filename):
         print("⚠️ Nenhum dado para salvar")
         return
     
-    # Campos do CSV
-    fieldnames = ['_cu', '_se', '_di', '_re', '_ap', '_at', '_el', '_ag', '_pr', '_ho', '_au', '_ha', '_da']
-    
     with open(filename, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
         
         # Escrever cabeçalho
         writer.writeheader()
         
         # Escrever linhas
         for item in data:
-            # Converter listas e booleanos para strings
-            row = item.copy()
-            row['_pr'] = json.dumps(row['_pr'], ensure_ascii=False) if row['_pr'] else '[]'
-            row['_ho'] = json.dumps(row['_ho'], ensure_ascii=False) if row['_ho'] else '[]'
-            row['_ha'] = json.dumps(row['_ha'], ensure_ascii=False) if row['_ha'] else '[]'
-            row['_el'] = str(row['_el']).lower()
-            row['_ag'] = str(row['_ag']).lower()
-            
-            writer.writerow(row)
+            writer.writerow(csv_row(item))
     
     print(f"💾 CSV salvo: {filename}")
     print(f"📊 {len(data)} linhas + 1 cabeçalho")
 
-def main():
+def convert_stream(source, json_output, csv_output, sample_size=3):
+    """
+    Modo incremental: lê o array item a item (json_stream), transforma e
+    grava cada registro no JSON e no CSV na mesma passada. A memória não
+    cresce com o tamanho do arquivo.
+
+    Retorna (total, primeiros 'sample_size' registros).
+    """
+    print(f"📖 Lendo {source} (streaming)...")
+    sample = []
+    # A entrada é aberta antes das saídas, e as saídas vão para .tmp: se a
+    # leitura falhar, db.json e db.csv continuam como estavam
+    with open(source, 'r', encoding='utf-8') as src, \
+            AtomicTextFile(csv_output, newline='') as f, JsonArrayWriter(json_output) as out:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for item in iter_json_array(src):
+            record = transform_item(item)
+            out.write(record)
+            writer.writerow(csv_row(record))
+            if len(sample) < sample_size:
+                sample.append(record)
+    total = out.count
+    print(f"✅ {total} disciplinas transformadas")
+    if total:
+        print(f"💾 JSON salvo: {json_output}")
+        print(f"💾 CSV salvo: {csv_output}")
+        print(f"📊 {total} linhas + 1 cabeçalho")
+    else:
+        print("⚠️ Nenhum dado para salvar")
+    return total, sample
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conversor db_mat.json → db.json + CSV")
+    parser.add_argument("--input", default=INPUT)
+    parser.add_argument("--json-output", default=JSON_OUTPUT)
+    parser.add_argument("--csv-output", default=CSV_OUTPUT)
+    parser.add_argument("--stream", action="store_true",
+                        help="lê e grava item a item, em uma passada (memória constante)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with instrumentation.Run.from_args("convert_db_mat", args):
+        _convert(args)
+
+def _convert(args):
     print("=" * 60)
     print("🔧 Conversor db_mat.json → db.json + CSV")
     print("=" * 60)
     print()
     
     try:
-        # Transformar dados
-        transformed_data = transform_db_mat()
-        
-        print()
-        print("-" * 60)
-        print("💾 Salvando arquivos...")
-        print("-" * 60)
-        
-        # Salvar JSON transformado
-        save_json(transformed_data, 'src/model/db_mat_transformed.json')
-        
-        # Salvar CSV
-        save_csv(transformed_data, 'db_mat_matematica.csv')
+        if args.stream:
+            with instrumentation.stage("stream"):
+                total, sample = convert_stream(args.input, args.json_output, args.csv_output)
+        else:
+            # Transformar dados
+            with instrumentation.stage("transform"):
+                transformed_data = transform_db_mat(args.input)
+            total, sample = len(transformed_data), transformed_data[:3]
+            
+            print()
+            print("-" * 60)
+            print("💾 Salvando arquivos...")
+            print("-" * 60)
+            
+            # Salvar JSON transformado
+            with instrumentation.stage("save_json"):
+                save_json(transformed_data, args.json_output)
+            
+            # Salvar CSV
+            with instrumentation.stage("save_csv"):
+                save_csv(transformed_data, args.csv_output)
+        instrumentation.count("subjects", total)
         
         print()
         print("=" * 60)
@@ -147,14 +210,14 @@ def main():
         print("=" * 60)
         print()
         print("📁 Arquivos gerados:")
-        print("  1. src/model/db_mat_transformed.json - JSON no formato padrão")
-        print("  2. db_mat_matematica.csv - CSV para importar no Google Sheets")
+        print(f"  1. {args.json_output} - JSON no formato padrão")
+        print(f"  2. {args.csv_output} - CSV para importar no Google Sheets")
         print()
         print("📋 Próximos passos:")
         print("  1. Abra o Google Sheets")
         print("  2. Vá para a aba 'matematica'")
         print("  3. Arquivo > Importar > Fazer upload")
-        print("  4. Selecione 'db_mat_matematica.csv'")
+        print(f"  4. Selecione '{args.csv_output}'")
         print("  5. Escolha 'Substituir planilha atual'")
         print("  6. Clique em 'Importar dados'")
         print()
@@ -162,22 +225,25 @@ def main():
         # Mostrar amostra
         print("🔍 Amostra dos primeiros registros:")
         print("-" * 60)
-        for i, item in enumerate(transformed_data[:3]):
+        for i, item in enumerate(sample):
             print(f"\n{i+1}. {item['_re']} - {item['_di']}")
             print(f"   Período: {item['_se']} | AP: {item['_ap']} | AT: {item['_at']}")
             print(f"   Horários: {item['_ho']}")
             if item['_pr']:
                 print(f"   Pré-requisitos: {item['_pr']}")
         
-        if len(transformed_data) > 3:
-            print(f"\n   ... e mais {len(transformed_data) - 3} disciplinas")
+        if total > len(sample):
+            print(f"\n   ... e mais {total - len(sample)} disciplinas")
         
-    except FileNotFoundError:
-        print("❌ Erro: Arquivo 'src/model/db_mat.json' não encontrado!")
+    except FileNotFoundError as e:
+        instrumentation.fail(e)
+        print(f"❌ Erro: Arquivo '{args.input}' não encontrado!")
         print("   Verifique se o arquivo existe no caminho correto.")
     except json.JSONDecodeError as e:
+        instrumentation.fail(e)
         print(f"❌ Erro ao ler JSON: {e}")
     except Exception as e:
+        instrumentation.fail(e)
         print(f"❌ Erro inesperado: {e}")
         import traceback
         traceback.print_exc()
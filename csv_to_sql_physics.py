@@ -8,66 +8,359 @@ Example:
   1A,Introdução às Ciências Experimentais,1,"[1, 2, 0, 0]",[]
   
 Output: SQL statements ready to paste into Supabase
+  (subjects + subject_requirements resolved by acronym),
+  or, with --load URL, the same rows loaded straight into the
+  database in one transaction (see db_loader.py)
 """
 
+import argparse
 import csv
 import json
 import sys
+from collections import namedtuple
+
+import db_loader
+import instrumentation
+from prereq_graph import PrereqGraph, split_prereqs
 
 # Configuration - MODIFY THESE VALUES
 COURSE_ID = 5  # ID for Physics course in your system
 MAKE_OPTIONAL = False  # Set to True to mark subjects as optional (electives)
 
+# credits column: [theory, practice, complementary, other]
+CREDIT_FIELDS = ["theory", "practice", "complementary", "other"]
+CREDITS_PATTERN = r"^\s*\[\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\]\s*$"
+HOURS_PER_CREDIT = 18  # same rule as the app: (_ap + _at) * 18
+
+RowError = namedtuple("RowError", "line column value reason")
+
+class CSVValidationError(ValueError):
+    """One or more CSV rows have an invalid period/credits/prerequisites cell."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        lines = [format_row_error(e) for e in self.errors[:20]]
+        if len(self.errors) > 20:
+            lines.append(f"  ... and {len(self.errors) - 20} more")
+        super().__init__(f"{len(self.errors)} invalid row(s):\n" + "\n".join(lines))
+
+def format_row_error(e):
+    return f"  line {e.line}: {e.column} {e.reason}: {e.value!r}"
+
+def parse_credits_column(values, lines=None):
+    """
+    Decode the whole credits column at once.
+    Returns (credits, errors): credits is an (n, 4) int64 array with
+    [theory, practice, complementary, other] per row (zeros on bad rows),
+    errors is a list of RowError with the CSV line numbers.
+    """
+    import pandas as pd
+
+    col = pd.Series(list(values), dtype="object").fillna("").astype(str)
+    lines = list(lines) if lines is not None else list(range(2, len(col) + 2))
+    found = col.str.extract(CREDITS_PATTERN)
+    credits = found.fillna(0).astype("int64").to_numpy().reshape(len(col), len(CREDIT_FIELDS))
+
+    errors = []
+    for i in found.index[found[0].isna()]:
+        value = col[i]
+        reason = "is empty" if not value.strip() else "is not [theory, practice, complementary, other]"
+        errors.append(RowError(lines[i], "credits", value, reason))
+    return credits, errors
+
+def parse_prerequisites_column(values, lines=None):
+    """
+    Decode the whole prerequisites column.
+    Returns (lists, errors); bad rows become [] and are reported in errors.
+    """
+    values = list(values)
+    lines = list(lines) if lines is not None else list(range(2, len(values) + 2))
+    parsed, errors = [], []
+    for line, value in zip(lines, values):
+        try:
+            parsed.append(parse_prerequisites(value))
+        except ValueError as e:
+            parsed.append([])
+            errors.append(RowError(line, "prerequisites", value, str(e)))
+    return parsed, errors
+
+def parse_period_column(values, lines=None):
+    """
+    Decode the period column.
+    Returns (periods, errors); bad rows become None and are reported in errors.
+    """
+    values = list(values)
+    lines = list(lines) if lines is not None else list(range(2, len(values) + 2))
+    periods, errors = [], []
+    for line, value in zip(lines, values):
+        text = str(value).strip() if value is not None else ""
+        try:
+            periods.append(int(text))
+        except ValueError:
+            periods.append(None)
+            errors.append(RowError(line, "period", value, "is empty" if not text else "is not an integer"))
+    return periods, errors
+
+def parse_credits_list(credits_str):
+    """
+    Parse credits from array format "[1, 2, 0, 0]" to a list
+    Format: [theory, practice, complementary, other]
+    Raises CSVValidationError on a malformed value.
+    """
+    credits, errors = parse_credits_column([credits_str])
+    if errors:
+        raise CSVValidationError(errors)
+    return credits[0].tolist()
+
+def credits_sql(credits_list):
+    return f"ARRAY[{', '.join(map(str, credits_list))}]"
+
 def parse_credits(credits_str):
     """
     Parse credits from array format "[1, 2, 0, 0]" to ARRAY[1, 2, 0, 0]
-    Format: [theory, practice, complementary, other]
     """
-    try:
-        credits_list = json.loads(credits_str.strip())
-        return f"ARRAY[{', '.join(map(str, credits_list))}]"
-    except:
-        return "ARRAY[0, 0, 0, 0]"
+    return credits_sql(parse_credits_list(credits_str))
 
 def parse_prerequisites(prereq_str):
     """
     Parse prerequisites from JSON array format "["1A", "1D"]" to list
     Returns: list of prerequisite acronyms
+    Raises ValueError if the value is not a JSON list of codes.
     """
-    try:
-        if prereq_str.strip() == "[]" or not prereq_str.strip():
-            return []
-        return json.loads(prereq_str.strip())
-    except:
+    text = (prereq_str or "").strip()
+    if text == "[]" or not text:
         return []
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"is not valid JSON ({e.msg})") from None
+    if not isinstance(value, list) or not all(isinstance(v, (str, int)) and not isinstance(v, bool) for v in value):
+        raise ValueError("is not a list of codes")
+    return value
 
-def csv_to_sql(csv_file_path, output_file_path=None):
+def iter_subjects(csv_file_path):
     """
-    Convert CSV to SQL INSERT statements
+    Stream subject rows from the CSV (one dict per row)
     """
-    subjects = []
-    prerequisites_map = {}  # acronym -> list of prerequisite acronyms
-    
-    # Read CSV
     with open(csv_file_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
-            code = row['code'].strip()
-            name = row['name'].strip()
-            period = int(row['period'].strip())
-            credits = row['credits'].strip()
-            prerequisites = row['prerequisites'].strip()
-            
-            subjects.append({
-                'code': code,
-                'name': name,
-                'period': period,
-                'credits': credits,
-                'prerequisites': prerequisites
-            })
-            
-            # Store prerequisites for later
-            prerequisites_map[code] = parse_prerequisites(prerequisites)
+            yield {
+                'code': row['code'].strip(),
+                'name': row['name'].strip(),
+                'period': (row['period'] or '').strip(),
+                'credits': (row['credits'] or '').strip(),
+                'prerequisites': (row['prerequisites'] or '').strip(),
+                'line': reader.line_num,
+                # fields beyond the header (an unquoted comma split a cell)
+                'extra': row.get(None) or [],
+            }
+
+def validate_subjects(subjects):
+    """
+    Batch parse/validate of a list of subject rows.
+    Returns (credits, prerequisites, errors): (n, 4) credits array,
+    prerequisite lists and RowError list (sorted by line).
+    Each row's 'period' is converted to int in place (None if invalid).
+    """
+    lines = [subj.get('line', i + 2) for i, subj in enumerate(subjects)]
+    periods, errors = parse_period_column((subj['period'] for subj in subjects), lines)
+    for subj, period in zip(subjects, periods):
+        subj['period'] = period
+    credits, credit_errors = parse_credits_column((subj['credits'] for subj in subjects), lines)
+    errors += credit_errors
+    prerequisites, prereq_errors = parse_prerequisites_column((subj['prerequisites'] for subj in subjects), lines)
+    errors += prereq_errors
+    for line, subj in zip(lines, subjects):
+        if subj.get('extra'):
+            errors.append(RowError(line, "row", ",".join(subj['extra']),
+                                   f"has {len(subj['extra'])} extra field(s) (unquoted comma?)"))
+    errors.sort(key=lambda e: e.line)
+    return credits, prerequisites, errors
+
+def workload_totals(subjects, credits, make_optional=MAKE_OPTIONAL):
+    """
+    Per-course totals by course_workloads type ('obrigatórias' / 'optativas'):
+    {type: {"subjects", "credits", "hours", "theory", "practice", "complementary", "other"}}
+    credits = theory + practice; hours = credits * HOURS_PER_CREDIT
+    """
+    import numpy as np
+
+    optional = np.array([is_optional_subject(subj, make_optional) for subj in subjects], dtype=bool)
+    credits = np.asarray(credits, dtype="int64").reshape(len(subjects), len(CREDIT_FIELDS))
+    totals = {}
+    for kind, mask in (("obrigatórias", ~optional), ("optativas", optional)):
+        sums = credits[mask].sum(axis=0)
+        total = {"subjects": int(mask.sum())}
+        total.update({field: int(v) for field, v in zip(CREDIT_FIELDS, sums)})
+        total["credits"] = total["theory"] + total["practice"]
+        total["hours"] = total["credits"] * HOURS_PER_CREDIT
+        totals[kind] = total
+    return totals
+
+def check_workloads(totals, workloads, course_id=COURSE_ID):
+    """
+    Compare totals with course_workloads rows (dicts with course_id, type,
+    min_hours, min_credits). Returns a list of shortfall messages.
+    """
+    problems = []
+    for w in workloads:
+        if w.get('course_id') is not None and int(w['course_id']) != course_id:
+            continue
+        total = totals.get(w.get('type'))
+        if total is None:
+            continue
+        if total['hours'] < (w.get('min_hours') or 0):
+            problems.append(f"{w['type']}: {total['hours']}h in CSV < min_hours {w['min_hours']}")
+        if total['credits'] < (w.get('min_credits') or 0):
+            problems.append(f"{w['type']}: {total['credits']} credits in CSV < min_credits {w['min_credits']}")
+    return problems
+
+def workloads_sql(totals, course_id=COURSE_ID):
+    """
+    Read-only check to run after the load: CSV totals next to course_workloads.
+    """
+    values = ",\n        ".join(
+        f"('{kind}', {t['hours']}, {t['credits']})" for kind, t in totals.items()
+    )
+    return [
+        "\n-- Workload check (CSV totals vs course_workloads, Course ID: {})".format(course_id),
+        "WITH csv_totals (type, hours, credits) AS (",
+        "    VALUES",
+        f"        {values}",
+        ")",
+        "SELECT cw.type, cw.min_hours, t.hours, cw.min_credits, t.credits,",
+        "       t.hours >= cw.min_hours AND t.credits >= cw.min_credits AS ok",
+        "FROM course_workloads cw",
+        "JOIN csv_totals t ON t.type = cw.type",
+        f"WHERE cw.course_id = {course_id};",
+    ]
+
+def is_optional_subject(subj, make_optional=MAKE_OPTIONAL):
+    return make_optional or ("Optativa" in subj['name'])
+
+def subject_values(subj, course_id=COURSE_ID, make_optional=MAKE_OPTIONAL, credits=None):
+    """
+    VALUES tuple for one subject (without the trailing comma)
+    credits: already-parsed [theory, practice, complementary, other] row
+    """
+    is_optional = is_optional_subject(subj, make_optional)
+    category = "ELECTIVE" if is_optional else "MANDATORY"
+    
+    # Parse credits
+    if credits is None:
+        credits_array = parse_credits(subj['credits'])
+    else:
+        credits_array = credits_sql([int(c) for c in credits])
+    
+    # Format name and code for SQL (escape single quotes)
+    name_sql = subj['name'].replace("'", "''")
+    code_sql = subj['code'].replace("'", "''")
+    
+    return (
+        f"    ({course_id}, {subj['period']}, '{name_sql}', "
+        f"TRUE, '{code_sql}', 0, '{category}', {str(is_optional).lower()}, {credits_array})"
+    )
+
+def validate_prerequisites(prerequisites_map):
+    """
+    Check that every referenced code exists in the CSV and that the
+    prerequisite graph is acyclic. Raises PrereqGraphError (a ValueError).
+    """
+    graph = PrereqGraph(
+        (code, *split_prereqs(prereqs)) for code, prereqs in prerequisites_map.items()
+    )
+    graph.raise_for_errors()
+    return graph
+
+def requirements_sql(subjects, prerequisites_map, course_id=COURSE_ID):
+    """
+    One set-based INSERT for subject_requirements, keyed on acronym.
+    Numeric prerequisites become CREDITS requirements.
+    subjects: code -> name (or the list of subject dicts)
+    """
+    if isinstance(subjects, dict):
+        names = subjects
+    else:
+        names = {subj['code']: subj['name'] for subj in subjects}
+    pairs, credits = [], []
+    for code, prereqs in prerequisites_map.items():
+        codes, min_credits = split_prereqs(prereqs)
+        pairs.extend((code, p) for p in codes)
+        if min_credits:
+            credits.append((code, min_credits))
+
+    sql_lines = [
+        "\n-- Course Prerequisites (Course ID: {})".format(course_id),
+        "-- Run AFTER the subjects above are inserted\n",
+    ]
+
+    if pairs:
+        sql_lines.append("WITH subject_ids AS (")
+        sql_lines.append(f"    SELECT id, acronym FROM subjects WHERE course_id = {course_id}")
+        sql_lines.append("),")
+        sql_lines.append("prerequisites_data (code, prerequisite) AS (")
+        sql_lines.append("    VALUES")
+        for i, (code, prereq) in enumerate(pairs):
+            sep = "," if i < len(pairs) - 1 else " "
+            sql_lines.append(
+                f"        ('{code.replace(chr(39), chr(39) * 2)}', '{prereq.replace(chr(39), chr(39) * 2)}'){sep}"
+                f"      -- {names[code]} requires {names[prereq]}"
+            )
+        sql_lines.append(")")
+        sql_lines.append("INSERT INTO subject_requirements (subject_id, type, prerequisite_subject_id)")
+        sql_lines.append("SELECT")
+        sql_lines.append("    s1.id as subject_id,")
+        sql_lines.append("    'SUBJECT' as type,")
+        sql_lines.append("    s2.id as prerequisite_subject_id")
+        sql_lines.append("FROM prerequisites_data as pd")
+        sql_lines.append("JOIN subject_ids s1 ON pd.code = s1.acronym")
+        sql_lines.append("JOIN subject_ids s2 ON pd.prerequisite = s2.acronym;")
+
+    if credits:
+        values = ", ".join(f"('{code.replace(chr(39), chr(39) * 2)}', {n})" for code, n in credits)
+        sql_lines.append(f"\nWITH credits_data (code, min_credits) AS (VALUES {values})")
+        sql_lines.append("INSERT INTO subject_requirements (subject_id, type, min_credits)")
+        sql_lines.append("SELECT s.id, 'CREDITS', cd.min_credits")
+        sql_lines.append("FROM credits_data as cd")
+        sql_lines.append(f"JOIN subjects s ON s.acronym = cd.code AND s.course_id = {course_id};")
+
+    if not pairs and not credits:
+        sql_lines.append("-- (no prerequisites)")
+
+    return sql_lines
+
+def read_csv(csv_file_path):
+    """
+    Read and validate the CSV.
+    Returns (subjects, credits, prerequisites_map, graph); raises
+    CSVValidationError / PrereqGraphError on bad rows.
+    """
+    # Read CSV
+    with instrumentation.stage("read"):
+        subjects = list(iter_subjects(csv_file_path))
+    instrumentation.count("rows", len(subjects))
+    
+    with instrumentation.stage("validate"):
+        # Parse/validate credits and prerequisites for all rows at once
+        credits, prerequisites, errors = validate_subjects(subjects)
+        instrumentation.count("errors", len(errors))
+        if errors:
+            raise CSVValidationError(errors)
+        
+        # acronym -> list of prerequisite acronyms
+        prerequisites_map = {subj['code']: prereqs for subj, prereqs in zip(subjects, prerequisites)}
+        
+        # Every referenced code must exist and the graph must be acyclic
+        graph = validate_prerequisites(prerequisites_map)
+    instrumentation.count("requirements", sum(bin(m).count('1') for m in graph.preds))
+    return subjects, credits, prerequisites_map, graph
+
+def csv_to_sql(csv_file_path, output_file_path=None):
+    """
+    Convert CSV to SQL INSERT statements
+    """
+    subjects, credits, prerequisites_map, graph = read_csv(csv_file_path)
     
     # Generate SQL
     sql_lines = [
@@ -92,20 +385,8 @@ def csv_to_sql(csv_file_path, output_file_path=None):
     
     # Add subject rows
     for i, subj in enumerate(subjects):
-        is_optional = MAKE_OPTIONAL or ("Optativa" in subj['name'])
-        category = "ELECTIVE" if is_optional else "MANDATORY"
-        
-        # Parse credits
-        credits_array = parse_credits(subj['credits'])
-        
-        # Format name for SQL (escape single quotes)
-        name_sql = subj['name'].replace("'", "''")
-        
         # Build VALUES tuple
-        values = (
-            f"    ({COURSE_ID}, {subj['period']}, '{name_sql}', "
-            f"TRUE, '{subj['code']}', 0, '{category}', {str(is_optional).lower()}, {credits_array})"
-        )
+        values = subject_values(subj, credits=credits[i])
         
         # Add comma if not last
         if i < len(subjects) - 1:
@@ -115,6 +396,15 @@ def csv_to_sql(csv_file_path, output_file_path=None):
         
         sql_lines.append(values)
     
+    # Prerequisites (one statement, resolved by acronym)
+    with instrumentation.stage("requirements_sql"):
+        sql_lines.extend(requirements_sql(subjects, prerequisites_map))
+    
+    # Workload totals, checked against course_workloads after the load
+    with instrumentation.stage("workloads"):
+        totals = workload_totals(subjects, credits)
+        sql_lines.extend(workloads_sql(totals))
+    
     # Generate full SQL string
     sql_output = "\n".join(sql_lines)
     
@@ -123,37 +413,94 @@ def csv_to_sql(csv_file_path, output_file_path=None):
     
     # Optionally save to file
     if output_file_path:
-        with open(output_file_path, 'w', encoding='utf-8') as f:
+        with instrumentation.stage("write"), open(output_file_path, 'w', encoding='utf-8') as f:
             f.write(sql_output)
         print(f"\n✓ SQL saved to: {output_file_path}")
     
-    # Print prerequisites info (for manual setup if needed)
-    print("\n\n-- PREREQUISITES MAPPING (for reference)")
-    print("-- You may need to create a separate INSERT for subject_requirements")
-    print("-- after the subjects are inserted and have IDs\n")
+    print_summary(graph, totals)
     
+    return sql_output
+
+def print_summary(graph, totals):
+    print(f"\n✓ Prerequisite graph: {graph.subject_count} subjects, "
+          f"{sum(bin(m).count('1') for m in graph.preds)} requirements, "
+          f"{max(graph.level, default=-1) + 1} levels, no cycles")
+    for kind, t in totals.items():
+        print(f"✓ Workload {kind}: {t['subjects']} subjects, {t['credits']} credits, {t['hours']}h")
+
+SUBJECT_COLUMNS = ["course_id", "semester", "name", "active", "acronym", "workload", "category", "optional", "credits"]
+
+# one row per (code, prerequisite) / (code, min_credits), resolved by acronym in the database
+SUBJECT_REQUIREMENT_SQL = (
+    "INSERT INTO subject_requirements (subject_id, type, prerequisite_subject_id) "
+    "SELECT s.id, 'SUBJECT', p.id FROM subjects s, subjects p "
+    "WHERE s.course_id = ? AND s.acronym = ? AND p.course_id = s.course_id AND p.acronym = ?"
+)
+CREDITS_REQUIREMENT_SQL = (
+    "INSERT INTO subject_requirements (subject_id, type, min_credits) "
+    "SELECT id, 'CREDITS', ? FROM subjects WHERE course_id = ? AND acronym = ?"
+)
+
+def subject_row(subj, credits, course_id=COURSE_ID, make_optional=MAKE_OPTIONAL):
+    """Column values for SUBJECT_COLUMNS (same data as subject_values)"""
+    is_optional = is_optional_subject(subj, make_optional)
+    return (course_id, subj['period'], subj['name'], True, subj['code'], 0,
+            "ELECTIVE" if is_optional else "MANDATORY", is_optional, [int(c) for c in credits])
+
+def csv_to_db(csv_file_path, loader, course_id=COURSE_ID):
+    """
+    Load the CSV straight into the database through a db_loader.Loader
+    (subjects, then requirements resolved by acronym), in one transaction.
+    Returns the workload totals.
+    """
+    subjects, credits, prerequisites_map, graph = read_csv(csv_file_path)
+    pairs, min_credits = [], []
     for code, prereqs in prerequisites_map.items():
-        if prereqs:
-            print(f"-- {code} requires: {', '.join(prereqs)}")
+        codes, n = split_prereqs(prereqs)
+        pairs.extend((course_id, code, p) for p in codes)
+        if n:
+            min_credits.append((n, course_id, code))
+
+    with loader.transaction():
+        loader.insert("subjects", SUBJECT_COLUMNS,
+                      (subject_row(subj, credits[i], course_id) for i, subj in enumerate(subjects)))
+        loader.execute_many("subject_requirements", SUBJECT_REQUIREMENT_SQL, pairs)
+        loader.execute_many("subject_requirements", CREDITS_REQUIREMENT_SQL, min_credits)
+
+    with instrumentation.stage("workloads"):
+        totals = workload_totals(subjects, credits)
+    print_summary(graph, totals)
+    return totals
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the physics CSV to SQL INSERT statements",
+                                     epilog="Example: python csv_to_sql_physics.py fisica.csv physics_subjects.sql")
+    parser.add_argument("csv_file")
+    parser.add_argument("output_file", nargs="?")
+    db_loader.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.load and args.output_file:
+        parser.error("output_file and --load are alternatives")
     
-    return sql_output
+    with instrumentation.Run.from_args("csv_to_sql_physics", args):
+        try:
+            if args.load:
+                with db_loader.ConnectionPool(args.load, size=1) as pool:
+                    loader = db_loader.Loader.from_args(pool, args)
+                    csv_to_db(args.csv_file, loader)
+                loader.report()
+                print(f"\n✓ Loaded into {pool.dialect.name}")
+            else:
+                csv_to_sql(args.csv_file, args.output_file)
+        except FileNotFoundError as e:
+            instrumentation.fail(e)
+            print(f"Error: File '{args.csv_file}' not found")
+            sys.exit(1)
+        except Exception as e:
+            instrumentation.fail(e)
+            print(f"Error: {e}")
+            sys.exit(1)
 
 if __name__ == "__main__":
-    # Check command line arguments
-    if len(sys.argv) < 2:
-        print("Usage: python csv_to_sql_physics.py <csv_file> [output_file]")
-        print("\nExample:")
-        print("  python csv_to_sql_physics.py fisica.csv physics_subjects.sql")
-        sys.exit(1)
-    
-    csv_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
-    
-    try:
-        csv_to_sql(csv_file, output_file)
-    except FileNotFoundError:
-        print(f"Error: File '{csv_file}' not found")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
+    main()
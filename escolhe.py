@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Port em Python do gerador de grades (src/model/util/Escolhe.js).
+
+Em vez de percorrer os 2**n subconjuntos como strings binárias e checar
+colisões par a par dentro do loop, a matriz de compatibilidade é montada uma
+vez com máscaras de bits (schedule_codec) e só os conjuntos sem conflito são
+enumerados, por backtracking.
+
+Mesmas regras do exc():
+- toda combinação contém as disciplinas semente (seed_indices)
+- no máximo MAX_SUBJECTS disciplinas
+- duas disciplinas com o mesmo _re não entram juntas
+- disciplinas de outro curso (course_id != main_course_id) não colidem
+
+e mesma ordenação do compare() (peso crítico máximo, tamanho, soma dos pesos),
+com os empates na ordem em que o exc() os encontra.
+
+Colisão é decidida pelos pares [dia, hora] do _ho (formato do db.json), que é
+de onde o _grid do front-end é derivado: duas disciplinas colidem quando têm
+um par igual. Os pares são numerados entre si (interned_masks), então os
+[day_id, time_slot_id] do banco, vindos de _classSchedules, também servem.
+"""
+
+from prereq_graph import PrereqGraph
+from schedule_codec import interned_masks
+
+MAX_SUBJECTS = 8
+
+
+def _bits(mask):
+    """Índices dos bits ligados, em ordem crescente."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def raw_ho(subject):
+    """
+    _ho da disciplina ou, na falta dele, o da primeira turma (_classSchedules).
+    Os pares da turma são IDs do banco ([day_id, time_slot_id]), não índices
+    da grade.
+    """
+    ho = subject.get("_ho")
+    if not ho and subject.get("_classSchedules"):
+        ho = subject["_classSchedules"][0].get("ho")
+    return ho or []
+
+
+def calculate_heights(subjects):
+    """
+    Port do Grafos.calculateHeights: altura (criticidade) de cada _re.
+
+    Altura = tamanho da maior cadeia de disciplinas que dependem dela
+    (0 para quem não é pré-requisito de ninguém). São os pesos do compare().
+    """
+    return PrereqGraph.from_subjects(subjects).weights()
+
+
+class Escolhe:
+    def __init__(self, genesis, weights=None, main_course_id=None, seed_indices=(), max_subjects=MAX_SUBJECTS):
+        self.genesis = list(genesis)
+        self.weights = weights or {}
+        self.main_course_id = main_course_id
+        self.seed_indices = set(seed_indices)
+        self.max_subjects = max_subjects
+        self.n = len(self.genesis)
+
+        self.masks = interned_masks(raw_ho(s) for s in self.genesis)
+        self.w = [self.weights.get(s.get("_re"), 0) for s in self.genesis]
+        self.compat = self._compatibility()
+
+    def _other_course(self, s):
+        return bool(s.get("course_id") and self.main_course_id and s.get("course_id") != self.main_course_id)
+
+    def _compatibility(self):
+        """compat[i]: bitset dos j que podem estar na mesma grade que i."""
+        n = self.n
+        compat = [0] * n
+        other = [self._other_course(s) for s in self.genesis]
+        codes = [s.get("_re") for s in self.genesis]
+        for i in range(n):
+            for j in range(i + 1, n):
+                if codes[i] == codes[j]:
+                    continue
+                if other[i] or other[j] or not (self.masks[i] & self.masks[j]):
+                    compat[i] |= 1 << j
+                    compat[j] |= 1 << i
+        return compat
+
+    # =====================================
+    # ENUMERAÇÃO
+    # =====================================
+    def iter_combinations(self):
+        """Gera cada combinação válida como tupla de índices crescentes (sem ordem de ranking)."""
+        n, limit = self.n, self.max_subjects
+        seeds = 0
+        for s in self.seed_indices:
+            if not 0 <= s < n:
+                return
+            seeds |= 1 << s
+
+        # Sementes precisam ser compatíveis entre si
+        for s in _bits(seeds):
+            if seeds & ~(1 << s) & ~self.compat[s]:
+                return
+        if bin(seeds).count("1") > limit:
+            return
+
+        compat = self.compat
+        chosen = []
+
+        def extend(chosen_mask, cand):
+            if chosen and not (seeds & ~chosen_mask):
+                yield tuple(chosen)
+            if len(chosen) == limit:
+                return
+            for j in _bits(cand):
+                new_mask = chosen_mask | (1 << j)
+                next_cand = cand & compat[j] & ~((2 << j) - 1)
+                missing = seeds & ~new_mask
+                # semente que ficou para trás ou não é mais compatível: ramo morto
+                if missing & ~next_cand:
+                    continue
+                if len(chosen) + 1 + bin(missing).count("1") > limit:
+                    continue
+                chosen.append(j)
+                yield from extend(new_mask, next_cand)
+                chosen.pop()
+
+        yield from extend(0, (1 << n) - 1)
+
+    # =====================================
+    # RANKING (compare)
+    # =====================================
+    def compare_key(self, combo):
+        """Chave de ordenação equivalente ao compare() + ordem estável do exc()."""
+        w = self.w
+        weights = [w[i] for i in combo]
+        order = sum(1 << (self.n - 1 - i) for i in combo)
+        # getMaxWeight do JS começa em 0
+        return (-max(0, *weights), -len(combo), -sum(weights), -order)
+
+    def ranked(self):
+        """Combinações (tuplas de índices) na ordem do exc()."""
+        return sorted(self.iter_combinations(), key=self.compare_key)
+
+    def exc(self):
+        """Como Escolhe.exc(): lista de grades (listas de disciplinas), melhor primeiro."""
+        return [[self.genesis[i] for i in combo] for combo in self.ranked()]
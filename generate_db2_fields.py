@@ -1,106 +1,264 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Script para adicionar campos de db2.json nas abas do Google Sheets
+Script para exportar a configuração dos cursos (db2.json) para a aba 'cursos'
+do Google Sheets
 
-Adiciona os campos:
+Campos de cada curso:
 - name: Nome completo do curso
 - _da: [horários, dias] - dimensões da grade
 - _hd: [[inicio, fim], ...] - horários disponíveis
+
+Gera um único artefato consolidado com todos os cursos, em três formatos:
+- db2_courses.csv: uma linha por curso (_cu, name, _da, _hd), com aspas
+  corretas, para colar na aba 'cursos'
+- db2_courses.json: índice pré-calculado (dimensões da grade e faixas de
+  horário por curso) — quem precisa das dimensões lê daqui com
+  load_course_index / grid_dimensions em vez de deduzir do _da
+- db2_courses.sql: courses + time_slots de cada curso
+
+Os arquivos são gravados de forma atômica (.tmp + rename). O índice guarda o
+SHA-256 do db2.json: se o conteúdo não mudou (e os artefatos existem), nada é
+regravado.
+
+Uso:
+    python generate_db2_fields.py [--input src/model/db2.json] [--output-dir .] [--force]
 """
 
+import argparse
+import csv
+import hashlib
+import io
 import json
+import os
+from datetime import datetime
+
+import instrumentation
+
+INPUT = 'src/model/db2.json'
+BASENAME = 'db2_courses'
+FORMATS = ('csv', 'json', 'sql')
+INDEX_VERSION = 1
+DEFAULT_GRID = [12, 5]
+CSV_FIELDS = ['_cu', 'name', '_da', '_hd']
+
 
 def load_json(filename):
     """Carrega arquivo JSON"""
     with open(filename, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def create_db2_csv():
-    """Cria CSV com campos de db2 para cada curso"""
-    
+
+def file_hash(filename):
+    """SHA-256 do conteúdo do arquivo"""
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def output_paths(directory='.', basename=BASENAME):
+    return {fmt: os.path.join(directory, f"{basename}.{fmt}") for fmt in FORMATS}
+
+
+def write_atomic(filename, text):
+    """Grava em filename.tmp e troca de uma vez (quem lê nunca vê arquivo pela metade)"""
+    tmp = f"{filename}.tmp"
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+    os.replace(tmp, filename)
+
+
+# =====================================
+# ÍNDICE
+# =====================================
+def course_entry(course_config):
+    """Configuração de um curso → entrada do índice"""
+    course_code = course_config['_cu']
+    grid = course_config.get('_da') or DEFAULT_GRID
+    slots = [list(s) for s in course_config.get('_hd') or []]
+    return {
+        'name': course_config.get('name') or course_code.upper(),
+        'hours': int(grid[0]),
+        'days': int(grid[1]),
+        'slots': slots,
+    }
+
+
+def build_index(db2, source=INPUT, digest=None):
+    """Índice {'courses': {_cu: {name, hours, days, slots}}, 'sha256', ...}"""
+    courses = {}
+    for course_config in db2:
+        course_code = course_config['_cu']
+        if course_code in courses:
+            raise ValueError(f"curso {course_code!r} repetido em {source}")
+        courses[course_code] = course_entry(course_config)
+    return {
+        'version': INDEX_VERSION,
+        'source': source,
+        'sha256': digest,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'courses': courses,
+    }
+
+
+def load_course_index(filename=None):
+    """Lê o índice gerado (db2_courses.json)"""
+    index = load_json(filename or output_paths()['json'])
+    if index.get('version') != INDEX_VERSION:
+        raise ValueError(f"índice {filename} tem versão {index.get('version')!r}, esperado {INDEX_VERSION}")
+    return index
+
+
+def grid_dimensions(index, course_code):
+    """(horários, dias) da grade do curso, direto do índice"""
+    entry = index['courses'][course_code]
+    return entry['hours'], entry['days']
+
+
+# =====================================
+# ARTEFATOS
+# =====================================
+def courses_csv(index):
+    """Uma linha por curso, no formato da aba 'cursos' (csv.QUOTE_ALL)"""
+    buf = io.StringIO()
+    writer = csv.writer(buf, quoting=csv.QUOTE_ALL, lineterminator='\n')
+    writer.writerow(CSV_FIELDS)
+    for course_code, entry in index['courses'].items():
+        writer.writerow([
+            course_code,
+            entry['name'],
+            json.dumps([entry['hours'], entry['days']]),
+            json.dumps(entry['slots'], ensure_ascii=False),
+        ])
+    return buf.getvalue()
+
+
+def courses_sql(index):
+    """courses (se ainda não existir) + time_slots (_hd) de cada curso"""
+    from migration import esc, header_sql
+
+    lines = header_sql("CONFIGURAÇÃO DOS CURSOS (db2.json)")
+    lines.append(f"-- sha256: {index['sha256']}")
+    for course_code, entry in index['courses'].items():
+        code = esc(course_code)
+        lines.append(f"\n-- {code}: {entry['hours']} horários x {entry['days']} dias")
+        lines.append(
+            f"INSERT INTO courses (code, name) SELECT '{code}', '{esc(entry['name'])}' "
+            f"WHERE NOT EXISTS (SELECT 1 FROM courses WHERE code = '{code}');"
+        )
+        for start, end in entry['slots']:
+            lines.append(
+                f"INSERT INTO time_slots (start_time, end_time, course_id) "
+                f"SELECT '{esc(start)}', '{esc(end)}', c.id FROM courses c WHERE c.code = '{code}' "
+                f"ON CONFLICT (start_time, end_time, course_id) DO NOTHING;"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def is_up_to_date(paths, digest):
+    """Os artefatos existem e o índice foi gerado a partir deste mesmo conteúdo?"""
+    if not all(os.path.exists(p) for p in paths.values()):
+        return False
+    try:
+        return load_course_index(paths['json']).get('sha256') == digest
+    except (OSError, ValueError):
+        return False
+
+
+def export_course_config(source=INPUT, directory='.', force=False):
+    """
+    Gera db2_courses.{csv,json,sql} em 'directory'.
+
+    Retorna (índice, gerado), com gerado=False quando o db2.json não mudou
+    desde a última exportação (nada é regravado).
+    """
+    paths = output_paths(directory)
+    with instrumentation.stage("hash"):
+        digest = file_hash(source)
+        up_to_date = not force and is_up_to_date(paths, digest)
+    if up_to_date:
+        instrumentation.count("skipped")
+        return load_course_index(paths['json']), False
+
+    with instrumentation.stage("index"):
+        index = build_index(load_json(source), source, digest)
+    instrumentation.count("courses", len(index['courses']))
+    with instrumentation.stage("write"):
+        os.makedirs(directory, exist_ok=True)
+        write_atomic(paths['csv'], courses_csv(index))
+        write_atomic(paths['sql'], courses_sql(index))
+        # o índice por último: só passa a valer quando os outros já estão gravados
+        write_atomic(paths['json'], json.dumps(index, ensure_ascii=False, indent=2) + "\n")
+    return index, True
+
+
+def create_db2_csv(source=INPUT, directory='.', force=False):
+    """Exporta a configuração consolidada de todos os cursos"""
+
     print("=" * 60)
-    print("🔧 Gerador de CSV para Campos de Configuração (db2)")
+    print("🔧 Gerador da Configuração dos Cursos (db2)")
     print("=" * 60)
     print()
-    
-    # Carregar db2.json
-    print("📖 Lendo db2.json...")
-    db2 = load_json('src/model/db2.json')
-    print(f"✅ {len(db2)} configurações de cursos carregadas")
+
+    print(f"📖 Lendo {source}...")
+    index, generated = export_course_config(source, directory, force)
+    paths = output_paths(directory)
+    print(f"✅ {len(index['courses'])} configurações de cursos")
     print()
-    
-    # Para cada curso, gerar um CSV
-    for course_config in db2:
-        course_code = course_config['_cu']
-        
-        print(f"📝 Gerando CSV para curso: {course_code}")
-        
-        # Nome do arquivo
-        filename = f"db2_{course_code}.csv"
-        
-        # Criar CSV
-        with open(filename, 'w', encoding='utf-8') as f:
-            # Cabeçalho
-            f.write('_cu,name,_da,_hd\n')
-            
-            # Dados
-            name = course_config.get('name', course_code.upper())
-            _da = json.dumps(course_config.get('_da', [12, 5]))
-            _hd = json.dumps(course_config.get('_hd', []))
-            
-            # Escrever linha (escapar aspas se necessário)
-            f.write(f'"{course_code}","{name}","{_da}","{_hd}"\n')
-        
-        print(f"   ✅ Arquivo salvo: {filename}")
-        print(f"   📊 Campos: _cu, name, _da, _hd")
+
+    if not generated:
+        print(f"⏭️  {source} não mudou desde a última exportação (use --force para regravar)")
         print()
-    
+        return index
+
+    for course_code, entry in index['courses'].items():
+        print(f"📝 {course_code}: {entry['name']} | grade {entry['hours']}x{entry['days']} | {len(entry['slots'])} horários")
+    print()
+
     print("=" * 60)
-    print("✅ TODOS OS ARQUIVOS GERADOS!")
+    print("✅ ARQUIVOS GERADOS!")
     print("=" * 60)
     print()
-    print("📋 Próximos passos:")
+    print(f"  📊 {paths['csv']} - aba 'cursos' (_cu, name, _da, _hd)")
+    print(f"  🗂️  {paths['json']} - índice com as dimensões da grade")
+    print(f"  🗄️  {paths['sql']} - courses + time_slots")
     print()
-    print("Para cada curso (exemplo: engcomp):")
+    print("📋 Próximos passos:")
     print()
     print("  1. Abra sua planilha do Google Sheets")
-    print("  2. Clique na aba do curso (ex: 'engcomp')")
-    print("  3. Adicione 3 novas colunas à DIREITA:")
-    print("     - name")
-    print("     - _da")
-    print("     - _hd")
-    print()
-    print("  4. Abra o arquivo 'db2_engcomp.csv'")
-    print("  5. Copie os valores de name, _da e _hd")
-    print("  6. Cole na PRIMEIRA LINHA de dados (mesma linha do curso)")
-    print()
-    print("  7. Preencha o campo 'name' para cada disciplina")
-    print("     (pode deixar vazio ou copiar o nome da disciplina)")
-    print()
-    print("  8. Os campos _da e _hd devem ser os MESMOS em todas as linhas")
-    print("     (copie para baixo)")
+    print("  2. Clique na aba 'cursos'")
+    print("  3. Arquivo > Importar > Fazer upload")
+    print(f"  4. Selecione '{paths['csv']}'")
+    print("  5. Escolha 'Substituir planilha atual'")
     print()
     print("📌 IMPORTANTE:")
-    print("  - O campo 'name' pode variar por disciplina")
-    print("  - Os campos '_da' e '_hd' são do CURSO (mesmos para todas)")
+    print("  - Os campos '_da' e '_hd' são do CURSO (uma linha por curso)")
     print()
+    return index
 
-def main():
-    try:
-        create_db2_csv()
-        
-        print("💡 Dica: Use Ctrl+D ou Cmd+D no Google Sheets para")
-        print("   preencher células abaixo com o mesmo valor!")
-        print()
-        
-    except FileNotFoundError as e:
-        print(f"❌ Erro: Arquivo não encontrado - {e}")
-        print("   Execute este script na pasta raiz do projeto")
-    except Exception as e:
-        print(f"❌ Erro inesperado: {e}")
-        import traceback
-        traceback.print_exc()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta a configuração dos cursos (db2.json)")
+    parser.add_argument("--input", default=INPUT)
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--force", action="store_true", help="regrava mesmo se o db2.json não mudou")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with instrumentation.Run.from_args("generate_db2_fields", args):
+        try:
+            create_db2_csv(args.input, args.output_dir, args.force)
+
+        except FileNotFoundError as e:
+            instrumentation.fail(e)
+            print(f"❌ Erro: Arquivo não encontrado - {e}")
+            print("   Execute este script na pasta raiz do projeto")
+        except Exception as e:
+            instrumentation.fail(e)
+            print(f"❌ Erro inesperado: {e}")
+            import traceback
+            traceback.print_exc()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importador genérico de cursos a partir de CSVs (generaliza o csv_to_sql_physics.py).
+
+Entrada: uma pasta com um CSV por curso (mesmo formato do fisica.csv:
+code, name, period, credits, prerequisites) e um manifest.json:
+
+    {"courses": [
+        {"file": "fisica.csv", "course_id": 5},
+        {"file": "quimica.csv", "course_id": 7, "make_optional": false,
+         "workloads": [{"type": "obrigatórias", "min_hours": 2400, "min_credits": 130}]}
+    ]}
+
+"workloads" (opcional) são as linhas de course_workloads do curso: os totais
+de créditos/horas do CSV são conferidos antes da carga.
+
+Cada CSV é lido em streaming por um processo do pool e gravado num arquivo
+parcial; o processo principal só concatena as partes na ordem do manifesto.
+Nenhum catálogo fica inteiro em memória — de cada curso só se guarda o mapa
+sigla → pré-requisitos, para validar o grafo (siglas existentes, sem ciclos).
+
+Saídas:
+- sql (padrão): um único script, em uma transação, com os INSERTs de
+  subjects em lotes e um INSERT ... SELECT de subject_requirements por curso
+- copy: uma pasta com subjects.tsv, requirements.tsv e load.sql (\\copy)
+
+Uso:
+    python import_courses.py cursos/ -o cursos.sql
+    python import_courses.py cursos/ --format copy -o cursos_copy/
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+
+from csv_to_sql_physics import (
+    CSVValidationError,
+    check_workloads,
+    is_optional_subject,
+    iter_subjects,
+    requirements_sql,
+    subject_values,
+    validate_prerequisites,
+    validate_subjects,
+    workload_totals,
+    workloads_sql,
+)
+from migration_copy import copy_value
+from prereq_graph import split_prereqs
+from sql_writer import write_statements
+
+MANIFEST = "manifest.json"
+FORMATS = ("sql", "copy")
+CHUNK_SIZE = 500  # linhas por INSERT ... VALUES
+BATCH = 5000      # linhas validadas por vez (credits/prerequisites vetorizados)
+
+SUBJECT_COLUMNS = ["course_id", "semester", "name", "active", "acronym", "workload", "category", "optional", "credits"]
+REQUIREMENT_COLUMNS = ["course_id", "code", "prerequisite", "min_credits"]
+
+
+@dataclass(frozen=True)
+class CourseEntry:
+    file: str
+    course_id: int
+    make_optional: bool = False
+    name: str = None
+    workloads: tuple = ()  # linhas de course_workloads (type, min_hours, min_credits) para conferir
+
+
+class CourseImportError(ValueError):
+    """Um ou mais cursos com CSV inválido (erros agregados de todos os cursos)."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__(f"{len(self.errors)} curso(s) com erro:\n" + "\n".join(self.errors))
+
+
+def load_manifest(directory, name=MANIFEST):
+    """Lê o manifesto da pasta. Aceita {"courses": [...]} ou a lista direto."""
+    with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("courses", [])
+
+    entries = []
+    for i, item in enumerate(data):
+        if "file" not in item or "course_id" not in item:
+            raise ValueError(f"{name}: entrada {i} precisa de 'file' e 'course_id'")
+        entries.append(CourseEntry(
+            file=item["file"],
+            course_id=int(item["course_id"]),
+            make_optional=bool(item.get("make_optional", False)),
+            name=item.get("name"),
+            workloads=tuple(item.get("workloads", ())),
+        ))
+
+    ids = [e.course_id for e in entries]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{name}: course_id repetido")
+    return entries
+
+
+# =====================================
+# WORKER: um curso → arquivo(s) parcial(is)
+# =====================================
+class _Course:
+    """Estado de um curso durante o spool: pré-requisitos, nomes, totais e erros."""
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.prerequisites = {}
+        self.names = {}
+        self.errors = []
+        self.totals = {}
+        self.count = 0
+
+    def rows(self, path):
+        """(linha, créditos) validados em lotes de BATCH (credits decodificado de uma vez)."""
+        subjects = iter_subjects(path)
+        while True:
+            batch = list(islice(subjects, BATCH))
+            if not batch:
+                return
+            credits, prerequisites, errors = validate_subjects(batch)
+            self.errors.extend(errors)
+            self._add_totals(workload_totals(batch, credits, self.entry.make_optional))
+            for subj, row_credits, prereqs in zip(batch, credits, prerequisites):
+                self.prerequisites[subj['code']] = prereqs
+                self.names[subj['code']] = subj['name']
+                self.count += 1
+                yield subj, row_credits
+
+    def _add_totals(self, totals):
+        for kind, total in totals.items():
+            acc = self.totals.setdefault(kind, dict.fromkeys(total, 0))
+            for k, v in total.items():
+                acc[k] += v
+
+    def finish(self):
+        """Erros de linha primeiro; depois siglas desconhecidas e ciclos."""
+        if self.errors:
+            raise CSVValidationError(self.errors)
+        validate_prerequisites(self.prerequisites)
+
+    def requirement_rows(self):
+        """(sigla, pré-requisito, créditos mínimos) — um por requisito."""
+        for code, prereqs in self.prerequisites.items():
+            codes, min_credits = split_prereqs(prereqs)
+            for p in codes:
+                yield code, p, None
+            if min_credits:
+                yield code, None, min_credits
+
+
+def _subject_chunks(course, rows, chunk_size):
+    """INSERT INTO subjects em lotes de chunk_size linhas."""
+    entry = course.entry
+    header = f"INSERT INTO subjects ({', '.join(SUBJECT_COLUMNS)})\nVALUES"
+    chunk = []
+    for subj, credits in rows:
+        chunk.append(subject_values(subj, entry.course_id, entry.make_optional, credits))
+        if len(chunk) == chunk_size:
+            yield header + "\n" + ",\n".join(chunk) + ";"
+            chunk = []
+    if chunk:
+        yield header + "\n" + ",\n".join(chunk) + ";"
+
+
+def _spool_sql(course, path, out, chunk_size):
+    entry = course.entry
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(f"-- {entry.name or entry.file} (Course ID: {entry.course_id})\n")
+        for statement in _subject_chunks(course, course.rows(path), chunk_size):
+            f.write(statement + "\n")
+        course.finish()
+        for line in requirements_sql(course.names, course.prerequisites, entry.course_id):
+            f.write(line + "\n")
+        for line in workloads_sql(course.totals, entry.course_id):
+            f.write(line + "\n")
+
+
+def _spool_copy(course, path, out, chunk_size):
+    entry = course.entry
+    with open(out + ".subjects", "w", encoding="utf-8", newline="\n") as f:
+        for subj, credits in course.rows(path):
+            is_optional = is_optional_subject(subj, entry.make_optional)
+            row = (entry.course_id, subj['period'], subj['name'], True, subj['code'], 0,
+                   "ELECTIVE" if is_optional else "MANDATORY", is_optional,
+                   "{" + ",".join(str(int(c)) for c in credits) + "}")
+            f.write("\t".join(copy_value(v) for v in row) + "\n")
+
+    course.finish()
+    with open(out + ".requirements", "w", encoding="utf-8", newline="\n") as f:
+        for code, prereq, min_credits in course.requirement_rows():
+            f.write("\t".join(copy_value(v) for v in (entry.course_id, code, prereq, min_credits)) + "\n")
+
+
+def _spool_course(job):
+    """Executado no pool: grava as partes do curso e devolve estatísticas (ou o erro)."""
+    index, entry, directory, spool, fmt, chunk_size = job
+    path = os.path.join(directory, entry.file)
+    out = os.path.join(spool, f"{index:05d}")
+    course = _Course(entry)
+    try:
+        if fmt == "sql":
+            _spool_sql(course, path, out + ".sql", chunk_size)
+        else:
+            _spool_copy(course, path, out, chunk_size)
+    except (OSError, KeyError, ValueError) as e:
+        detail = f"coluna ausente {e}" if isinstance(e, KeyError) else str(e)
+        return {"file": entry.file, "error": f"{entry.file}: {detail}"}
+    return {
+        "file": entry.file,
+        "course_id": entry.course_id,
+        "subjects": course.count,
+        "requirements": sum(1 for _ in course.requirement_rows()),
+        "workloads": course.totals,
+        "warnings": check_workloads(course.totals, entry.workloads, entry.course_id),
+        "error": None,
+    }
+
+
+def spool_courses(directory, entries, spool, fmt="sql", workers=None, chunk_size=CHUNK_SIZE):
+    """Processa os cursos em paralelo; retorna as estatísticas na ordem do manifesto."""
+    jobs = [(i, e, directory, spool, fmt, chunk_size) for i, e in enumerate(entries)]
+    workers = workers if workers is not None else min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [_spool_course(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_spool_course, jobs))
+
+    errors = [r["error"] for r in results if r["error"]]
+    if errors:
+        raise CourseImportError(errors)
+    return results
+
+
+# =====================================
+# MONTAGEM DO PACOTE
+# =====================================
+def _lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def iter_bundle_sql(spool, count, title="IMPORTAÇÃO DE CURSOS (CSV)"):
+    """Script único: cabeçalho, BEGIN, cada curso na ordem do manifesto, COMMIT."""
+    yield "-- ====================================="
+    yield f"-- {title}"
+    yield f"-- DATA: {datetime.now()}"
+    yield "-- =====================================\n"
+    yield "BEGIN;\n"
+    for i in range(count):
+        yield from _lines(os.path.join(spool, f"{i:05d}.sql"))
+        yield ""
+    yield "COMMIT;"
+
+
+def copy_driver_sql():
+    """load.sql do modo copy: subjects direto, requisitos via staging resolvida por sigla."""
+    req_cols = ", ".join(REQUIREMENT_COLUMNS)
+    return [
+        "-- =====================================",
+        "-- IMPORTAÇÃO DE CURSOS VIA COPY",
+        f"-- DATA: {datetime.now()}",
+        "-- Execute dentro desta pasta: psql \"$DATABASE_URL\" -f load.sql",
+        "-- =====================================\n",
+        "\\set ON_ERROR_STOP on",
+        "BEGIN;\n",
+        f"\\copy subjects ({', '.join(SUBJECT_COLUMNS)}) FROM 'subjects.tsv'",
+        "",
+        "CREATE TEMP TABLE stage_requirements "
+        "(course_id integer, code text, prerequisite text, min_credits integer) ON COMMIT DROP;",
+        f"\\copy stage_requirements ({req_cols}) FROM 'requirements.tsv'",
+        "",
+        "INSERT INTO subject_requirements (subject_id, type, prerequisite_subject_id, min_credits)",
+        "SELECT s.id,",
+        "       CASE WHEN r.prerequisite IS NULL THEN 'CREDITS' ELSE 'SUBJECT' END,",
+        "       p.id, r.min_credits",
+        "FROM stage_requirements r",
+        "JOIN subjects s ON s.course_id = r.course_id AND s.acronym = r.code",
+        "LEFT JOIN subjects p ON p.course_id = r.course_id AND p.acronym = r.prerequisite",
+        "WHERE r.prerequisite IS NULL OR p.id IS NOT NULL;",
+        "\nCOMMIT;",
+    ]
+
+
+def write_copy_bundle(spool, count, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for suffix, target in (("subjects", "subjects.tsv"), ("requirements", "requirements.tsv")):
+        with open(os.path.join(out_dir, target), "wb") as dst:
+            for i in range(count):
+                with open(os.path.join(spool, f"{i:05d}.{suffix}"), "rb") as src:
+                    shutil.copyfileobj(src, dst)
+    with open(os.path.join(out_dir, "load.sql"), "w", encoding="utf-8") as f:
+        f.write("\n".join(copy_driver_sql()))
+        f.write("\n")
+
+
+def import_courses(directory, output, fmt="sql", manifest=MANIFEST, workers=None,
+                   chunk_size=CHUNK_SIZE, compress=None):
+    """Pasta de CSVs + manifesto → pacote SQL (arquivo) ou COPY (pasta). Retorna as estatísticas."""
+    if fmt not in FORMATS:
+        raise ValueError(f"formato inválido: {fmt!r} (use {', '.join(FORMATS)})")
+    entries = load_manifest(directory, manifest)
+    with tempfile.TemporaryDirectory(prefix="import_courses_") as spool:
+        results = spool_courses(directory, entries, spool, fmt, workers, chunk_size)
+        if fmt == "sql":
+            write_statements(iter_bundle_sql(spool, len(entries)), output, compress=compress)
+        else:
+            write_copy_bundle(spool, len(entries), output)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa vários cursos (CSV + manifesto) para SQL ou COPY")
+    parser.add_argument("directory", help="pasta com os CSVs e o manifesto")
+    parser.add_argument("--manifest", default=MANIFEST, help="nome do manifesto dentro da pasta")
+    parser.add_argument("--format", choices=FORMATS, default="sql")
+    parser.add_argument("--output", "-o", default=None,
+                        help="arquivo .sql ('-' = stdout, .gz comprime) ou pasta no modo copy")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="linhas por INSERT ... VALUES")
+    args = parser.parse_args(argv)
+
+    output = args.output or ("courses.sql" if args.format == "sql" else "courses_copy")
+    out = sys.stderr if output == "-" else sys.stdout
+    try:
+        results = import_courses(args.directory, output, args.format, args.manifest,
+                                 args.workers, args.chunk_size)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for r in results:
+        print(f"  {r['file']} (course {r['course_id']}): {r['subjects']} disciplinas, "
+              f"{r['requirements']} requisitos", file=out)
+        for kind, t in r["workloads"].items():
+            print(f"    {kind}: {t['credits']} créditos, {t['hours']}h", file=out)
+        for warning in r["warnings"]:
+            print(f"    ⚠️ {warning}", file=sys.stderr)
+    print(f"✅ {output} gerado com sucesso!", file=out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação leve dos scripts do pipeline de dados.
+
+Um Run por execução junta:
+- tempo por etapa (stage), com etapas aninhadas como "pai/filho"
+- contadores de linhas (count)
+- pico de memória: RSS amostrado por uma thread durante cada etapa, e o
+  pico do processo (ru_maxrss)
+- cProfile opcional (arquivo .prof, para pstats/snakeviz)
+
+e grava no fim um relatório JSON (mesmo se o script falhar), para comparar o
+tempo de geração do catálogo entre versões.
+
+Uso num script:
+
+    parser = argparse.ArgumentParser(...)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    with instrumentation.Run.from_args("migration", args):
+        with instrumentation.stage("read"):
+            ...
+        instrumentation.count("subjects", n)
+
+stage() e count() no nível do módulo usam o Run ativo e não fazem nada
+quando não há um; as funções de biblioteca podem chamá-los sem receber o Run.
+
+O relatório vai para --report ARQUIVO ou, se a variável de ambiente
+HORARIOS_REPORT_DIR estiver definida, para
+<dir>/<script>-<AAAAMMDD-HHMMSS>-<pid>.json. Sem nenhum dos dois, nada é
+medido além do tempo (custo desprezível).
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+REPORT_DIR_ENV = "HORARIOS_REPORT_DIR"
+REPORT_VERSION = 1
+SAMPLE_INTERVAL = 0.01  # segundos entre amostras de RSS
+
+_current = None
+
+
+def _page_size():
+    try:
+        return os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+_PAGE = _page_size()
+
+
+def rss_kb():
+    """RSS atual do processo em KB (0 se a plataforma não informar)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE // 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_kb()
+
+
+def peak_rss_kb():
+    """Pico de RSS do processo em KB (ru_maxrss)."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             timeout=2, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _ensure_dir(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+class _Sampler(threading.Thread):
+    """Amostra o RSS a cada 'interval' segundos; peak guarda o maior valor desde o último reset()."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.interval = interval
+        self.peak = rss_kb()
+        self._done = threading.Event()
+
+    def reset(self):
+        peak, self.peak = self.peak, rss_kb()
+        return peak
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            value = rss_kb()
+            if value > self.peak:
+                self.peak = value
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class Run:
+    """
+    Medições de uma execução. Context manager: ativa o Run (stage/count do
+    módulo passam a registrar nele) e grava o relatório na saída.
+    """
+
+    def __init__(self, script, argv=None, report=None, cprofile=None, sample=None):
+        self.script = script
+        self.argv = list(sys.argv[1:] if argv is None else argv)
+        if report is None and os.environ.get(REPORT_DIR_ENV):
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            report = os.path.join(os.environ[REPORT_DIR_ENV], f"{script}-{stamp}-{os.getpid()}.json")
+        self.report_path = report
+        self.cprofile_path = cprofile
+        # amostragem de memória só quando alguém vai ler o resultado
+        self.sample = bool(report or cprofile) if sample is None else sample
+        self.stages = {}
+        self.counters = {}
+        self._local = threading.local()  # pilha de etapas por thread
+        self._sampler = None
+        self._profiler = None
+        self._previous = None
+        self.started_at = None
+        self.seconds = None
+        self.error = None
+
+    @classmethod
+    def from_args(cls, script, args):
+        """Run com as opções de add_arguments (--report, --cprofile)."""
+        return cls(script, report=getattr(args, "report", None), cprofile=getattr(args, "cprofile", None))
+
+    # -------------------------------------
+    # Etapas e contadores
+    # -------------------------------------
+    @property
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def stage(self, name):
+        if self._sampler is not None:
+            # o que foi amostrado até aqui pertence às etapas de fora
+            self._carry_peak(self._sampler.reset())
+        full = "/".join(self._stack + [name])
+        self._stack.append(name)
+        entry = self.stages.setdefault(full, {"calls": 0, "seconds": 0.0, "peak_rss_kb": 0})
+        t0 = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] += time.perf_counter() - t0
+            entry["calls"] += 1
+            self._stack.pop()
+            if self._sampler is not None:
+                peak = max(self._sampler.reset(), rss_kb())
+                entry["peak_rss_kb"] = max(entry["peak_rss_kb"], peak)
+                # o pico da etapa também conta para as etapas que a contêm
+                self._carry_peak(peak)
+
+    def _carry_peak(self, peak):
+        for depth in range(len(self._stack), 0, -1):
+            entry = self.stages.get("/".join(self._stack[:depth]))
+            if entry is not None and peak > entry["peak_rss_kb"]:
+                entry["peak_rss_kb"] = peak
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def fail(self, exc):
+        """Marca a execução como falha (para scripts que tratam a exceção e não a relançam)."""
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    # -------------------------------------
+    # Ciclo de vida
+    # -------------------------------------
+    def __enter__(self):
+        global _current
+        self._previous, _current = _current, self
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+        if self.sample:
+            self._sampler = _Sampler()
+            self._sampler.start()
+        if self.cprofile_path:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _current
+        if self._profiler is not None:
+            self._profiler.disable()
+            _ensure_dir(self.cprofile_path)
+            self._profiler.dump_stats(self.cprofile_path)
+        self.seconds = time.perf_counter() - self._t0
+        if self._sampler is not None:
+            self._sampler.stop()
+        if exc_type is SystemExit:
+            failed = exc.code not in (None, 0)
+        else:
+            failed = exc_type is not None
+        if failed and not self.error:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current = self._previous
+        if self.report_path:
+            self.write_report(self.report_path)
+        return False
+
+    def as_dict(self):
+        return {
+            "version": REPORT_VERSION,
+            "script": self.script,
+            "argv": self.argv,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "started_at": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+            "seconds": self.seconds,
+            "peak_rss_kb": peak_rss_kb(),
+            "stages": [{"name": name, **entry} for name, entry in self.stages.items()],
+            "counters": self.counters,
+            "cprofile": self.cprofile_path,
+            "python": platform.python_version(),
+            "revision": git_revision(),
+        }
+
+    def write_report(self, path):
+        _ensure_dir(path)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+
+# =====================================
+# API NO NÍVEL DO MÓDULO (Run ativo)
+# =====================================
+@contextmanager
+def stage(name):
+    """Etapa do Run ativo (sem Run ativo, não mede nada)."""
+    if _current is None:
+        yield None
+    else:
+        with _current.stage(name) as entry:
+            yield entry
+
+
+def count(name, n=1):
+    """Soma n ao contador do Run ativo."""
+    if _current is not None:
+        _current.count(name, n)
+
+
+def fail(exc):
+    """Marca o Run ativo como falho."""
+    if _current is not None:
+        _current.fail(exc)
+
+
+def current():
+    return _current
+
+
+def add_arguments(parser):
+    """--report e --cprofile num argparse.ArgumentParser."""
+    group = parser.add_argument_group("instrumentação")
+    group.add_argument("--report", metavar="ARQUIVO",
+                       help=f"relatório JSON da execução (padrão: ${REPORT_DIR_ENV}/<script>-<data>.json, se definido)")
+    group.add_argument("--cprofile", metavar="ARQUIVO", help="grava o perfil do cProfile (.prof)")
+    return group
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura e escrita incremental de arrays JSON (db.json, db_mat.json).
+
+iter_json_array lê o array do topo item a item com JSONDecoder.raw_decode
+sobre um buffer de tamanho fixo, sem carregar o arquivo inteiro; a memória
+fica limitada ao maior item + CHUNK_SIZE.
+
+JsonArrayWriter grava os itens à medida que chegam, com a mesma formatação
+de json.dump(lista, indent=2): a saída é idêntica à do modo em memória.
+Gravando num caminho, o array vai para path + ".tmp" (AtomicTextFile) e só
+substitui o arquivo no fim sem erro: uma leitura que falha no meio não deixa
+um db.json truncado no lugar do bom.
+"""
+
+import json
+import os
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\r\n"
+
+
+def _open_text(source):
+    if hasattr(source, "read"):
+        return source, False
+    return open(source, "r", encoding="utf-8"), True
+
+
+def iter_json_array(source, chunk_size=CHUNK_SIZE):
+    """
+    Gera os itens do array JSON do topo de 'source' (caminho ou arquivo texto).
+
+    Levanta ValueError (json.JSONDecodeError) se o conteúdo não for um array
+    JSON válido.
+    """
+    decoder = json.JSONDecoder()
+    f, owned = _open_text(source)
+    try:
+        buf, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in WHITESPACE:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        def expect(chars):
+            skip_ws()
+            if pos >= len(buf) or buf[pos] not in chars:
+                found = buf[pos] if pos < len(buf) else "fim do arquivo"
+                raise json.JSONDecodeError(f"esperado {' ou '.join(chars)}, encontrado {found!r}", buf, pos)
+            return buf[pos]
+
+        def finish():
+            nonlocal pos
+            pos += 1
+            skip_ws()
+            if pos < len(buf):
+                raise json.JSONDecodeError("conteúdo depois do array", buf, pos)
+
+        expect("[")
+        pos += 1
+        if expect("]" + '"{[-0123456789tfn') == "]":
+            finish()
+            return
+        while True:
+            skip_ws()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                # um item completo é seguido de espaço, ',' ou ']'; senão o
+                # buffer pode ter cortado um número ao meio ("-2" de "-2.5")
+                if not eof and (end == len(buf) or buf[end] not in WHITESPACE + ",]"):
+                    fill()
+                    continue
+                break
+            pos = end
+            yield item
+            if expect(",]") == "]":
+                finish()
+                return
+            pos += 1
+    finally:
+        if owned:
+            f.close()
+
+
+class AtomicTextFile:
+    """
+    Arquivo texto gravado em path + ".tmp": commit() o move para path,
+    abort() o apaga e deixa o path existente intacto. Como context manager,
+    faz commit() se o bloco terminar sem exceção e abort() se não.
+    """
+
+    def __init__(self, path, newline=None):
+        self.path = path
+        self.tmp = path + ".tmp"
+        self._f = open(self.tmp, "w", encoding="utf-8", newline=newline)
+
+    def write(self, text):
+        return self._f.write(text)
+
+    def commit(self):
+        self._f.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        self._f.close()
+        try:
+            os.remove(self.tmp)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+
+class JsonArrayWriter:
+    """
+    Escreve um array JSON item a item.
+
+        with JsonArrayWriter("saida.json") as out:
+            for item in itens:
+                out.write(item)
+
+    Fora de um with: open(), write() e, no fim, close() (fecha o array e
+    grava) ou abort() (descarta; o arquivo de destino não muda).
+    """
+
+    def __init__(self, target, indent=2, ensure_ascii=False):
+        self.target = target
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.count = 0
+        self._f = None
+        self._owned = False
+
+    def open(self):
+        if hasattr(self.target, "write"):
+            self._f = self.target
+        else:
+            self._f = AtomicTextFile(self.target)
+            self._owned = True
+        self._f.write("[")
+        return self
+
+    def __enter__(self):
+        return self.open()
+
+    def write(self, item):
+        text = json.dumps(item, ensure_ascii=self.ensure_ascii, indent=self.indent)
+        if self.indent is not None:
+            pad = " " * self.indent
+            text = "\n".join(pad + line for line in text.split("\n"))
+            self._f.write(("," if self.count else "") + "\n" + text)
+        else:
+            self._f.write((", " if self.count else "") + text)
+        self.count += 1
+
+    def close(self):
+        self._f.write("\n]" if self.count and self.indent is not None else "]")
+        if self._owned:
+            self._f.commit()
+
+    def abort(self):
+        """Sem o ']' final; gravando num caminho, o .tmp é apagado."""
+        if self._owned:
+            self._f.abort()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
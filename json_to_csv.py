@@ -1,30 +1,68 @@
+import argparse
 import json
 import csv
 
-# Ler o arquivo JSON
-with open('db.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+import instrumentation
+from json_stream import AtomicTextFile, iter_json_array
 
 # Definir os nomes das colunas
 fieldnames = ['_cu', '_se', '_di', '_re', '_ap', '_at', '_el', '_ag', '_pr', '_ho', '_au', '_ha', '_da']
 
-# Criar o arquivo CSV
-with open('db.csv', 'w', newline='', encoding='utf-8') as f:
-    writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-    
-    # Escrever cabeçalho
-    writer.writeheader()
-    
-    # Escrever cada registro
-    for row in data:
-        # Converter listas para strings para facilitar visualização no Excel
-        if '_pr' in row and isinstance(row['_pr'], list):
-            row['_pr'] = ', '.join(str(x) for x in row['_pr'])
-        if '_ho' in row and isinstance(row['_ho'], list):
-            row['_ho'] = str(row['_ho'])
-        if '_ha' in row and isinstance(row['_ha'], list):
-            row['_ha'] = str(row['_ha'])
-        
-        writer.writerow(row)
-
-print("Arquivo db.csv criado com sucesso!")
+
+def csv_row(row):
+    # Converter listas para strings para facilitar visualização no Excel
+    if '_pr' in row and isinstance(row['_pr'], list):
+        row['_pr'] = ', '.join(str(x) for x in row['_pr'])
+    if '_ho' in row and isinstance(row['_ho'], list):
+        row['_ho'] = str(row['_ho'])
+    if '_ha' in row and isinstance(row['_ha'], list):
+        row['_ha'] = str(row['_ha'])
+    return row
+
+
+def json_to_csv(input_path='db.json', output_path='db.csv', stream=False):
+    """
+    Converte a lista de disciplinas em CSV. Com stream=True o JSON é lido
+    item a item (json_stream) e cada linha é gravada na hora, com memória
+    constante; o CSV vai para output_path + ".tmp" e só substitui o arquivo
+    existente depois que o array inteiro foi lido. Retorna o número de linhas.
+    """
+    if stream:
+        rows = iter_json_array(input_path)
+    else:
+        # Ler o arquivo JSON
+        with open(input_path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+
+    # Criar o arquivo CSV
+    count = 0
+    with AtomicTextFile(output_path, newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+
+        # Escrever cabeçalho
+        writer.writeheader()
+
+        # Escrever cada registro
+        for row in rows:
+            writer.writerow(csv_row(row))
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converte db.json em db.csv")
+    parser.add_argument("input", nargs="?", default="db.json")
+    parser.add_argument("output", nargs="?", default="db.csv")
+    parser.add_argument("--stream", action="store_true", help="lê o JSON item a item (memória constante)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with instrumentation.Run.from_args("json_to_csv", args):
+        with instrumentation.stage("convert"):
+            rows = json_to_csv(args.input, args.output, args.stream)
+        instrumentation.count("rows", rows)
+    print(f"Arquivo {args.output} criado com sucesso!")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,71 +1,36 @@
-import pandas as pd
-import re
+import argparse
+import sys
 from datetime import datetime
+from itertools import islice
+
+import db_loader
+import instrumentation
+from schedule_parser import DAYS, ScheduleParseError, SlotTable, format_error, parse_schedules
+from sql_writer import write_statements
+from workbook import ENGINES, EXCEL, Workbook
 
-EXCEL = "Horarios.xlsx"
 OUTPUT = "migration.sql"
+ENGINE = "pandas"  # ou "streaming" (openpyxl read_only, menor uso de memória)
 
-xlsx = pd.ExcelFile(EXCEL)
-sql = []
+# _ho interpretados em lotes (vetorizado por lote, memória limitada)
+SCHEDULE_BATCH = 5000
 
 def esc(v):
     return str(v).replace("'", "''")
 
-# =====================================
-# HEADER
-# =====================================
-sql.append("-- =====================================")
-sql.append("-- MIGRAÇÃO GERADA AUTOMATICAMENTE")
-sql.append(f"-- DATA: {datetime.now()}")
-sql.append("-- =====================================\n")
-
-# =====================================
-# COURSES
-# =====================================
-df_courses = pd.read_excel(xlsx, "cursos")
-
-sql.append("-- COURSES")
-for _, r in df_courses.iterrows():
-    sql.append(
-    f"INSERT INTO courses (code, name) "
-    f"VALUES ('{esc(r['_cu'])}', '{esc(r['name'])}');"
-)
-
-
-# =====================================
-# SUBJECTS
-# =====================================
-sql.append("\n-- SUBJECTS")
-subject_sheets = ["engcomp", "matematica", "fisica"]
-
-for sheet in subject_sheets:
-    df = pd.read_excel(xlsx, sheet)
-    if df.empty:
-        continue
-
-    for _, r in df.iterrows():
-        sql.append(f"""
-INSERT INTO subjects
-(course_id, semester, name, has_practical, has_theory, elective)
-SELECT
-  c.id,
-  {r['_se'] if not pd.isna(r['_se']) else 'NULL'},
-  '{esc(r['_di'])}',
-  {str(bool(r['_ap'])).lower()},
-  {str(bool(r['_at'])).lower()},
-  {str(bool(r['_el'])).lower()}
-FROM courses c
-WHERE c.code = '{esc(r['_cu'])}';
-""".strip())
-
-# =====================================
-# REQUIREMENTS (_re)
-# =====================================
-sql.append("\n-- SUBJECT REQUIREMENTS")
+def lit(v):
+    """Valor Python → literal SQL (NULL, true/false, número ou string)"""
+    if v is None:
+        return "NULL"
+    if isinstance(v, bool):
+        return str(v).lower()
+    if isinstance(v, int):
+        return str(v)
+    return f"'{esc(v)}'"
 
 def parse_requirements(text):
     reqs = []
-    if pd.isna(text):
+    if text is None:
         return reqs
 
     for part in str(text).split(";"):
@@ -76,89 +41,174 @@ def parse_requirements(text):
             reqs.append(("SUBJECT", part))
     return reqs
 
-for sheet in subject_sheets:
-    df = pd.read_excel(xlsx, sheet)
-    if df.empty:
-        continue
+def iter_parsed_schedule(book, table=None):
+    """Gera (linha, ParsedSchedule, índice) lote a lote, com um SlotTable compartilhado."""
+    table = table or SlotTable()
+    rows = iter(book.subjects())
+    while True:
+        chunk = list(islice(rows, SCHEDULE_BATCH))
+        if not chunk:
+            return
+        parsed = parse_schedules(chunk, table)
+        for i, r in enumerate(chunk):
+            yield r, parsed, i
+
+def validate_schedule(book):
+    """Todos os erros de _ho do workbook (entradas que seriam ignoradas)."""
+    errors = []
+    last = None
+    for _, parsed, _ in iter_parsed_schedule(book):
+        if parsed is not last:
+            errors.extend(parsed.errors)
+            last = parsed
+    return errors
+
+def iter_schedule(book):
+    """Gera (subject, turma, day, start, end, course) para cada horário válido dos _ho."""
+    for r, parsed, i in iter_parsed_schedule(book):
+        for day, start, end in parsed.decoded(i):
+            yield (r.name, r.turma, day, start, end, r.course)
+
+def scan_schedule(book):
+    """
+    Uma única leitura dos _ho: (erros, schedule_map). O main passa o
+    schedule_map para todas as seções (TIME SLOTS, CLASSES, --copy, --load,
+    --check-timetable) em vez de cada uma interpretar os _ho de novo.
+    """
+    errors, schedule = [], []
+    last = None
+    for r, parsed, i in iter_parsed_schedule(book):
+        if parsed is not last:
+            errors.extend(parsed.errors)
+            last = parsed
+        for day, start, end in parsed.decoded(i):
+            schedule.append((r.name, r.turma, day, start, end, r.course))
+    return errors, schedule
+
+def collect_slots(book, schedule=None):
+    """[(start, end, course)] ordenados e sem repetição (do schedule_map, se já lido)."""
+    if schedule is None:
+        schedule = iter_schedule(book)
+    # Adicionando o código do curso ao conjunto para criar slots únicos por curso
+    return sorted({(start, end, cu) for _, _, _, start, end, cu in schedule})
 
-    for _, r in df.iterrows():
-        reqs = parse_requirements(r["_re"])
+def collect_schedule(book):
+    """
+    Lê os _ho de todas as disciplinas (uma vez).
+
+    Retorna (slots, schedule_map):
+    - slots: [(start, end, course)] ordenados e sem repetição
+    - schedule_map: [(subject, turma, day, start, end, course)]
+    """
+    schedule = list(iter_schedule(book))
+    return collect_slots(book, schedule), schedule
+
+def header_sql(title="MIGRAÇÃO GERADA AUTOMATICAMENTE"):
+    return [
+        "-- =====================================",
+        f"-- {title}",
+        f"-- DATA: {datetime.now()}",
+        "-- =====================================\n",
+    ]
+
+def iter_sql(book, schedule=None):
+    """
+    Script no formato original (um INSERT ... SELECT por linha), statement a
+    statement. schedule: o schedule_map de scan_schedule (o main lê os _ho
+    uma vez só); sem ele, TIME SLOTS e CLASSES leem os _ho sob demanda, sem
+    guardar o schedule_map.
+    """
+    yield from header_sql()
+
+    # =====================================
+    # COURSES
+    # =====================================
+    yield "-- COURSES"
+    for r in book.courses():
+        yield (
+            f"INSERT INTO courses (code, name) "
+            f"VALUES ('{esc(r.code)}', '{esc(r.name)}');"
+        )
+
+    # =====================================
+    # SUBJECTS
+    # =====================================
+    yield "\n-- SUBJECTS"
+
+    for r in book.subjects():
+        yield (f"""
+INSERT INTO subjects
+(course_id, semester, name, has_practical, has_theory, elective)
+SELECT
+  c.id,
+  {r.semester if r.semester is not None else 'NULL'},
+  '{esc(r.name)}',
+  {str(r.has_practical).lower()},
+  {str(r.has_theory).lower()},
+  {str(r.elective).lower()}
+FROM courses c
+WHERE c.code = '{esc(r.course)}';
+""".strip())
+
+    # =====================================
+    # REQUIREMENTS (_re)
+    # =====================================
+    yield "\n-- SUBJECT REQUIREMENTS"
+
+    for r in book.subjects():
+        reqs = parse_requirements(r.requirements)
         for kind, val in reqs:
             if kind == "SUBJECT":
-                sql.append(f"""
+                yield (f"""
 INSERT INTO subject_requirements
 (subject_id, type, prerequisite_subject_id)
 SELECT s.id, 'SUBJECT', p.id
 FROM subjects s, subjects p
-WHERE s.name = '{esc(r['_di'])}'
+WHERE s.name = '{esc(r.name)}'
   AND p.name = '{esc(val)}';
 """.strip())
             else:
-                sql.append(f"""
+                yield (f"""
 INSERT INTO subject_requirements
 (subject_id, type, min_credits)
 SELECT id, 'CREDITS', {val}
 FROM subjects
-WHERE name = '{esc(r['_di'])}';
+WHERE name = '{esc(r.name)}';
 """.strip())
 
-# =====================================
-# DAYS & TIME SLOTS
-# =====================================
-sql.append("\n-- DAYS")
-DAYS = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado"]
-
-for d in DAYS:
-    sql.append(
-        f"INSERT INTO days (name) VALUES ('{d}') "
-        f"ON CONFLICT (name) DO NOTHING;"
-    )
-
-sql.append("\n-- TIME SLOTS")
-
-slots = set()
-schedule_map = []
-
-pattern = re.compile(r"(.*?)\((\d{2}:\d{2})-(\d{2}:\d{2})\)")
+    # =====================================
+    # DAYS & TIME SLOTS
+    # =====================================
+    yield "\n-- DAYS"
 
-for sheet in subject_sheets:
-    df = pd.read_excel(xlsx, sheet)
-    if df.empty:
-        continue
+    for d in DAYS:
+        yield (
+            f"INSERT INTO days (name) VALUES ('{d}') "
+            f"ON CONFLICT (name) DO NOTHING;"
+        )
 
-    for _, r in df.iterrows():
-        if pd.isna(r["_ho"]):
-            continue
+    yield "\n-- TIME SLOTS"
 
-        turma = 'A'
-        if '_cl' in df.columns and not pd.isna(r['_cl']):
-            turma = r['_cl']
-
-        for m in pattern.findall(r["_ho"]):
-            day, start, end = m
-            # Adicionando o código do curso ao conjunto para criar slots únicos por curso
-            slots.add((start, end, r["_cu"]))
-            schedule_map.append((r["_di"], turma, day.strip(), start, end, r["_cu"]))
-
-for s, e, cu in sorted(slots):
-    sql.append(f"""
+    for s, e, cu in collect_slots(book, schedule):
+        yield (f"""
 INSERT INTO time_slots (start_time, end_time, course_id)
 SELECT '{s}', '{e}', c.id FROM courses c WHERE c.code = '{esc(cu)}'
 ON CONFLICT (start_time, end_time, course_id) DO NOTHING;
 """.strip())
 
-# =====================================
-# CLASSES
-# =====================================
-sql.append("\n-- CLASSES")
+    # =====================================
+    # CLASSES
+    # =====================================
+    yield "\n-- CLASSES"
 
-for sub, turma, day, start, end, cu in schedule_map:
-    sql.append(f"""
+    classes = schedule if schedule is not None else iter_schedule(book)
+    for sub, turma, day, start, end, cu in classes:
+        yield (f"""
 INSERT INTO classes
 (subject_id, class, day_id, time_slot_id)
 SELECT s.id, '{esc(turma)}', d.id, t.id
 FROM subjects s, days d, time_slots t, courses c
-WHERE c.code = '{cu}'
+WHERE c.code = '{esc(cu)}'
   AND s.course_id = c.id
   AND s.name = '{esc(sub)}'
   AND d.name = '{esc(day)}'
@@ -167,28 +217,143 @@ WHERE c.code = '{cu}'
   AND t.end_time = '{end}';
 """.strip())
 
-# =====================================
-# USERS
-# =====================================
-sql.append("\n-- USERS")
-df_users = pd.read_excel(xlsx, "users")
-
-for _, r in df_users.iterrows():
-    sql.append(
-        f"INSERT INTO users "
-        f"(username, password_hash, name, role, active, created_at) "
-        f"VALUES "
-        f"('{esc(r['username'])}', '{esc(r['passwordHash'])}', "
-        f"'{esc(r['name'])}', '{esc(r['role'])}', "
-        f"{str(bool(r['active'])).lower()}, "
-        f"'{r['createdAt']}') "
-        f"ON CONFLICT (username) DO NOTHING;"
-    )
-
-# =====================================
-# WRITE FILE
-# =====================================
-with open(OUTPUT, "w", encoding="utf-8") as f:
-    f.write("\n".join(sql))
-
-print("migration.sql gerado com sucesso!")
+    # =====================================
+    # USERS
+    # =====================================
+    yield "\n-- USERS"
+
+    for r in book.users():
+        yield (
+            f"INSERT INTO users "
+            f"(username, password_hash, name, role, active, created_at) "
+            f"VALUES "
+            f"('{esc(r.username)}', '{esc(r.password_hash)}', "
+            f"'{esc(r.name)}', '{esc(r.role)}', "
+            f"{str(r.active).lower()}, "
+            f"{lit(r.created_at)}) "
+            f"ON CONFLICT (username) DO NOTHING;"
+        )
+
+def build_sql(book, schedule=None):
+    """Mesmo que iter_sql, mas como lista (para quem precisa do script inteiro)."""
+    return list(iter_sql(book, schedule))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera migration.sql a partir do Horarios.xlsx")
+    parser.add_argument("--excel", default=EXCEL)
+    parser.add_argument("--catalog", metavar="ARQUIVO",
+                        help="lê do catálogo colunar (.arrow/.parquet, ver catalog_columnar.py) em vez do --excel")
+    parser.add_argument("--output", "-o", default=OUTPUT,
+                        help="arquivo de saída ('-' = stdout, para encadear com psql; .gz comprime)")
+    parser.add_argument("--gzip", action="store_true", help="comprime a saída com gzip")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE)
+    parser.add_argument("--sheets", nargs="+", metavar="ABA",
+                        help="abas de disciplinas (padrão: engcomp, matematica, fisica)")
+    parser.add_argument("--bulk", action="store_true",
+                        help="VALUES multi-linha em tabelas de staging + INSERT ... SELECT por entidade")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="linhas por INSERT ... VALUES no modo --bulk")
+    parser.add_argument("--copy", metavar="DIR",
+                        help="grava um arquivo COPY por tabela (IDs resolvidos no cliente) + DIR/load.sql")
+    parser.add_argument("--truncate", action="store_true",
+                        help="com --copy/--load: apaga o catálogo antes de carregar (users é mantida; "
+                             "falha se outras tabelas, como completed_subjects, referenciarem o catálogo)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="emite só UPSERT/DELETE das linhas que mudaram desde o último manifesto")
+    parser.add_argument("--manifest", default=None,
+                        help="manifesto de hashes do modo --incremental (padrão: migration.manifest.json)")
+    parser.add_argument("--strict", action="store_true",
+                        help="aborta se algum _ho for inválido (padrão: avisa e ignora a entrada)")
+    parser.add_argument("--check-timetable", action="store_true",
+                        help="analisa os horários (timetable_analyzer.py) e aborta se houver choques entre "
+                             "obrigatórias ou horários repetidos")
+    db_loader.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if sum(map(bool, (args.copy, args.bulk, args.incremental, args.load))) > 1:
+        parser.error("--copy, --bulk, --incremental e --load são modos alternativos")
+
+    with instrumentation.Run.from_args("migration", args):
+        # Com saída no stdout as mensagens vão para o stderr, para não sujar o SQL
+        out = sys.stderr if args.output == "-" else sys.stdout
+
+        # Cada aba é lida uma única vez; as seções reaproveitam as linhas
+        if args.catalog:
+            from catalog_columnar import CatalogBook
+            source, reader = args.catalog, CatalogBook(args.catalog)
+        else:
+            source, reader = args.excel, Workbook(args.excel, subject_sheets=args.sheets, engine=args.engine)
+        with reader as book:
+            with instrumentation.stage("validate"):
+                errors, schedule = scan_schedule(book)
+                instrumentation.count("schedule_errors", len(errors))
+            if errors and args.strict:
+                raise SystemExit(str(ScheduleParseError(errors)))
+            if errors:
+                print(f"⚠️ {len(errors)} horário(s) _ho inválido(s) serão ignorados:", file=sys.stderr)
+                for e in errors[:20]:
+                    print(format_error(e), file=sys.stderr)
+                if len(errors) > 20:
+                    print(f"  ... e mais {len(errors) - 20}", file=sys.stderr)
+
+            if args.check_timetable:
+                from timetable_analyzer import analyze_book, has_problems, print_report
+                with instrumentation.stage("timetable"):
+                    report = analyze_book(book, schedule=schedule)
+                print_report(report, out=sys.stderr)
+                if has_problems(report):
+                    raise SystemExit("❌ Migração abortada: corrija os horários acima (--check-timetable)")
+
+            if args.copy:
+                from migration_copy import DRIVER, export_copy
+                with instrumentation.stage("export_copy"):
+                    counts = export_copy(book, args.copy, truncate=args.truncate, schedule=schedule)
+                for table, n in counts.items():
+                    instrumentation.count(table, n)
+                    print(f"  {table}: {n} linhas", file=out)
+                print(f"{args.copy}/{DRIVER} gerado com sucesso!", file=out)
+                return
+
+            if args.load:
+                from migration_copy import load_catalog
+                try:
+                    with db_loader.ConnectionPool(args.load, size=1) as pool:
+                        loader = db_loader.Loader.from_args(pool, args)
+                        load_catalog(book, loader, truncate=args.truncate, schedule=schedule)
+                except (ImportError, db_loader.LoadError) as e:
+                    instrumentation.fail(e)
+                    raise SystemExit(f"❌ {e}")
+                loader.report(file=out)
+                print("✅ Catálogo carregado no banco", file=out)
+                return
+
+            if args.incremental:
+                from migration_incremental import MANIFEST, plan_incremental, save_manifest
+                manifest = args.manifest or MANIFEST
+                with instrumentation.stage("plan_incremental"):
+                    statements, hashes, summary = plan_incremental(book, manifest, schedule=schedule)
+                for table, (added, changed, removed) in summary.items():
+                    if added or changed or removed:
+                        print(f"  {table}: +{added} ~{changed} -{removed}", file=out)
+            elif args.bulk:
+                from migration_bulk import iter_bulk_sql
+                statements = iter_bulk_sql(book, chunk_size=args.chunk_size, schedule=schedule)
+            else:
+                statements = iter_sql(book, schedule)
+
+            # =====================================
+            # WRITE FILE (streaming, statement a statement)
+            # =====================================
+            with instrumentation.stage("write"):
+                n, chars = write_statements(statements, args.output, compress=args.gzip or None)
+            instrumentation.count("statements", n)
+            instrumentation.count("chars", chars)
+
+        if args.incremental:
+            save_manifest(manifest, hashes, source)
+            print(f"{manifest} atualizado", file=out)
+
+        print(f"{args.output} gerado com sucesso!", file=out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Modo --bulk do migration.py.
+
+Em vez de um INSERT ... SELECT (com join de 4 tabelas) por turma/requisito,
+carrega as linhas em tabelas temporárias de staging com VALUES multi-linha e
+depois faz poucos INSERT ... SELECT ... JOIN por entidade. O número de
+statements passa a depender do número de entidades, não de linhas.
+"""
+
+from itertools import islice
+
+from migration import DAYS, collect_slots, header_sql, iter_schedule, lit, parse_requirements
+
+# tabela -> colunas (nome, tipo)
+STAGING = {
+    "stage_courses": [("ord", "INT"), ("code", "VARCHAR(20)"), ("name", "VARCHAR(100)")],
+    "stage_subjects": [
+        ("ord", "INT"), ("course_code", "VARCHAR(20)"), ("semester", "INT"), ("name", "VARCHAR(150)"),
+        ("has_practical", "BOOLEAN"), ("has_theory", "BOOLEAN"), ("elective", "BOOLEAN"),
+    ],
+    "stage_requirements": [
+        ("ord", "INT"), ("subject_name", "VARCHAR(150)"), ("type", "VARCHAR(20)"),
+        ("prerequisite_name", "VARCHAR(150)"), ("min_credits", "INT"),
+    ],
+    "stage_time_slots": [("course_code", "VARCHAR(20)"), ("start_time", "TIME"), ("end_time", "TIME")],
+    "stage_classes": [
+        ("ord", "INT"), ("course_code", "VARCHAR(20)"), ("subject_name", "VARCHAR(150)"), ("class", "VARCHAR(10)"),
+        ("day_name", "VARCHAR(20)"), ("start_time", "TIME"), ("end_time", "TIME"),
+    ],
+}
+
+# Os "WHERE true" evitam a ambiguidade JOIN ... ON / ON CONFLICT no parser do SQLite
+LOADS = [
+    ("COURSES", """
+INSERT INTO courses (code, name)
+SELECT st.code, st.name
+FROM stage_courses st
+ORDER BY st.ord;"""),
+    ("SUBJECTS", """
+INSERT INTO subjects
+(course_id, semester, name, has_practical, has_theory, elective)
+SELECT c.id, st.semester, st.name, st.has_practical, st.has_theory, st.elective
+FROM stage_subjects st
+JOIN courses c ON c.code = st.course_code
+ORDER BY st.ord, c.id;"""),
+    ("SUBJECT REQUIREMENTS", """
+INSERT INTO subject_requirements
+(subject_id, type, prerequisite_subject_id)
+SELECT s.id, 'SUBJECT', p.id
+FROM stage_requirements st
+JOIN subjects s ON s.name = st.subject_name
+JOIN subjects p ON p.name = st.prerequisite_name
+WHERE st.type = 'SUBJECT'
+ORDER BY st.ord, s.id, p.id;
+
+INSERT INTO subject_requirements
+(subject_id, type, min_credits)
+SELECT s.id, 'CREDITS', st.min_credits
+FROM stage_requirements st
+JOIN subjects s ON s.name = st.subject_name
+WHERE st.type = 'CREDITS'
+ORDER BY st.ord, s.id;"""),
+    ("TIME SLOTS", """
+INSERT INTO time_slots (start_time, end_time, course_id)
+SELECT st.start_time, st.end_time, c.id
+FROM stage_time_slots st
+JOIN courses c ON c.code = st.course_code
+WHERE true
+ON CONFLICT (start_time, end_time, course_id) DO NOTHING;"""),
+    ("CLASSES", """
+INSERT INTO classes
+(subject_id, class, day_id, time_slot_id)
+SELECT s.id, st.class, d.id, t.id
+FROM stage_classes st
+JOIN courses c ON c.code = st.course_code
+JOIN subjects s ON s.course_id = c.id AND s.name = st.subject_name
+JOIN days d ON d.name = st.day_name
+JOIN time_slots t ON t.course_id = c.id
+  AND t.start_time = st.start_time
+  AND t.end_time = st.end_time
+ORDER BY st.ord;"""),
+]
+
+
+def values_sql(table, columns, rows, chunk_size=1000, suffix=""):
+    """Gera INSERT ... VALUES multi-linha, em blocos de chunk_size linhas."""
+    cols = ", ".join(columns)
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        values = ",\n".join("(" + ", ".join(lit(v) for v in row) + ")" for row in chunk)
+        yield f"INSERT INTO {table} ({cols}) VALUES\n{values}{suffix};"
+
+
+def _requirement_rows(book):
+    ord_ = 0
+    for r in book.subjects():
+        for kind, val in parse_requirements(r.requirements):
+            if kind == "SUBJECT":
+                yield (ord_, r.name, kind, val, None)
+            else:
+                yield (ord_, r.name, kind, None, val)
+            ord_ += 1
+
+
+def staging_rows(book, schedule=None):
+    """
+    Iteradores com as linhas de cada tabela de staging, na ordem do script
+    original. schedule: o schedule_map já lido (migration.scan_schedule); sem
+    ele os _ho são lidos sob demanda.
+    """
+    return {
+        "stage_courses": ((i, r.code, r.name) for i, r in enumerate(book.courses())),
+        "stage_subjects": (
+            (i, r.course, r.semester, r.name, r.has_practical, r.has_theory, r.elective)
+            for i, r in enumerate(book.subjects())
+        ),
+        "stage_requirements": _requirement_rows(book),
+        "stage_time_slots": ((cu, s, e) for s, e, cu in collect_slots(book, schedule)),
+        "stage_classes": (
+            (i, cu, sub, turma, day, start, end)
+            for i, (sub, turma, day, start, end, cu) in enumerate(
+                iter_schedule(book) if schedule is None else schedule)
+        ),
+    }
+
+
+def iter_bulk_sql(book, chunk_size=1000, schedule=None):
+    """Script set-based: staging + um INSERT ... SELECT ... JOIN por entidade."""
+    yield from header_sql("MIGRAÇÃO GERADA AUTOMATICAMENTE (BULK)")
+    yield "BEGIN;\n"
+
+    # =====================================
+    # STAGING
+    # =====================================
+    yield "-- STAGING"
+    rows = staging_rows(book, schedule)
+    for table, columns in STAGING.items():
+        cols = ", ".join(f"{name} {kind}" for name, kind in columns)
+        yield f"CREATE TEMP TABLE {table} ({cols});"
+        yield from values_sql(table, [name for name, _ in columns], rows[table], chunk_size)
+
+    # =====================================
+    # DAYS
+    # =====================================
+    yield "\n-- DAYS"
+    yield from values_sql("days", ["name"], [(d,) for d in DAYS], chunk_size,
+                          suffix="\nON CONFLICT (name) DO NOTHING")
+
+    # =====================================
+    # ENTIDADES (set-based)
+    # =====================================
+    for title, statement in LOADS:
+        yield f"\n-- {title}"
+        yield statement.strip()
+
+    # =====================================
+    # USERS
+    # =====================================
+    yield "\n-- USERS"
+    users = (
+        (r.username, r.password_hash, r.name, r.role, r.active, r.created_at)
+        for r in book.users()
+    )
+    yield from values_sql(
+        "users", ["username", "password_hash", "name", "role", "active", "created_at"],
+        users, chunk_size, suffix="\nON CONFLICT (username) DO NOTHING",
+    )
+
+    yield ""
+    for table in STAGING:
+        yield f"DROP TABLE {table};"
+    yield "\nCOMMIT;"
+
+
+def build_bulk_sql(book, chunk_size=1000):
+    return list(iter_bulk_sql(book, chunk_size))
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Modo --copy DIR do migration.py.
+
+Resolve todos os IDs no cliente (courses.code → id, nome da disciplina → id,
+dia → id, horário → id) e grava um arquivo COPY (texto, separado por TAB) por
+tabela, mais um load.sql que carrega os arquivos via \\copy na ordem das
+dependências. Nenhum join é feito no servidor.
+
+Carga:
+    cd DIR && psql "$DATABASE_URL" -f load.sql
+
+As mesmas linhas também podem ir direto para o banco (--load URL, ver
+load_catalog e db_loader.py).
+"""
+
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from migration import DAYS, iter_schedule, parse_requirements
+
+DRIVER = "load.sql"
+
+# tabela -> colunas, na ordem de carga
+COLUMNS = {
+    "courses": ["id", "code", "name"],
+    "subjects": ["id", "course_id", "semester", "name", "has_practical", "has_theory", "elective"],
+    "subject_requirements": ["id", "subject_id", "type", "prerequisite_subject_id", "min_credits"],
+    "days": ["id", "name"],
+    "time_slots": ["id", "start_time", "end_time", "course_id"],
+    "classes": ["subject_id", "class", "day_id", "time_slot_id"],
+    "users": ["username", "password_hash", "name", "role", "active", "created_at"],
+}
+
+# Tabelas com id SERIAL (sequência precisa ser ressincronizada após o COPY)
+SERIAL_TABLES = ["courses", "subjects", "subject_requirements", "days", "time_slots"]
+
+# Tabelas do catálogo apagadas com --truncate (users nunca é apagada). Sem
+# CASCADE: se outras tabelas (completed_subjects, current_enrollments,
+# equivalencies, course_workloads, ...) apontarem para o catálogo, o Postgres
+# recusa o TRUNCATE em vez de apagar o progresso dos alunos junto.
+CATALOG_TABLES = ["classes", "subject_requirements", "time_slots", "subjects", "days", "courses"]
+
+
+def copy_value(v):
+    """Valor Python → campo do formato texto do COPY."""
+    if v is None:
+        return "\\N"
+    if isinstance(v, bool):
+        return "t" if v else "f"
+    return (
+        str(v)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def resolve_tables(book, schedule=None):
+    """
+    Linhas de cada tabela com IDs já resolvidos.
+
+    Mantém a semântica do script original: disciplinas de cursos que não
+    existem em 'cursos' são descartadas, e requisitos casam pelo nome.
+
+    schedule: [(subject, turma, day, start, end, course)] já interpretados
+    (ver migration.iter_schedule); por padrão os _ho do book são lidos aqui,
+    uma única vez.
+    """
+    if schedule is None:
+        schedule = list(iter_schedule(book))
+    tables = {}
+
+    # COURSES
+    course_ids = defaultdict(list)
+    tables["courses"] = []
+    for r in book.courses():
+        cid = len(tables["courses"]) + 1
+        course_ids[r.code].append(cid)
+        tables["courses"].append((cid, r.code, r.name))
+
+    # SUBJECTS
+    subject_ids = defaultdict(list)             # nome -> ids
+    subject_ids_by_course = defaultdict(list)   # (course_id, nome) -> ids
+    tables["subjects"] = []
+    for r in book.subjects():
+        for cid in course_ids.get(r.course, []):
+            sid = len(tables["subjects"]) + 1
+            subject_ids[r.name].append(sid)
+            subject_ids_by_course[(cid, r.name)].append(sid)
+            tables["subjects"].append(
+                (sid, cid, r.semester, r.name, r.has_practical, r.has_theory, r.elective)
+            )
+
+    # REQUIREMENTS
+    tables["subject_requirements"] = []
+    reqs = tables["subject_requirements"]
+    for r in book.subjects():
+        for kind, val in parse_requirements(r.requirements):
+            for sid in subject_ids.get(r.name, []):
+                if kind == "SUBJECT":
+                    for pid in subject_ids.get(val, []):
+                        reqs.append((len(reqs) + 1, sid, "SUBJECT", pid, None))
+                else:
+                    reqs.append((len(reqs) + 1, sid, "CREDITS", None, val))
+
+    # DAYS
+    day_ids = {d: i + 1 for i, d in enumerate(DAYS)}
+    tables["days"] = [(i, d) for d, i in day_ids.items()]
+
+    # TIME SLOTS
+    slot_ids = {}
+    tables["time_slots"] = []
+    for s, e, cu in sorted({(start, end, cu) for _, _, _, start, end, cu in schedule}):
+        for cid in course_ids.get(cu, []):
+            if (s, e, cid) in slot_ids:
+                continue
+            tid = len(tables["time_slots"]) + 1
+            slot_ids[(s, e, cid)] = tid
+            tables["time_slots"].append((tid, s, e, cid))
+
+    # CLASSES (chave primária: subject_id, class, day_id, time_slot_id)
+    seen = set()
+    tables["classes"] = []
+    for sub, turma, day, start, end, cu in schedule:
+        if day not in day_ids:
+            continue
+        for cid in course_ids.get(cu, []):
+            tid = slot_ids.get((start, end, cid))
+            if tid is None:
+                continue
+            for sid in subject_ids_by_course.get((cid, sub), []):
+                row = (sid, turma, day_ids[day], tid)
+                if row not in seen:
+                    seen.add(row)
+                    tables["classes"].append(row)
+
+    # USERS
+    tables["users"] = [
+        (r.username, r.password_hash, r.name, r.role, r.active, r.created_at)
+        for r in book.users()
+    ]
+    return tables
+
+
+def driver_sql(truncate=False):
+    """load.sql: \\copy de cada arquivo na ordem das dependências."""
+    sql = [
+        "-- =====================================",
+        "-- CARGA VIA COPY (GERADA AUTOMATICAMENTE)",
+        f"-- DATA: {datetime.now()}",
+        "-- Execute dentro desta pasta: psql \"$DATABASE_URL\" -f load.sql",
+        "-- =====================================\n",
+        "\\set ON_ERROR_STOP on",
+        "BEGIN;\n",
+    ]
+    if truncate:
+        sql.append(f"TRUNCATE {', '.join(CATALOG_TABLES)} RESTART IDENTITY;\n")
+
+    for table, columns in COLUMNS.items():
+        if table == "users":
+            continue
+        sql.append(f"\\copy {table} ({', '.join(columns)}) FROM '{table}.tsv'")
+
+    # users mantém o ON CONFLICT (username) DO NOTHING do script original
+    cols = ", ".join(COLUMNS["users"])
+    sql.append("")
+    sql.append("CREATE TEMP TABLE stage_users (LIKE users INCLUDING DEFAULTS) ON COMMIT DROP;")
+    sql.append(f"\\copy stage_users ({cols}) FROM 'users.tsv'")
+    sql.append(f"INSERT INTO users ({cols}) SELECT {cols} FROM stage_users ON CONFLICT (username) DO NOTHING;")
+
+    # Ressincroniza as sequências (mesma ideia de scripts/resync_sequences.sql)
+    sql.append("")
+    for table in SERIAL_TABLES:
+        sql.append(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"coalesce(max(id), 1), max(id) IS NOT null) FROM {table};"
+        )
+
+    sql.append("\nCOMMIT;")
+    return sql
+
+
+def export_copy(book, out_dir, truncate=False, schedule=None):
+    """Grava um <tabela>.tsv por tabela + load.sql. Retorna {tabela: linhas}."""
+    os.makedirs(out_dir, exist_ok=True)
+    tables = resolve_tables(book, schedule)
+
+    for table in COLUMNS:
+        with open(os.path.join(out_dir, f"{table}.tsv"), "w", encoding="utf-8", newline="\n") as f:
+            for row in tables[table]:
+                f.write("\t".join(copy_value(v) for v in row))
+                f.write("\n")
+
+    with open(os.path.join(out_dir, DRIVER), "w", encoding="utf-8") as f:
+        f.write("\n".join(driver_sql(truncate)))
+        f.write("\n")
+
+    return {table: len(rows) for table, rows in tables.items()}
+
+
+def load_catalog(book, loader, truncate=False, schedule=None):
+    """
+    Modo --load do migration.py: as mesmas linhas do --copy gravadas direto
+    no banco pelo db_loader, numa transação. Retorna {tabela: linhas}.
+    """
+    tables = resolve_tables(book, schedule)
+    with loader.transaction():
+        if truncate:
+            loader.truncate(CATALOG_TABLES)
+        for table, columns in COLUMNS.items():
+            if table == "users":
+                # mantém o ON CONFLICT (username) DO NOTHING do script original
+                loader.insert(table, columns, tables[table], on_conflict=["username"])
+            else:
+                loader.insert(table, columns, tables[table])
+        loader.resync_sequences(SERIAL_TABLES)
+    return {table: len(rows) for table, rows in tables.items()}
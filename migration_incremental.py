@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Modo --incremental do migration.py.
+
+Guarda num manifesto (JSON) o hash do conteúdo de cada linha gerada na última
+execução, compara com o Horarios.xlsx atual e emite só os UPSERT/DELETE das
+linhas que mudaram. Todos os statements são idempotentes (NOT EXISTS /
+ON CONFLICT), então rodar o mesmo script duas vezes não duplica nada.
+
+O manifesto descreve o que foi GERADO: aplique o SQL antes da próxima execução.
+Usuários nunca são apagados (só inseridos/atualizados).
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from migration import DAYS, collect_slots, header_sql, iter_schedule, lit, parse_requirements
+
+MANIFEST = "migration.manifest.json"
+MANIFEST_VERSION = 1
+
+# Ordem de dependência (inserções nesta ordem, remoções na ordem inversa)
+TABLES = ["courses", "subjects", "subject_requirements", "days", "time_slots", "classes", "users"]
+
+
+def row_hash(content):
+    data = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+def catalog_rows(book, schedule=None):
+    """
+    {tabela: {chave: conteúdo}} com chaves naturais.
+
+    Disciplinas repetidas (mesmo curso + nome) ficam só com a primeira linha,
+    já que no banco elas não teriam como ser diferenciadas. schedule: o
+    schedule_map já lido (migration.scan_schedule).
+    """
+    if schedule is None:
+        schedule = list(iter_schedule(book))
+    rows = {table: {} for table in TABLES}
+
+    for r in book.courses():
+        rows["courses"].setdefault((r.code,), (r.name,))
+
+    for r in book.subjects():
+        rows["subjects"].setdefault(
+            (r.course, r.name),
+            (r.semester, r.has_practical, r.has_theory, r.elective),
+        )
+        for kind, val in parse_requirements(r.requirements):
+            rows["subject_requirements"][(r.course, r.name, kind, val)] = ()
+
+    for d in DAYS:
+        rows["days"][(d,)] = ()
+
+    for s, e, cu in collect_slots(book, schedule):
+        rows["time_slots"][(cu, s, e)] = ()
+    for sub, turma, day, start, end, cu in schedule:
+        rows["classes"][(cu, sub, turma, day, start, end)] = ()
+
+    for r in book.users():
+        rows["users"].setdefault(
+            (r.username,),
+            (r.password_hash, r.name, r.role, r.active, r.created_at),
+        )
+    return rows
+
+
+def manifest_from_rows(rows):
+    return {
+        table: {json.dumps(list(key), ensure_ascii=False): row_hash(list(content))
+                for key, content in entries.items()}
+        for table, entries in rows.items()
+    }
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {table: {} for table in TABLES}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Manifesto {path} tem versão {data.get('version')!r}, esperado {MANIFEST_VERSION}")
+    tables = data.get("tables", {})
+    return {table: tables.get(table, {}) for table in TABLES}
+
+
+def save_manifest(path, hashes, source):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": MANIFEST_VERSION,
+            "source": source,
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "tables": hashes,
+        }, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def diff(old, new):
+    """{tabela: (adicionadas, alteradas, removidas)} — listas de chaves (tuplas)."""
+    changes = {}
+    for table in TABLES:
+        before, after = old[table], new[table]
+        added = [k for k in after if k not in before]
+        changed = [k for k in after if k in before and before[k] != after[k]]
+        removed = [k for k in before if k not in after]
+        changes[table] = tuple(
+            [tuple(json.loads(k)) for k in keys] for keys in (added, changed, removed)
+        )
+    return changes
+
+
+# =====================================
+# STATEMENTS
+# =====================================
+def upsert_sql(table, key, content):
+    if table == "courses":
+        (code,), (name,) = key, content
+        return (
+            f"UPDATE courses SET name = {lit(name)} WHERE code = {lit(code)};\n"
+            f"INSERT INTO courses (code, name) SELECT {lit(code)}, {lit(name)} "
+            f"WHERE NOT EXISTS (SELECT 1 FROM courses WHERE code = {lit(code)});"
+        )
+    if table == "subjects":
+        (cu, name), (se, ap, at, el) = key, content
+        return f"""
+UPDATE subjects s
+SET semester = {lit(se)}, has_practical = {lit(ap)}, has_theory = {lit(at)}, elective = {lit(el)}
+FROM courses c
+WHERE c.id = s.course_id AND c.code = {lit(cu)} AND s.name = {lit(name)};
+INSERT INTO subjects
+(course_id, semester, name, has_practical, has_theory, elective)
+SELECT c.id, {lit(se)}, {lit(name)}, {lit(ap)}, {lit(at)}, {lit(el)}
+FROM courses c
+WHERE c.code = {lit(cu)}
+  AND NOT EXISTS (SELECT 1 FROM subjects s WHERE s.course_id = c.id AND s.name = {lit(name)});
+""".strip()
+    if table == "subject_requirements":
+        cu, name, kind, val = key
+        if kind == "SUBJECT":
+            return f"""
+INSERT INTO subject_requirements
+(subject_id, type, prerequisite_subject_id)
+SELECT s.id, 'SUBJECT', p.id
+FROM subjects s
+JOIN courses c ON c.id = s.course_id
+JOIN subjects p ON p.name = {lit(val)}
+WHERE c.code = {lit(cu)} AND s.name = {lit(name)}
+  AND NOT EXISTS (
+    SELECT 1 FROM subject_requirements r
+    WHERE r.subject_id = s.id AND r.type = 'SUBJECT' AND r.prerequisite_subject_id = p.id
+  );
+""".strip()
+        return f"""
+INSERT INTO subject_requirements
+(subject_id, type, min_credits)
+SELECT s.id, 'CREDITS', {lit(val)}
+FROM subjects s
+JOIN courses c ON c.id = s.course_id
+WHERE c.code = {lit(cu)} AND s.name = {lit(name)}
+  AND NOT EXISTS (
+    SELECT 1 FROM subject_requirements r
+    WHERE r.subject_id = s.id AND r.type = 'CREDITS' AND r.min_credits = {lit(val)}
+  );
+""".strip()
+    if table == "days":
+        (name,) = key
+        return f"INSERT INTO days (name) VALUES ({lit(name)}) ON CONFLICT (name) DO NOTHING;"
+    if table == "time_slots":
+        cu, s, e = key
+        return f"""
+INSERT INTO time_slots (start_time, end_time, course_id)
+SELECT '{s}', '{e}', c.id FROM courses c WHERE c.code = {lit(cu)}
+ON CONFLICT (start_time, end_time, course_id) DO NOTHING;
+""".strip()
+    if table == "classes":
+        cu, sub, turma, day, start, end = key
+        return f"""
+INSERT INTO classes
+(subject_id, class, day_id, time_slot_id)
+SELECT s.id, {lit(turma)}, d.id, t.id
+FROM subjects s, days d, time_slots t, courses c
+WHERE c.code = {lit(cu)}
+  AND s.course_id = c.id
+  AND s.name = {lit(sub)}
+  AND d.name = {lit(day)}
+  AND t.course_id = c.id
+  AND t.start_time = '{start}'
+  AND t.end_time = '{end}'
+ON CONFLICT (subject_id, class, day_id, time_slot_id) DO NOTHING;
+""".strip()
+    if table == "users":
+        (username,), (password_hash, name, role, active, created_at) = key, content
+        return (
+            f"INSERT INTO users "
+            f"(username, password_hash, name, role, active, created_at) "
+            f"VALUES ({lit(username)}, {lit(password_hash)}, {lit(name)}, {lit(role)}, "
+            f"{lit(active)}, {lit(created_at)}) "
+            f"ON CONFLICT (username) DO UPDATE SET "
+            f"password_hash = EXCLUDED.password_hash, name = EXCLUDED.name, "
+            f"role = EXCLUDED.role, active = EXCLUDED.active;"
+        )
+    raise KeyError(table)
+
+
+def delete_sql(table, key):
+    if table == "courses":
+        (code,) = key
+        return f"DELETE FROM courses WHERE code = {lit(code)};"
+    if table == "subjects":
+        cu, name = key
+        return (
+            f"DELETE FROM subjects s USING courses c "
+            f"WHERE c.id = s.course_id AND c.code = {lit(cu)} AND s.name = {lit(name)};"
+        )
+    if table == "subject_requirements":
+        cu, name, kind, val = key
+        if kind == "SUBJECT":
+            match = f"r.type = 'SUBJECT' AND r.prerequisite_subject_id IN (SELECT id FROM subjects WHERE name = {lit(val)})"
+        else:
+            match = f"r.type = 'CREDITS' AND r.min_credits = {lit(val)}"
+        return f"""
+DELETE FROM subject_requirements r USING subjects s, courses c
+WHERE r.subject_id = s.id AND c.id = s.course_id
+  AND c.code = {lit(cu)} AND s.name = {lit(name)}
+  AND {match};
+""".strip()
+    if table == "days":
+        (name,) = key
+        return f"DELETE FROM days WHERE name = {lit(name)};"
+    if table == "time_slots":
+        cu, s, e = key
+        return (
+            f"DELETE FROM time_slots t USING courses c "
+            f"WHERE c.id = t.course_id AND c.code = {lit(cu)} "
+            f"AND t.start_time = '{s}' AND t.end_time = '{e}';"
+        )
+    if table == "classes":
+        cu, sub, turma, day, start, end = key
+        return f"""
+DELETE FROM classes cl USING subjects s, days d, time_slots t, courses c
+WHERE cl.subject_id = s.id AND cl.day_id = d.id AND cl.time_slot_id = t.id
+  AND c.code = {lit(cu)}
+  AND s.course_id = c.id AND s.name = {lit(sub)}
+  AND cl.class = {lit(turma)}
+  AND d.name = {lit(day)}
+  AND t.course_id = c.id AND t.start_time = '{start}' AND t.end_time = '{end}';
+""".strip()
+    raise KeyError(table)
+
+
+def iter_changes_sql(rows, changes, manifest_path):
+    """Statements do diff: remoções (filhos → pais) e depois upserts (pais → filhos)."""
+    yield from header_sql("MIGRAÇÃO INCREMENTAL GERADA AUTOMATICAMENTE")
+    yield f"-- MANIFESTO: {manifest_path}"
+    yield "BEGIN;"
+
+    for table in reversed(TABLES):
+        if table == "users":
+            continue
+        removed = changes[table][2]
+        if removed:
+            yield f"\n-- {table.upper()} (removidas: {len(removed)})"
+            for key in removed:
+                yield delete_sql(table, key)
+
+    for table in TABLES:
+        added, changed, _ = changes[table]
+        if added or changed:
+            yield f"\n-- {table.upper()} (novas: {len(added)}, alteradas: {len(changed)})"
+            for key in added + changed:
+                yield upsert_sql(table, key, rows[table][key])
+
+    yield "\nCOMMIT;"
+
+
+def plan_incremental(book, manifest_path=MANIFEST, schedule=None):
+    """
+    Compara o workbook com o manifesto.
+
+    Retorna (statements, novo_manifesto, resumo):
+    - statements: gerador com o SQL do diff
+    - resumo: {tabela: (adicionadas, alteradas, removidas)} em contagens
+    """
+    rows = catalog_rows(book, schedule)
+    hashes = manifest_from_rows(rows)
+    changes = diff(load_manifest(manifest_path), hashes)
+    summary = {table: tuple(len(keys) for keys in changes[table]) for table in TABLES}
+    return iter_changes_sql(rows, changes, manifest_path), hashes, summary
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importação paralela do Horarios.xlsx, curso a curso, direto no banco.
+
+O migration.py faz tudo em sequência: cursos, depois todas as disciplinas,
+todos os requisitos, horários e turmas. Aqui:
+
+1. parse: cada aba de curso é lida e tem os _ho interpretados num processo
+   do pool (ProcessPoolExecutor), todas ao mesmo tempo
+2. resolve: o processo principal junta as abas na ordem de --sheets e
+   resolve os IDs (migration_copy.resolve_tables — mesmas linhas do --load)
+3. load: as cargas rodam na ordem das dependências
+
+       courses/days → subjects → subject_requirements/time_slots → classes → users
+
+   e, dentro de cada etapa, um curso por conexão do pool (db_loader), em
+   paralelo. Uma etapa só começa quando a anterior terminou inteira.
+
+Cada (etapa, tabela, curso) é uma transação própria do db_loader. As
+tarefas já gravadas ficam registradas: se alguma falhar, as etapas seguintes
+não começam e as linhas gravadas nesta execução são apagadas pela chave
+primária (KEYS), em ordem inversa e numa única transação. O banco volta ao
+estado anterior à carga (com --truncate, ao catálogo vazio). users fica na
+última etapa porque o ON CONFLICT DO NOTHING não diz quais linhas entraram.
+Para uma carga tudo-ou-nada numa única transação, use migration.py --load.
+
+Sem --load, só faz o parse e a resolução e mostra as contagens.
+
+Uso:
+    python parallel_import.py --load sqlite:///horarios.db [--workers 4] [--connections 4]
+    python parallel_import.py --sheets curso000 curso001 --excel wb.xlsx --load postgresql://localhost/horarios
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import db_loader
+import instrumentation
+from migration import iter_parsed_schedule
+from migration_copy import CATALOG_TABLES, COLUMNS, SERIAL_TABLES, resolve_tables
+from schedule_parser import format_error
+from workbook import ENGINES, EXCEL, SUBJECT_SHEETS, Workbook
+
+ENGINE = "streaming"  # openpyxl read_only: cada processo lê só a sua aba
+
+# etapas de carga, na ordem das dependências (tabelas de uma etapa rodam juntas)
+LOAD_STAGES = [
+    ("courses", ["courses", "days"]),
+    ("subjects", ["subjects"]),
+    ("requirements", ["subject_requirements", "time_slots"]),
+    ("classes", ["classes"]),
+    ("users", ["users"]),
+]
+
+# tabelas sem curso: uma única tarefa
+GLOBAL_TABLES = {"courses", "days", "users"}
+
+# ON CONFLICT ... DO NOTHING (mesmo do migration_copy.load_catalog)
+ON_CONFLICT = {"users": ["username"]}
+
+# chave primária de cada tabela do catálogo (para desfazer tarefas já gravadas)
+KEYS = {
+    "courses": ["id"],
+    "days": ["id"],
+    "subjects": ["id"],
+    "subject_requirements": ["id"],
+    "time_slots": ["id"],
+    "classes": ["subject_id", "class", "day_id", "time_slot_id"],
+}
+
+
+# =====================================
+# PARSE (um processo por aba)
+# =====================================
+def parse_sheet(job):
+    """(excel, aba, engine) → dict com as linhas, os horários válidos e os erros de _ho da aba."""
+    path, sheet, engine = job
+    t0 = time.perf_counter()
+    with Workbook(path, subject_sheets=[sheet], engine=engine) as book:
+        rows = book.subject_rows(sheet)
+        schedule, errors, last = [], [], None
+        for r, parsed, i in iter_parsed_schedule(book):
+            if parsed is not last:
+                errors.extend(parsed.errors)
+                last = parsed
+            for day, start, end in parsed.decoded(i):
+                schedule.append((r.name, r.turma, day, start, end, r.course))
+    return {
+        "sheet": sheet,
+        "rows": rows,
+        "schedule": schedule,
+        "errors": errors,
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+class ParsedBook:
+    """O mínimo da interface do Workbook usado por resolve_tables, com as abas já lidas."""
+
+    def __init__(self, courses, sheets, users):
+        self._courses = courses
+        self._subjects = [r for s in sheets for r in s["rows"]]
+        self._users = users
+
+    def courses(self):
+        return self._courses
+
+    def subjects(self):
+        return self._subjects
+
+    def users(self):
+        return self._users
+
+
+async def parse_all(path, sheets, engine=ENGINE, workers=None):
+    """Todas as abas em paralelo; resultados na ordem de 'sheets'."""
+    jobs = [(path, sheet, engine) for sheet in sheets]
+    workers = workers if workers is not None else min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        return [parse_sheet(job) for job in jobs]
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(workers) as pool:
+        return await asyncio.gather(*(loop.run_in_executor(pool, parse_sheet, job) for job in jobs))
+
+
+# =====================================
+# PLANO DE CARGA
+# =====================================
+def plan_loads(tables):
+    """
+    [(etapa, [(tabela, course_id, linhas)])] na ordem de LOAD_STAGES.
+
+    As linhas de cada tabela são separadas por curso (course_id None nas
+    tabelas globais), preservando a ordem original dentro do curso.
+    """
+    subject_course = {row[0]: row[1] for row in tables["subjects"]}
+    course_of = {
+        "subjects": lambda row: row[1],
+        "subject_requirements": lambda row: subject_course[row[1]],
+        "time_slots": lambda row: row[3],
+        "classes": lambda row: subject_course[row[0]],
+    }
+    plan = []
+    for stage, names in LOAD_STAGES:
+        tasks = []
+        for table in names:
+            if table in GLOBAL_TABLES:
+                tasks.append((table, None, tables[table]))
+                continue
+            groups = defaultdict(list)
+            for row in tables[table]:
+                groups[course_of[table](row)].append(row)
+            tasks.extend((table, cid, rows) for cid, rows in groups.items())
+        plan.append((stage, tasks))
+    return plan
+
+
+# =====================================
+# CARGA
+# =====================================
+def load_task(pool, options, table, rows):
+    """Uma tabela de um curso numa transação própria (roda numa thread)."""
+    loader = db_loader.Loader(pool, **options)
+    with loader.transaction():
+        loader.insert(table, COLUMNS[table], rows, on_conflict=ON_CONFLICT.get(table))
+    return loader.stats[table]
+
+
+def _run_global(pool, options, action):
+    loader = db_loader.Loader(pool, **options)
+    with loader.transaction():
+        action(loader)
+
+
+def undo_tasks(loader, done):
+    """Apaga (pela chave primária, em ordem inversa) as linhas das tarefas já gravadas."""
+    for table, _, rows in reversed(done):
+        keys = KEYS[table]
+        index = [COLUMNS[table].index(k) for k in keys]
+        sql = f"DELETE FROM {table} WHERE " + " AND ".join(f"{k} = ?" for k in keys)
+        loader.execute_many(f"undo:{table}", sql, [tuple(row[i] for i in index) for row in rows])
+
+
+async def load_plan(plan, pool, options, truncate=False, out=sys.stdout):
+    """
+    Executa as etapas em ordem, com as tarefas de cada etapa em paralelo. Retorna o resumo por etapa.
+    Se uma tarefa falhar, desfaz as já gravadas (undo_tasks) e relança o erro.
+    """
+    if truncate:
+        await asyncio.to_thread(_run_global, pool, options, lambda loader: loader.truncate(CATALOG_TABLES))
+
+    summary = []
+    done = []  # (tabela, course_id, linhas) já gravadas
+    for stage, tasks in plan:
+        t0 = time.perf_counter()
+        with instrumentation.stage(f"load/{stage}"):
+            results = await asyncio.gather(
+                *(asyncio.to_thread(load_task, pool, options, table, rows) for table, _, rows in tasks),
+                return_exceptions=True,
+            )
+        seconds = time.perf_counter() - t0
+        failed = [(task, r) for task, r in zip(tasks, results) if isinstance(r, BaseException)]
+        done.extend(task for task, r in zip(tasks, results) if not isinstance(r, BaseException))
+        if failed:
+            for (table, cid, _), e in failed:
+                print(f"❌ {stage}: {table} (curso {cid}): {e}", file=sys.stderr)
+            catalog = [task for task in done if task[0] in KEYS]
+            if catalog:
+                try:
+                    with instrumentation.stage("load/undo"):
+                        await asyncio.to_thread(_run_global, pool, options,
+                                                lambda loader: undo_tasks(loader, catalog))
+                except Exception as e:
+                    print(f"⚠️ não foi possível desfazer as tarefas já gravadas ({e}); "
+                          f"o catálogo ficou pela metade", file=sys.stderr)
+                else:
+                    print(f"🗑️ {len(catalog)} tarefa(s) já gravadas foram desfeitas", file=sys.stderr)
+            raise failed[0][1]
+
+        rows = sum(r.rows for r in results)
+        retries = sum(r.retries for r in results)
+        summary.append({"stage": stage, "tasks": len(tasks), "rows": rows, "retries": retries, "seconds": seconds})
+        print(f"  {stage:<14} {len(tasks):>5} tarefas {rows:>9} linhas {seconds:>8.3f}s "
+              f"{rows / seconds if seconds > 0 else 0:>10.0f} linhas/s"
+              + (f"  ({retries} retries)" if retries else ""), file=out)
+
+    await asyncio.to_thread(_run_global, pool, options, lambda loader: loader.resync_sequences(SERIAL_TABLES))
+    return summary
+
+
+async def import_workbook(path, sheets, url=None, engine=ENGINE, workers=None, connections=db_loader.POOL_SIZE,
+                          options=None, truncate=False, out=sys.stdout):
+    """
+    Parse paralelo das abas + carga em etapas (ver o docstring do módulo).
+    Sem url, só faz o parse e a resolução. Retorna (tabelas, erros de _ho, resumo da carga).
+    """
+    with instrumentation.stage("parse"):
+        t0 = time.perf_counter()
+        parsed = await parse_all(path, sheets, engine, workers)
+        with Workbook(path, subject_sheets=sheets, engine=engine) as book:
+            courses, users = book.courses(), book.users()
+    print(f"  {'parse':<14} {len(parsed):>5} abas    {sum(len(s['rows']) for s in parsed):>9} linhas "
+          f"{time.perf_counter() - t0:>8.3f}s  (soma dos processos: {sum(s['seconds'] for s in parsed):.3f}s)",
+          file=out)
+
+    errors = [e for s in parsed for e in s["errors"]]
+    instrumentation.count("schedule_errors", len(errors))
+    with instrumentation.stage("resolve"):
+        tables = resolve_tables(ParsedBook(courses, parsed, users), [x for s in parsed for x in s["schedule"]])
+        plan = plan_loads(tables)
+    for table, rows in tables.items():
+        instrumentation.count(table, len(rows))
+
+    if url is None:
+        return tables, errors, None
+    with db_loader.ConnectionPool(url, size=connections) as pool:
+        summary = await load_plan(plan, pool, options or {}, truncate, out)
+    return tables, errors, summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importação paralela (por curso) do Horarios.xlsx no banco")
+    parser.add_argument("--excel", default=EXCEL)
+    parser.add_argument("--sheets", nargs="+", default=SUBJECT_SHEETS, metavar="ABA", help="abas de disciplinas")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE)
+    parser.add_argument("--workers", type=int, default=None, help="processos de parse (padrão: nº de CPUs)")
+    parser.add_argument("--connections", type=int, default=db_loader.POOL_SIZE,
+                        help="conexões simultâneas na carga (cursos carregados ao mesmo tempo)")
+    parser.add_argument("--truncate", action="store_true",
+                        help="apaga o catálogo antes de carregar (users é mantida; falha se outras tabelas, "
+                             "como completed_subjects, referenciarem o catálogo)")
+    db_loader.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    options = {"batch_size": args.batch_size, "retries": args.retries, "method": args.load_method}
+    with instrumentation.Run.from_args("parallel_import", args):
+        try:
+            tables, errors, summary = asyncio.run(import_workbook(
+                args.excel, args.sheets, args.load, args.engine, args.workers, args.connections,
+                options, args.truncate))
+        except (ImportError, OSError, ValueError, db_loader.LoadError) as e:
+            instrumentation.fail(e)
+            raise SystemExit(f"❌ {e}")
+
+    if errors:
+        print(f"⚠️ {len(errors)} horário(s) _ho inválido(s) ignorados:", file=sys.stderr)
+        for e in errors[:20]:
+            print(format_error(e), file=sys.stderr)
+        if len(errors) > 20:
+            print(f"  ... e mais {len(errors) - 20}", file=sys.stderr)
+
+    for table, rows in tables.items():
+        print(f"  {table}: {len(rows)} linhas")
+    if summary is None:
+        print("✅ Parse concluído (sem --load, nada foi gravado)")
+    else:
+        print("✅ Catálogo carregado no banco")
+
+
+if __name__ == "__main__":
+    main()
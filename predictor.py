@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Previsão de formatura em lote (port do Escolhe.predictCompletion).
+
+Para cada aluno, semestre a semestre:
+1. candidatas = disciplinas liberadas (Grafos.matriz: não cursada, _pr
+   cumpridos, créditos suficientes)
+2. tira as fixadas em semestres futuros e, se o limite de horas optativas já
+   foi atingido, as optativas
+3. reduz as candidatas a MAX_CANDIDATES (EscolheDeterministico.reduz)
+4. escolhe a melhor grade (ranking.iter_ranked, top-1) e marca como cursada
+
+Diferente do navegador, o catálogo é indexado uma única vez (por _re, _id e
+equivalências) e as alturas do grafo de pré-requisitos são calculadas uma vez
+só, já que dependem apenas do catálogo. Os alunos são distribuídos num pool
+de processos.
+
+Uso:
+    python predictor.py catalogo.json alunos.json --workers 4 -o previsoes.json
+
+alunos.json: [{"id": ..., "completed": ["MAT01", ...], "fixed": [["FIS02"], ...]}]
+(ou {"<id>": ["MAT01", ...]}).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from escolhe import Escolhe
+from prereq_graph import PrereqGraph, prereq_list, split_prereqs
+from ranking import iter_ranked
+
+MAX_SEMESTERS = 20    # trava de segurança, como no JS
+MAX_CANDIDATES = 20   # EscolheDeterministico.reduz
+
+def _number(v):
+    """Number(v) || 0 do JS; inteiros continuam int."""
+    try:
+        n = float(v or 0)
+    except (TypeError, ValueError):
+        return 0
+    if n != n:
+        return 0
+    return int(n) if n.is_integer() else n
+
+
+def subject_credits(s):
+    """Créditos de uma disciplina cursada (_ap + _at), como no Grafos com cr = -1."""
+    return _number(s.get("_ap")) + _number(s.get("_at"))
+
+
+def _is_optional_row(s):
+    return bool(s.get("_el") or s.get("_se") == 0 or s.get("_category") == "OPTIONAL")
+
+
+class Catalog:
+    """Catálogo indexado: tudo que o predictCompletion buscava com find()."""
+
+    def __init__(self, subjects, main_course_id=None, equivalencies=()):
+        self.subjects = list(subjects)
+        self.main_course_id = main_course_id
+        self.by_code = {}
+        self.by_id = {}
+        for s in self.subjects:
+            self.by_code.setdefault(s.get("_re"), s)
+            if s.get("_id") is not None:
+                self.by_id.setdefault(s["_id"], s)
+        # equivalencies.find(e => e.source_subject_id === id): a primeira vence
+        self.equivalence = {}
+        for e in equivalencies:
+            self.equivalence.setdefault(e.get("source_subject_id"), e)
+
+        self.graph = PrereqGraph.from_subjects(self.subjects)
+        self.heights = self.graph.weights()
+
+        # _pr de cada linha como bitset do grafo + mínimo de créditos
+        self.requires = []
+        for s in self.subjects:
+            codes, min_credits = split_prereqs(prereq_list(s))
+            min_credits = max(min_credits, _number(s.get("_pr_creditos_input")))
+            self.requires.append((self.graph.mask(codes), min_credits))
+
+    def resolve(self, item):
+        """Sigla (_re), _id ou dict → disciplina do catálogo (ou o próprio item)."""
+        if isinstance(item, dict):
+            return item
+        if isinstance(item, str):
+            return self.by_code.get(item, item)
+        return self.by_id.get(item, item)
+
+    def is_optional(self, s):
+        """isOptional do JS, com as buscas trocadas por dicionários."""
+        course = s.get("course_id")
+        if not course or (self.main_course_id and course == self.main_course_id):
+            return _is_optional_row(s)
+
+        equiv = self.equivalence.get(s.get("_id"))
+        if equiv:
+            target = self.by_id.get(equiv.get("target_subject_id"))
+            if target is not None:
+                return _is_optional_row(target)
+            if equiv.get("target_subject"):
+                semester = equiv["target_subject"].get("semester")
+                return semester == 0 or not semester
+        # de outro curso e sem equivalência: optativa
+        return True
+
+
+class Progress:
+    """Estado acumulado de um aluno (o currentCompleted do JS)."""
+
+    def __init__(self, catalog, completed):
+        self.catalog = catalog
+        self.codes = set()
+        self.done = 0     # bitset das siglas cursadas (índices do grafo)
+        self.ids = set()
+        self.credits = 0
+        self.optional_hours = 0
+        for item in completed:
+            self.add(catalog.resolve(item))
+
+    def add(self, s):
+        if isinstance(s, str):
+            # sigla fora do catálogo: conta como cursada, sem créditos
+            self._mark(s)
+            return
+        self._mark(s.get("_re") or "")
+        if s.get("_id") is not None:
+            self.ids.add(s["_id"])
+        self.credits += subject_credits(s)
+        if self.catalog.is_optional(s):
+            self.optional_hours += _number(s.get("_workload"))
+
+    def _mark(self, code):
+        self.codes.add(code)
+        self.done |= self.catalog.graph.mask((code,))
+
+    def eligible(self):
+        """Grafos.matriz(), com o teste de _pr como subconjunto de bitsets."""
+        out = []
+        done = self.done
+        for s, (required, min_credits) in zip(self.catalog.subjects, self.catalog.requires):
+            if s.get("_id") is not None and s["_id"] in self.ids:
+                continue
+            if s.get("_re") is not None and s["_re"] in self.codes:
+                continue
+            if self.credits < min_credits:
+                continue
+            if not (required & ~done):
+                out.append(s)
+        return out
+
+
+def reduce_candidates(candidates, weights, seed_indices, limit=MAX_CANDIDATES):
+    """
+    EscolheDeterministico.reduz: mantém obrigatórias e sementes e completa até
+    'limit' com as optativas mais críticas (peso desc., depois _se asc.).
+
+    Retorna (genesis, seed_indices) com as sementes remapeadas para as novas
+    posições (o JS reordenava o genesis sem ajustar os índices).
+    """
+    keep = [i for i, s in enumerate(candidates) if not s.get("_el") or i in seed_indices]
+    optionals = [i for i, s in enumerate(candidates) if s.get("_el") and i not in seed_indices]
+    room = max(0, limit - len(keep))
+    if len(optionals) > room:
+        optionals.sort(key=lambda i: (-weights.get(candidates[i].get("_re"), 0), _number(candidates[i].get("_se"))))
+        optionals = optionals[:room]
+    order = keep + optionals
+    position = {old: new for new, old in enumerate(order)}
+    return [candidates[i] for i in order], {position[i] for i in seed_indices}
+
+
+def predict(catalog, completed, fixed=(), optional_hours=float("inf")):
+    """
+    Previsão de um aluno.
+
+    Retorna {"semesters": n, "grids": [[_re...]...], "credits": [...]}, onde
+    credits[i] é o total de créditos no início do semestre previsto i.
+    """
+    if not catalog.subjects:
+        return {"semesters": 0, "grids": [], "credits": []}
+
+    fixed = [[catalog.resolve(x) for x in sem] for sem in fixed]
+    fixed_codes = [{x.get("_re") if isinstance(x, dict) else x for x in sem} for sem in fixed]
+    progress = Progress(catalog, completed)
+    grids, credits = [], []
+
+    while len(grids) < MAX_SEMESTERS:
+        semester = len(grids)
+        future = set().union(*fixed_codes[semester + 1:])
+        candidates = [
+            s for s in progress.eligible()
+            if s.get("_re") not in future and (not s.get("_el") or progress.optional_hours < optional_hours)
+        ]
+        if not candidates:
+            break
+
+        seeds = set()
+        codes = [s.get("_re") for s in candidates]
+        for code in (fixed_codes[semester] if semester < len(fixed_codes) else ()):
+            if code in codes:
+                seeds.add(codes.index(code))
+
+        genesis, seeds = reduce_candidates(candidates, catalog.heights, seeds)
+        escolhe = Escolhe(genesis, catalog.heights, catalog.main_course_id, seeds)
+        best = next(iter_ranked(escolhe, 1), None)
+        if best is None:
+            break
+
+        credits.append(progress.credits)
+        grid = [genesis[i] for i in best]
+        for s in grid:
+            progress.add(s)
+        grids.append([s.get("_re") for s in grid])
+
+    return {"semesters": len(grids), "grids": grids, "credits": credits}
+
+
+# =====================================
+# LOTE (pool de processos)
+# =====================================
+_catalog = None
+
+
+def _init_worker(subjects, main_course_id, equivalencies):
+    global _catalog
+    _catalog = Catalog(subjects, main_course_id, equivalencies)
+
+
+def _predict_student(job):
+    student, optional_hours = job
+    result = predict(_catalog, student.get("completed", []), student.get("fixed", ()), optional_hours)
+    result["id"] = student.get("id")
+    return result
+
+
+def normalize_students(data):
+    """Aceita lista de {"id", "completed", "fixed"} ou dict id → lista de cursadas."""
+    if isinstance(data, dict):
+        return [{"id": k, "completed": v} for k, v in data.items()]
+    return [s if isinstance(s, dict) else {"id": i, "completed": s} for i, s in enumerate(data)]
+
+
+def predict_batch(subjects, students, main_course_id=None, equivalencies=(), optional_hours=float("inf"),
+                  workers=None, chunksize=16):
+    """
+    Previsões de vários alunos, na ordem de entrada.
+
+    Retorna (resultados, estatísticas), com estatísticas = {"students",
+    "seconds", "students_per_sec", "workers"}.
+    """
+    students = normalize_students(students)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    jobs = [(s, optional_hours) for s in students]
+
+    start = time.perf_counter()
+    if workers <= 1:
+        _init_worker(subjects, main_course_id, list(equivalencies))
+        results = [_predict_student(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(subjects, main_course_id, list(equivalencies))) as pool:
+            results = list(pool.map(_predict_student, jobs, chunksize=chunksize))
+    seconds = time.perf_counter() - start
+
+    stats = {
+        "students": len(results),
+        "seconds": seconds,
+        "students_per_sec": len(results) / seconds if seconds > 0 else float("inf"),
+        "workers": max(1, workers),
+    }
+    return results, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Previsão de formatura em lote")
+    parser.add_argument("catalog", help="JSON com as disciplinas (formato do db.json)")
+    parser.add_argument("students", help="JSON com as disciplinas cursadas de cada aluno")
+    parser.add_argument("--equivalencies", help="JSON com as equivalências (source_subject_id/target_subject_id)")
+    parser.add_argument("--main-course-id", type=int)
+    parser.add_argument("--optional-hours", type=float, default=float("inf"),
+                        help="limite de horas optativas (limits.optionalHours)")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs; 1 = sem pool)")
+    parser.add_argument("--chunksize", type=int, default=16)
+    parser.add_argument("--output", "-o", default="-", help="arquivo de saída ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        subjects = json.load(f)
+    with open(args.students, "r", encoding="utf-8") as f:
+        students = json.load(f)
+    equivalencies = []
+    if args.equivalencies:
+        with open(args.equivalencies, "r", encoding="utf-8") as f:
+            equivalencies = json.load(f)
+
+    results, stats = predict_batch(subjects, students, args.main_course_id, equivalencies,
+                                   args.optional_hours, args.workers, args.chunksize)
+
+    if args.output == "-":
+        json.dump(results, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ {stats['students']} alunos em {stats['seconds']:.2f}s "
+          f"({stats['students_per_sec']:.1f} alunos/s, {stats['workers']} processo(s))", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Grafo de pré-requisitos compilado (DAG indexado por inteiros).
+
+Cada sigla vira um índice; os pré-requisitos diretos e o fecho transitivo de
+cada nó ficam em bitsets (int), de modo que "o aluno pode cursar X?" é um
+único teste de subconjunto:
+
+    graph.preds[i] & ~cursadas == 0
+
+Também calcula os níveis topológicos (0 = sem pré-requisitos), as alturas
+(criticidade, os mesmos pesos do Grafos.calculateHeights consumidos pelo
+compare() do Escolhe) e detecta ciclos.
+
+Fontes aceitas:
+- from_subjects: disciplinas do db.json (_re, _pr; _pr numérico = créditos)
+- from_requirements: pares (disciplina, _re da planilha), via migration.parse_requirements
+- from_csv: linhas code/prerequisites do CSV, via csv_to_sql_physics.parse_prerequisites
+
+Siglas citadas que não são disciplinas do catálogo viram nós externos: não
+têm altura nem pré-requisitos, mas podem estar entre as cursadas (ex.:
+disciplina de outro curso).
+"""
+
+import re
+
+NUMERIC = re.compile(r"\s*-?\d+(\.\d+)?\s*")
+
+
+def prereq_list(subject):
+    """_pr sempre como lista (aceita string solta ou ausente)."""
+    pr = subject.get("_pr")
+    if isinstance(pr, list):
+        return pr
+    return [pr] if pr else []
+
+
+def split_prereqs(prereqs):
+    """Lista do _pr → (siglas, mínimo de créditos). Valores numéricos são créditos."""
+    codes, min_credits = [], 0
+    for pr in prereqs:
+        text = str(pr)
+        if NUMERIC.fullmatch(text):
+            min_credits = max(min_credits, int(float(text)))
+        else:
+            codes.append(text)
+    return codes, min_credits
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class PrereqGraphError(ValueError):
+    """Ciclos ou siglas desconhecidas no grafo de pré-requisitos."""
+
+    def __init__(self, cycles=(), unknown=None):
+        self.cycles = list(cycles)
+        self.unknown = dict(unknown or {})
+        lines = [f"  ciclo: {' -> '.join(c + c[:1])}" for c in self.cycles]
+        lines += [f"  {code}: pré-requisito desconhecido {', '.join(refs)}" for code, refs in self.unknown.items()]
+        super().__init__("grafo de pré-requisitos inválido:\n" + "\n".join(lines))
+
+
+class PrereqGraph:
+    """
+    - codes[i]: sigla do nó i (disciplinas primeiro, depois externos)
+    - index: sigla → i
+    - preds[i]: bitset dos pré-requisitos diretos
+    - ancestors[i]: bitset de todos os pré-requisitos (fecho transitivo)
+    - min_credits[i]: créditos mínimos exigidos
+    - level[i]: nível topológico (0 = sem pré-requisitos)
+    - height[i]: maior cadeia de disciplinas que dependem de i
+    - order: nós em ordem topológica (sem os que estão em ciclos)
+    - cycles: ciclos encontrados, como listas de siglas
+    - unknown: disciplina → siglas citadas que não estão no catálogo
+    """
+
+    def __init__(self, nodes):
+        """nodes: iterável de (sigla, [siglas pré-requisito], créditos mínimos)."""
+        nodes = list(nodes)
+        self.codes = []
+        self.index = {}
+        for code, _, _ in nodes:
+            self._node(code)
+        self.subject_count = len(self.codes)
+
+        n0 = self.subject_count
+        self.preds = [0] * n0
+        self.min_credits = [0] * n0
+        self.unknown = {}
+        for code, prereqs, credits in nodes:
+            i = self.index[code]
+            for p in prereqs:
+                if p not in self.index:
+                    self.unknown.setdefault(code, []).append(p)
+                self.preds[i] |= 1 << self._node(p)
+            self.min_credits[i] = max(self.min_credits[i], credits or 0)
+
+        n = len(self.codes)
+        self.preds.extend([0] * (n - n0))
+        self.min_credits.extend([0] * (n - n0))
+        self.succs = [[] for _ in range(n)]
+        for i in range(n):
+            for p in _bits(self.preds[i]):
+                self.succs[p].append(i)
+
+        self._toposort()
+        self._closure()
+        self._heights()
+
+    def _node(self, code):
+        i = self.index.get(code)
+        if i is None:
+            i = self.index[code] = len(self.codes)
+            self.codes.append(code)
+        return i
+
+    # =====================================
+    # CONSTRUÇÃO A PARTIR DOS PARSERS
+    # =====================================
+    @classmethod
+    def from_subjects(cls, subjects):
+        """Disciplinas do db.json (mesmo critério do Grafos.matriz para o _pr)."""
+        nodes = []
+        for s in subjects:
+            if not s.get("_re"):
+                continue
+            codes, credits = split_prereqs(prereq_list(s))
+            credits = max(credits, int(float(s.get("_pr_creditos_input") or 0)))
+            nodes.append((s["_re"], codes, credits))
+        return cls(nodes)
+
+    @classmethod
+    def from_requirements(cls, rows):
+        """Pares (disciplina, texto do _re) da planilha, interpretados por migration.parse_requirements."""
+        from migration import parse_requirements
+
+        nodes = []
+        for name, text in rows:
+            codes, credits = [], 0
+            for kind, val in parse_requirements(text):
+                if kind == "CREDITS":
+                    credits = max(credits, val)
+                elif val:
+                    codes.append(val)
+            nodes.append((name, codes, credits))
+        return cls(nodes)
+
+    @classmethod
+    def from_csv(cls, rows):
+        """Linhas do CSV (dicts com code e prerequisites), via csv_to_sql_physics.parse_prerequisites."""
+        from csv_to_sql_physics import parse_prerequisites
+
+        nodes = []
+        for row in rows:
+            codes, credits = split_prereqs(parse_prerequisites(row.get("prerequisites") or ""))
+            nodes.append((row["code"].strip(), codes, credits))
+        return cls(nodes)
+
+    # =====================================
+    # ORDEM TOPOLÓGICA E CICLOS
+    # =====================================
+    def _toposort(self):
+        n = len(self.codes)
+        indegree = [bin(m).count("1") for m in self.preds]
+        self.level = [0] * n
+        ready = [i for i in range(n) if indegree[i] == 0]
+        order = []
+        while ready:
+            i = ready.pop()
+            order.append(i)
+            for s in self.succs[i]:
+                self.level[s] = max(self.level[s], self.level[i] + 1)
+                indegree[s] -= 1
+                if indegree[s] == 0:
+                    ready.append(s)
+        # Kahn em ordem estável: por nível, depois índice
+        self.order = sorted(order, key=lambda i: (self.level[i], i))
+
+        in_cycle = set(range(n)) - set(order)
+        self.cycles = self._find_cycles(in_cycle)
+
+    def _find_cycles(self, pending):
+        """Um ciclo representativo por componente, seguindo pré-requisitos dentro de 'pending'."""
+        cycles = []
+        pending = set(pending)
+        while pending:
+            start = min(pending)
+            path, seen = [], {}
+            node = start
+            while node not in seen:
+                seen[node] = len(path)
+                path.append(node)
+                # todo nó que sobrou do Kahn tem algum pré-requisito que também sobrou
+                node = next(p for p in _bits(self.preds[node]) if p in pending)
+            cycle = path[seen[node]:]
+            cycles.append([self.codes[i] for i in cycle])
+            # remove o ciclo e quem só ficou pendente por causa dele
+            pending -= self._descendants_in(set(cycle), pending)
+        return cycles
+
+    def _descendants_in(self, roots, pending):
+        out, stack = set(roots), list(roots)
+        while stack:
+            for s in self.succs[stack.pop()]:
+                if s in pending and s not in out:
+                    out.add(s)
+                    stack.append(s)
+        return out
+
+    def is_acyclic(self):
+        return not self.cycles
+
+    def raise_for_errors(self, unknown=True):
+        """Levanta PrereqGraphError se houver ciclos (ou, com unknown=True, siglas desconhecidas)."""
+        if self.cycles or (unknown and self.unknown):
+            raise PrereqGraphError(self.cycles, self.unknown if unknown else None)
+
+    # =====================================
+    # FECHO TRANSITIVO E ALTURAS
+    # =====================================
+    def _closure(self):
+        self.ancestors = list(self.preds)
+        for i in self.order:
+            mask = self.preds[i]
+            for p in _bits(self.preds[i]):
+                mask |= self.ancestors[p]
+            self.ancestors[i] = mask
+
+    def _heights(self):
+        """Grafos.calculateHeights: 0 para quem não libera nada, senão 1 + maior sucessor."""
+        n = len(self.codes)
+        self.height = [0] * n
+        done = [False] * n
+        for i in reversed(self.order):
+            succs = self.succs[i]
+            self.height[i] = 1 + max(self.height[s] for s in succs) if succs else 0
+            done[i] = True
+        # nós em ciclo: arestas para trás contam como folha (o JS estouraria a pilha)
+        for i in range(n):
+            if not done[i]:
+                self._height_dfs(i, done)
+
+    def _height_dfs(self, root, done):
+        on_path = {root}
+        stack = [(root, iter(self.succs[root]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if not done[child] and child not in on_path:
+                    on_path.add(child)
+                    stack.append((child, iter(self.succs[child])))
+                    break
+            else:
+                stack.pop()
+                on_path.discard(node)
+                succs = self.succs[node]
+                self.height[node] = 1 + max((self.height[s] if done[s] else 0) for s in succs) if succs else 0
+                done[node] = True
+
+    def weights(self):
+        """{sigla: altura} das disciplinas — os pesos usados pelo compare()."""
+        return {self.codes[i]: self.height[i] for i in range(self.subject_count)}
+
+    def levels(self):
+        """{sigla: nível topológico} das disciplinas."""
+        return {self.codes[i]: self.level[i] for i in range(self.subject_count)}
+
+    # =====================================
+    # ELEGIBILIDADE
+    # =====================================
+    def mask(self, codes):
+        """Bitset das siglas conhecidas em 'codes' (as demais são ignoradas)."""
+        mask = 0
+        for c in codes:
+            i = self.index.get(c)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def satisfied(self, i, done, credits=0):
+        """O nó i tem todos os pré-requisitos em 'done' (bitset) e créditos suficientes?"""
+        return not (self.preds[i] & ~done) and credits >= self.min_credits[i]
+
+    def eligible(self, done, credits=0):
+        """Bitset das disciplinas ainda não cursadas que podem ser cursadas agora."""
+        out = 0
+        for i in range(self.subject_count):
+            if not (done >> i & 1) and not (self.preds[i] & ~done) and credits >= self.min_credits[i]:
+                out |= 1 << i
+        return out
+
+    def eligible_codes(self, completed, credits=0):
+        return [self.codes[i] for i in _bits(self.eligible(self.mask(completed), credits))]
+
+    def requires(self, code):
+        """Todas as siglas que precisam ser cursadas antes de 'code' (fecho transitivo)."""
+        return [self.codes[i] for i in _bits(self.ancestors[self.index[code]])]
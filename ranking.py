@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Top-K das grades sem materializar todas as combinações.
+
+O Escolhe.exc() gera todas as combinações válidas e só depois ordena com o
+compare(). Aqui a busca é best-first (branch-and-bound) sobre a mesma árvore
+de enumeração do escolhe.py: cada subárvore entra num heap com um limite
+otimista da chave de ordenação, e uma grade só sai quando nenhuma subárvore
+pendente pode superá-la. As grades saem já em ordem de ranking, uma a uma.
+
+Com k definido, subárvores cujo limite não vence a k-ésima melhor grade já
+encontrada são descartadas sem expandir.
+
+Uso:
+    python ranking.py src/model/db_mat_transformed.json -k 10 --semester 3
+    python ranking.py db.json -k 5 --only MAT01 MAT02 FIS01 --seed MAT01 --json
+    python ranking.py db.json -k 5 --seed MAT01:B    (semente numa turma (_cl) específica)
+"""
+
+import argparse
+import copy
+import heapq
+import json
+import sys
+from itertools import count, islice, product
+
+from escolhe import Escolhe, _bits, calculate_heights
+
+COMPLETE, SUBTREE = 0, 1
+
+
+class _Bounds:
+    """Limites otimistas de cada componente da chave para um conjunto candidato."""
+
+    def __init__(self, escolhe):
+        self.n = escolhe.n
+        self.w = escolhe.w
+        # índices por peso decrescente (para max e soma dos m maiores)
+        self.by_weight = sorted(range(self.n), key=lambda i: -self.w[i])
+
+    def order(self, combo):
+        return sum(1 << (self.n - 1 - i) for i in combo)
+
+    def key(self, combo, wmax, wsum):
+        """Chave exata (igual a Escolhe.compare_key)."""
+        return (-max(0, wmax), -len(combo), -wsum, -self.order(combo))
+
+    def subtree(self, combo, wmax, wsum, order, cand, room):
+        """
+        Menor chave possível entre combo ∪ S, S ⊆ cand não vazio, |S| <= room.
+        Cada componente é limitado separadamente, o que dá um limite
+        lexicográfico válido.
+        """
+        w = self.w
+        best_w = wmax
+        top_sum = 0
+        taken = 0
+        for i in self.by_weight:
+            if taken == room:
+                break
+            if cand >> i & 1:
+                if taken == 0:
+                    best_w = max(best_w, w[i])
+                if w[i] <= 0:
+                    break
+                top_sum += w[i]
+                taken += 1
+
+        # ordem máxima: os 'room' menores índices de cand
+        top_order = 0
+        for taken, i in enumerate(_bits(cand)):
+            if taken == room:
+                break
+            top_order += 1 << (self.n - 1 - i)
+
+        size = len(combo) + min(bin(cand).count("1"), room)
+        return (-max(0, best_w), -size, -(wsum + top_sum), -(order + top_order))
+
+
+def iter_ranked(escolhe, k=None):
+    """
+    Gera as combinações (tuplas de índices) em ordem de ranking, a melhor
+    primeiro — a mesma ordem de escolhe.ranked(), mas sob demanda.
+    """
+    n, limit = escolhe.n, escolhe.max_subjects
+    compat, w = escolhe.compat, escolhe.w
+    if k is not None and k <= 0:
+        return
+
+    seeds = 0
+    for s in escolhe.seed_indices:
+        if not 0 <= s < n:
+            return
+        seeds |= 1 << s
+    for s in _bits(seeds):
+        if seeds & ~(1 << s) & ~compat[s]:
+            return
+    if bin(seeds).count("1") > limit:
+        return
+
+    bounds = _Bounds(escolhe)
+    tie = count()
+    heap = []
+    # k melhores chaves completas já vistas (max-heap via chave negada)
+    best = []
+
+    def threshold():
+        if k is None or len(best) < k:
+            return None
+        return tuple(-c for c in best[0])
+
+    def push_complete(combo, wmax, wsum):
+        key = bounds.key(combo, wmax, wsum)
+        limit_key = threshold()
+        if limit_key is not None and key > limit_key:
+            return
+        if k is not None:
+            neg = tuple(-c for c in key)
+            if len(best) < k:
+                heapq.heappush(best, neg)
+            else:
+                heapq.heapreplace(best, neg)
+        heapq.heappush(heap, (key, COMPLETE, next(tie), combo))
+
+    def push_subtree(combo, cmask, wmax, wsum, cand):
+        bound = bounds.subtree(combo, wmax, wsum, bounds.order(combo), cand, limit - len(combo))
+        limit_key = threshold()
+        if limit_key is not None and bound > limit_key:
+            return
+        heapq.heappush(heap, (bound, SUBTREE, next(tie), (combo, cmask, wmax, wsum, cand)))
+
+    push_subtree((), 0, 0, 0, (1 << n) - 1)
+
+    emitted = 0
+    while heap:
+        key, kind, _, payload = heapq.heappop(heap)
+        if kind == COMPLETE:
+            yield payload
+            emitted += 1
+            if emitted == k:
+                return
+            continue
+
+        limit_key = threshold()
+        if limit_key is not None and key > limit_key:
+            continue
+
+        combo, cmask, wmax, wsum, cand = payload
+        for j in _bits(cand):
+            new_mask = cmask | (1 << j)
+            next_cand = cand & compat[j] & ~((2 << j) - 1)
+            missing = seeds & ~new_mask
+            if missing & ~next_cand:
+                continue
+            if len(combo) + 1 + bin(missing).count("1") > limit:
+                continue
+            child = combo + (j,)
+            child_max, child_sum = max(wmax, w[j]), wsum + w[j]
+            if not missing:
+                push_complete(child, child_max, child_sum)
+            if next_cand and len(child) < limit:
+                push_subtree(child, new_mask, child_max, child_sum, next_cand)
+
+
+def iter_ranked_groups(escolhe, seed_groups, k=None):
+    """
+    Como iter_ranked, mas cada semente é um grupo de índices (as turmas de um
+    mesmo _re) e toda grade contém uma turma de cada grupo. Cada escolha de
+    turmas é uma busca separada; como duas turmas do mesmo _re nunca entram
+    juntas, as grades de escolhas diferentes não se repetem, e os resultados
+    são intercalados pela chave exata do ranking.
+    """
+    runs = []
+    for choice in product(*seed_groups):
+        run = copy.copy(escolhe)
+        run.seed_indices = set(choice)
+        runs.append(iter_ranked(run, k))
+    merged = heapq.merge(*runs, key=escolhe.compare_key)
+    return merged if k is None else islice(merged, k)
+
+
+def top_k(genesis, k, weights=None, main_course_id=None, seed_indices=(), max_subjects=None):
+    """As k melhores grades (listas de disciplinas), em ordem de ranking."""
+    options = {} if max_subjects is None else {"max_subjects": max_subjects}
+    escolhe = Escolhe(genesis, weights, main_course_id, seed_indices, **options)
+    return [[escolhe.genesis[i] for i in combo] for combo in iter_ranked(escolhe, k)]
+
+
+# =====================================
+# CLI
+# =====================================
+def load_subjects(path):
+    """Lista de disciplinas no formato gerado pelo convert_db_mat.py (ValueError/OSError se não der)."""
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: JSON inválido ({e})") from None
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: esperada uma lista de disciplinas")
+    return data
+
+
+def select_genesis(subjects, semester=None, only=None, exclude=None, include_electives=True):
+    """Disciplinas candidatas, na ordem do arquivo."""
+    only = set(only) if only else None
+    exclude = set(exclude or ())
+    genesis = []
+    for s in subjects:
+        if only is not None and s.get("_re") not in only:
+            continue
+        if s.get("_re") in exclude:
+            continue
+        if semester is not None and s.get("_se") != semester:
+            continue
+        if not include_electives and s.get("_el"):
+            continue
+        genesis.append(s)
+    return genesis
+
+
+def seed_groups(genesis, seeds):
+    """
+    Índices de cada semente: 'RE' casa todas as turmas do _re, 'RE:TURMA' só
+    a de _cl == TURMA. Retorna (grupos, sementes que não casaram).
+    """
+    groups, missing = [], []
+    for seed in seeds:
+        group = [i for i, s in enumerate(genesis) if s.get("_re") == seed]
+        if not group and ":" in seed:
+            code, turma = seed.rsplit(":", 1)
+            group = [i for i, s in enumerate(genesis) if s.get("_re") == code and s.get("_cl") == turma]
+        if group:
+            groups.append(group)
+        else:
+            missing.append(seed)
+    return groups, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Melhores grades (top-K) a partir do JSON do convert_db_mat.py")
+    parser.add_argument("input", help="JSON com a lista de disciplinas (_re, _pr, _ho...)")
+    parser.add_argument("-k", type=int, default=10, help="quantas grades (0 = todas)")
+    parser.add_argument("--semester", type=int, help="só disciplinas deste _se")
+    parser.add_argument("--only", nargs="+", metavar="RE", help="só estas disciplinas (_re)")
+    parser.add_argument("--exclude", nargs="+", metavar="RE", help="disciplinas já cursadas/ignoradas (_re)")
+    parser.add_argument("--no-electives", action="store_true", help="ignora optativas (_el)")
+    parser.add_argument("--seed", nargs="+", default=[], metavar="RE[:TURMA]",
+                        help="disciplinas obrigatórias em toda grade (em qualquer turma, ou só na TURMA)")
+    parser.add_argument("--max-subjects", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="uma grade por linha em JSON (lista de _re)")
+    args = parser.parse_args(argv)
+
+    try:
+        subjects = load_subjects(args.input)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"❌ {e}")
+    genesis = select_genesis(subjects, args.semester, args.only, args.exclude, not args.no_electives)
+    weights = calculate_heights(subjects)
+
+    groups, missing = seed_groups(genesis, args.seed)
+    if missing:
+        parser.error(f"sementes fora das candidatas: {', '.join(missing)}")
+
+    options = {} if args.max_subjects is None else {"max_subjects": args.max_subjects}
+    escolhe = Escolhe(genesis, weights, **options)
+    if not args.json:
+        print(f"📚 {len(genesis)} disciplinas candidatas", file=sys.stderr)
+
+    for rank, combo in enumerate(iter_ranked_groups(escolhe, groups, args.k or None), start=1):
+        grade = [genesis[i] for i in combo]
+        if args.json:
+            print(json.dumps([s.get("_re") for s in grade], ensure_ascii=False), flush=True)
+        else:
+            peso = max([0] + [weights.get(s.get("_re"), 0) for s in grade])
+            print(f"{rank:>3}. peso {peso} | " + ", ".join(f"{s.get('_re')} ({s.get('_di', '')})" for s in grade),
+                  flush=True)
+
+
+if __name__ == '__main__':
+    main()
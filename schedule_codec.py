@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Codec dos horários semanais de uma disciplina (_ho).
+
+Três formas equivalentes:
+- matriz: [[False, True, ...], ...]  (uma lista por dia, uma posição por horário)
+- pares:  [[dia, hora], ...]         (formato do db.json)
+- máscara: int, bit (dia * SLOTS_PER_DAY + hora)
+
+Com a máscara, saber se duas disciplinas colidem é um único AND. Quando os
+pares não são índices da grade (os [day_id, time_slot_id] do banco em
+_classSchedules), interned_masks numera os pares distintos em vez de usar
+dia * SLOTS_PER_DAY + hora. Para lotes há a forma NumPy: array bool
+(n, MAX_DAYS, SLOTS_PER_DAY) ou uint64 (n, WORDS).
+"""
+
+SLOTS_PER_DAY = 16
+MAX_DAYS = 7
+BITS = SLOTS_PER_DAY * MAX_DAYS
+WORDS = (BITS + 63) // 64
+
+
+def _bit(day, hour):
+    if not (0 <= day < MAX_DAYS and 0 <= hour < SLOTS_PER_DAY):
+        raise ValueError(f"horário fora da grade: [{day}, {hour}] (máx. {MAX_DAYS}x{SLOTS_PER_DAY})")
+    return day * SLOTS_PER_DAY + hour
+
+
+# =====================================
+# MATRIZ <-> PARES
+# =====================================
+def matrix_to_pairs(ho_matrix):
+    """
+    De: [[false, true, false...], [true, false...], ...]
+    Para: [[0, 1], [1, 0], ...]
+    """
+    pairs = []
+    if not isinstance(ho_matrix, list):
+        return pairs
+    for dia_idx, dia in enumerate(ho_matrix):
+        if not isinstance(dia, list):
+            continue
+        for hora_idx, val in enumerate(dia):
+            if val:
+                pairs.append([dia_idx, hora_idx])
+    return pairs
+
+
+def pairs_to_matrix(pairs, days, hours):
+    matrix = [[False] * hours for _ in range(days)]
+    for day, hour in pairs:
+        matrix[day][hour] = True
+    return matrix
+
+
+# =====================================
+# MÁSCARA
+# =====================================
+def pairs_to_mask(pairs):
+    mask = 0
+    for day, hour in pairs:
+        mask |= 1 << _bit(day, hour)
+    return mask
+
+
+def mask_to_pairs(mask):
+    pairs = []
+    while mask:
+        low = mask & -mask
+        day, hour = divmod(low.bit_length() - 1, SLOTS_PER_DAY)
+        pairs.append([day, hour])
+        mask ^= low
+    return pairs
+
+
+def matrix_to_mask(ho_matrix):
+    return pairs_to_mask(matrix_to_pairs(ho_matrix))
+
+
+def mask_to_matrix(mask, days, hours):
+    return pairs_to_matrix(mask_to_pairs(mask), days, hours)
+
+
+def _is_pair(v):
+    return isinstance(v, list) and len(v) == 2 and all(isinstance(x, int) and not isinstance(x, bool) for x in v)
+
+
+def to_mask(ho):
+    """Aceita máscara, pares ou matriz (detecta pelo formato)."""
+    if isinstance(ho, int):
+        return ho
+    if not ho:
+        return 0
+    if _is_pair(ho[0]):
+        return pairs_to_mask(ho)
+    return matrix_to_mask(ho)
+
+
+def to_pairs(ho):
+    """Como to_mask, mas devolve os pares [dia, hora]."""
+    if isinstance(ho, int):
+        return mask_to_pairs(ho)
+    if not ho:
+        return []
+    if _is_pair(ho[0]):
+        return ho
+    return matrix_to_pairs(ho)
+
+
+def interned_masks(hos):
+    """
+    Máscaras de uma lista de _ho com um bit por par [dia, hora] distinto,
+    numerados na ordem em que aparecem: duas máscaras colidem quando têm um
+    par igual, como na comparação do Escolhe.js. Não há limite de grade, então
+    vale também para [day_id, time_slot_id] do banco.
+    """
+    bits = {}
+    masks = []
+    for ho in hos:
+        mask = 0
+        for day, hour in to_pairs(ho):
+            mask |= 1 << bits.setdefault((day, hour), len(bits))
+        masks.append(mask)
+    return masks
+
+
+def collides(a, b):
+    return (a & b) != 0
+
+
+def slot_count(mask):
+    return bin(mask).count("1")
+
+
+# =====================================
+# LOTES (NumPy)
+# =====================================
+def pack_masks(masks):
+    """Lista de máscaras -> np.ndarray uint64 (n, WORDS)."""
+    import numpy as np
+
+    packed = np.zeros((len(masks), WORDS), dtype=np.uint64)
+    for w in range(WORDS):
+        shift = 64 * w
+        packed[:, w] = [(m >> shift) & 0xFFFFFFFFFFFFFFFF for m in masks]
+    return packed
+
+
+def unpack_masks(packed):
+    masks = []
+    for row in packed:
+        mask = 0
+        for w, word in enumerate(row):
+            mask |= int(word) << (64 * w)
+        masks.append(mask)
+    return masks
+
+
+def to_bool_array(packed):
+    """(n, WORDS) uint64 -> (n, MAX_DAYS, SLOTS_PER_DAY) bool."""
+    import numpy as np
+
+    bits = np.unpackbits(packed.astype("<u8").view(np.uint8), axis=1, bitorder="little")
+    return bits[:, :BITS].astype(bool).reshape(len(packed), MAX_DAYS, SLOTS_PER_DAY)
+
+
+def from_bool_array(grid):
+    """(n, MAX_DAYS, SLOTS_PER_DAY) bool -> (n, WORDS) uint64."""
+    import numpy as np
+
+    n = len(grid)
+    bits = np.zeros((n, WORDS * 64), dtype=np.uint8)
+    bits[:, :BITS] = np.asarray(grid, dtype=bool).reshape(n, BITS)
+    return np.packbits(bits, axis=1, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def collides_with(packed, i):
+    """Vetor bool: quais linhas colidem com a linha i."""
+    return (packed & packed[i]).any(axis=1)
+
+
+def collision_matrix(packed, block=128):
+    """Matriz n x n bool de colisões, calculada em blocos para limitar memória."""
+    import numpy as np
+
+    n = len(packed)
+    out = np.zeros((n, n), dtype=bool)
+    for lo in range(0, n, block):
+        hi = min(lo + block, n)
+        out[lo:hi] = (packed[lo:hi, None, :] & packed[None, :, :]).any(axis=2)
+    return out
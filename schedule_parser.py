@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Parser dos horários (_ho) no formato "Segunda(07:00-08:40) Quarta(07:00-08:40)".
+
+A coluna inteira é processada de uma vez (pandas .str.extractall), os dias e
+os intervalos de horário são internados em IDs pequenos (SlotTable) e o
+resultado fica em arrays compactos de inteiros (ParsedSchedule), no estilo
+CSR: offsets[i]:offsets[i + 1] são os horários da linha i.
+
+Entradas malformadas não são mais descartadas em silêncio: cada uma vira um
+ScheduleError com aba, linha e motivo.
+"""
+
+import re
+from array import array
+from collections import namedtuple
+
+import pandas as pd
+
+DAYS = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado"]
+
+ENTRY = re.compile(
+    r"(?P<day>[^(),;\s][^(),;]*?)\s*\(\s*(?P<start>\d{1,2}:\d{2})\s*-\s*(?P<end>\d{1,2}:\d{2})\s*\)"
+)
+SEPARATORS = " \t\r\n,;/"
+TIME = re.compile(r"^([01]\d|2[0-3]):[0-5]\d$")
+
+ScheduleError = namedtuple("ScheduleError", "sheet line value reason")
+
+
+class ScheduleParseError(ValueError):
+    """Um ou mais _ho não puderam ser interpretados."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        lines = [format_error(e) for e in self.errors[:20]]
+        if len(self.errors) > 20:
+            lines.append(f"... e mais {len(self.errors) - 20} erro(s)")
+        super().__init__(f"{len(self.errors)} horário(s) inválido(s):\n" + "\n".join(lines))
+
+
+def format_error(e):
+    where = f"{e.sheet}:{e.line}" if e.sheet else f"linha {e.line}"
+    return f"  {where}: {e.reason} em {e.value!r}"
+
+
+class SlotTable:
+    """Interna dias e intervalos (start, end) em IDs inteiros pequenos."""
+
+    def __init__(self, days=DAYS):
+        self.days = list(days)
+        self._day_ids = {d.casefold(): i for i, d in enumerate(self.days)}
+        self.slots = []
+        self._slot_ids = {}
+
+    def day_id(self, name):
+        """ID do dia (aceita maiúsculas/minúsculas) ou None se não existir."""
+        return self._day_ids.get(str(name).strip().casefold())
+
+    def slot_id(self, start, end):
+        key = (start, end)
+        sid = self._slot_ids.get(key)
+        if sid is None:
+            sid = self._slot_ids[key] = len(self.slots)
+            self.slots.append(key)
+        return sid
+
+
+class ParsedSchedule:
+    """
+    Horários de N linhas em arrays compactos.
+
+    - offsets: array('I') com N + 1 posições
+    - day_ids: array('B') — índice em table.days
+    - slot_ids: array('H') — índice em table.slots
+    """
+
+    def __init__(self, table, offsets, day_ids, slot_ids, errors):
+        self.table = table
+        self.offsets = offsets
+        self.day_ids = day_ids
+        self.slot_ids = slot_ids
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def entries(self, i):
+        """[(day_id, slot_id)] da linha i."""
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return list(zip(self.day_ids[lo:hi], self.slot_ids[lo:hi]))
+
+    def decoded(self, i):
+        """[(dia, start, end)] da linha i, com os nomes canônicos."""
+        days, slots = self.table.days, self.table.slots
+        return [(days[d], *slots[s]) for d, s in self.entries(i)]
+
+    def raise_for_errors(self):
+        if self.errors:
+            raise ScheduleParseError(self.errors)
+
+
+def _pad(times):
+    """'7:00' -> '07:00'"""
+    return times.str.zfill(5)
+
+
+def parse_schedules(rows, table=None):
+    """
+    Interpreta o _ho de todas as linhas (SubjectRow ou qualquer objeto com
+    .schedule, .sheet e .line) numa única passada vetorizada.
+    """
+    rows = list(rows)
+    table = table or SlotTable()
+    n = len(rows)
+    errors = []
+
+    col = pd.Series([r.schedule for r in rows], dtype="object")
+    text = col[col.notna()].astype(str)
+    text = text[text.str.strip() != ""]
+
+    def error(i, reason):
+        r = rows[i]
+        errors.append(ScheduleError(getattr(r, "sheet", None), getattr(r, "line", i), r.schedule, reason))
+
+    # Trechos que não casam com "Dia(HH:MM-HH:MM)"
+    leftover = text.str.replace(ENTRY, "", regex=True).str.strip(SEPARATORS)
+    for i, rest in leftover[leftover != ""].items():
+        if rest == text[i].strip(SEPARATORS):
+            error(i, "formato não reconhecido (esperado 'Dia(HH:MM-HH:MM) ...')")
+        else:
+            error(i, f"trecho não reconhecido {rest!r}")
+
+    found = text.str.extractall(ENTRY)
+    counts = pd.Series(0, index=range(n), dtype="int64")
+
+    if found.empty:
+        day_ids, slot_ids = array("B"), array("H")
+    else:
+        rows_idx = found.index.get_level_values(0)
+        start, end = _pad(found["start"]), _pad(found["end"])
+        day = found["day"].map(table.day_id)
+
+        bad_day = day.isna()
+        bad_time = ~(start.str.match(TIME) & end.str.match(TIME))
+        bad_order = ~bad_time & (start >= end)
+        valid = ~(bad_day | bad_time | bad_order)
+
+        for (i, _), d in found.loc[bad_day.to_numpy(), "day"].items():
+            error(i, f"dia desconhecido {d!r}")
+        for (i, _), s, e in zip(found.index[bad_time.to_numpy()], start[bad_time], end[bad_time]):
+            error(i, f"horário inválido {s}-{e}")
+        for (i, _), s, e in zip(found.index[bad_order.to_numpy()], start[bad_order], end[bad_order]):
+            error(i, f"início depois do fim {s}-{e}")
+
+        # Internamento: um slot_id por par (start, end) distinto
+        keys = (start + "-" + end)[valid]
+        ids = {k: table.slot_id(*k.split("-")) for k in keys.unique()}
+
+        day_ids = array("B", day[valid].astype("int64"))
+        slot_ids = array("H", keys.map(ids).astype("int64"))
+        counts = counts.add(pd.Series(rows_idx[valid.to_numpy()]).value_counts(), fill_value=0).astype("int64")
+
+    offsets = array("I", [0])
+    offsets.extend(counts.cumsum().astype("int64"))
+
+    errors.sort(key=lambda e: (e.sheet or "", e.line))
+    return ParsedSchedule(table, offsets, day_ids, slot_ids, errors)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Escrita em streaming dos scripts SQL gerados.
+
+Recebe um iterável de statements (os geradores iter_* do migration.py) e
+grava direto no arquivo — ou no stdout ("-"), para encadear com psql — em
+blocos de tamanho fixo, com compressão gzip opcional. O script nunca existe
+inteiro em memória.
+"""
+
+import gzip
+import io
+import sys
+
+BUFFER_SIZE = 1 << 16  # 64 KiB por write()
+
+
+def open_output(path, compress=None):
+    """
+    Abre o destino em modo texto (UTF-8).
+
+    compress=None decide pela extensão (.gz); "-" é o stdout.
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+
+    if path == "-":
+        if compress:
+            # fechar o GzipFile grava o trailer mas não fecha o stdout
+            return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb"), encoding="utf-8")
+        return sys.stdout
+
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def write_statements(statements, path, compress=None, buffer_size=BUFFER_SIZE):
+    """
+    Grava cada statement seguido de quebra de linha.
+
+    Retorna (statements, caracteres) escritos.
+    """
+    count = 0
+    chars = 0
+    pending = []
+    pending_size = 0
+
+    f = open_output(path, compress)
+    try:
+        for statement in statements:
+            pending.append(statement)
+            pending.append("\n")
+            pending_size += len(statement) + 1
+            count += 1
+            if pending_size >= buffer_size:
+                f.write("".join(pending))
+                chars += pending_size
+                pending.clear()
+                pending_size = 0
+        if pending:
+            f.write("".join(pending))
+            chars += pending_size
+    finally:
+        if f is sys.stdout:
+            f.flush()
+        else:
+            f.close()
+
+    return count, chars
@@ -8,6 +8,9 @@ Baseado na estrutura esperada:
 - Sistema prediz cursos para 2026.2, 2026.3, etc.
 """
 
+import sys
+
+
 def calculate_credits_until_semester(
     completed_credits,
     current_enrollments_credits,
@@ -108,3 +111,82 @@ print(f"  Calculado: {total_actual} créditos")
 print(f"  Match: {'✅ SIM' if total_actual == total_expected else '❌ NÃO'}")
 
 print("\n" + "=" * 60)
+
+# Teste 3: previsão (predictor.py) contra o cálculo acima
+print("\n" + "=" * 60)
+print("TESTE 3: Créditos acumulados da previsão (predictor.py)")
+print("=" * 60)
+
+from predictor import Catalog, predict, subject_credits
+
+catalogo = [
+    {"_re": "CAL1", "_se": 1, "_ap": 0, "_at": 6, "_pr": [], "_ho": [[0, 0], [2, 0]]},
+    {"_re": "GA", "_se": 1, "_ap": 0, "_at": 4, "_pr": [], "_ho": [[1, 0], [3, 0]]},
+    {"_re": "PROG", "_se": 1, "_ap": 2, "_at": 2, "_pr": [], "_ho": [[0, 0], [4, 1]]},
+    {"_re": "CAL2", "_se": 2, "_ap": 0, "_at": 6, "_pr": ["CAL1"], "_ho": [[0, 2], [2, 2]]},
+    {"_re": "ALG", "_se": 2, "_ap": 0, "_at": 4, "_pr": ["GA"], "_ho": [[1, 2], [3, 2]]},
+    {"_re": "EDA", "_se": 2, "_ap": 2, "_at": 2, "_pr": ["PROG"], "_ho": [[0, 2], [4, 3]]},
+    {"_re": "CAL3", "_se": 3, "_ap": 0, "_at": 6, "_pr": ["CAL2", "ALG"], "_ho": [[0, 4], [2, 4]]},
+    {"_re": "MET", "_se": 4, "_ap": 0, "_at": 2, "_pr": ["30"], "_ho": [[4, 5]]},
+    {"_re": "TCC", "_se": 5, "_ap": 0, "_at": 4, "_pr": ["CAL3", "MET"], "_ho": [[1, 6]]},
+    {"_re": "OPT1", "_se": 0, "_ap": 0, "_at": 4, "_el": True, "_pr": ["CAL1"], "_ho": [[3, 4]]},
+]
+cat = Catalog(catalogo)
+
+# Esperado calculado à mão (créditos = _ap + _at; CAL1/PROG chocam em [0, 0];
+# MET exige 30 créditos; fixadas saem dos semestres anteriores ao seu):
+# (cursadas, fixadas, grades por semestre, créditos de cada grade, créditos no início de cada semestre)
+cenarios = [
+    # CAL1 (altura maior) ganha de PROG no choque; MET só libera com 38 >= 30
+    ([], [],
+     [{"CAL1", "GA"}, {"PROG", "CAL2", "ALG", "OPT1"}, {"EDA", "CAL3"}, {"MET"}, {"TCC"}],
+     [10, 18, 10, 2, 4], [0, 10, 28, 38, 40]),
+    # com CAL1 cursada não há choque no 1º semestre; MET libera com 32
+    (["CAL1"], [],
+     [{"GA", "PROG", "CAL2", "OPT1"}, {"ALG", "EDA"}, {"CAL3", "MET"}, {"TCC"}],
+     [18, 8, 8, 4], [6, 24, 32, 40]),
+    # CAL1 fixada no semestre 1 não pode entrar no 0
+    ([], [["PROG"], ["CAL1"]],
+     [{"GA", "PROG"}, {"CAL1", "ALG", "EDA"}, {"CAL2", "OPT1"}, {"CAL3", "MET"}, {"TCC"}],
+     [8, 14, 10, 8, 4], [0, 8, 22, 32, 40]),
+    # semestre 1 só tem CAL1 liberada (CAL2/OPT1 dependem dela, MET de 30 créditos)
+    (["GA", "PROG"], [[], ["CAL1"]],
+     [{"ALG", "EDA"}, {"CAL1"}, {"CAL2", "OPT1"}, {"CAL3", "MET"}, {"TCC"}],
+     [8, 6, 10, 8, 4], [8, 16, 22, 32, 40]),
+]
+
+falhas = 0
+for cursadas, fixadas, grades_esperadas, por_semestre, creditos_esperados in cenarios:
+    previsao = predict(cat, cursadas, fixadas)
+    grades = [set(g) for g in previsao["grids"]]
+    print(f"\n  Cursadas {cursadas} | Fixadas {fixadas}")
+    print(f"  Grades: {previsao['grids']}")
+
+    ok = grades == grades_esperadas
+    falhas += not ok
+    print(f"    Grades esperadas: {'✅ SIM' if ok else f'❌ NÃO (esperado {[sorted(g) for g in grades_esperadas]})'}")
+
+    # créditos de cada grade prevista, contra a soma feita à mão
+    somas = [sum(subject_credits(cat.by_code[c]) for c in g) for g in previsao["grids"]]
+    ok = somas == por_semestre
+    falhas += not ok
+    print(f"    Créditos por semestre {somas}: {'✅' if ok else f'❌ (esperado {por_semestre})'}")
+
+    # acumulado da previsão, contra calculate_credits_until_semester sobre os valores à mão
+    concluidas = sum(subject_credits(cat.by_code[c]) for c in cursadas)
+    fixos = por_semestre[:len(fixadas)]
+    for t, esperado in enumerate(creditos_esperados):
+        calculado, _ = calculate_credits_until_semester(concluidas, 0, fixos, por_semestre, t)
+        previsto = previsao["credits"][t] if t < len(previsao["credits"]) else None
+        ok = previsto == esperado == calculado
+        falhas += not ok
+        print(f"    Semestre {t}: previsão {previsto} | à mão {esperado} | calculado {calculado:g} "
+              f"{'✅' if ok else '❌'}")
+    if len(previsao["credits"]) != len(creditos_esperados):
+        falhas += 1
+        print(f"    ❌ {len(previsao['credits'])} semestres previstos, esperado {len(creditos_esperados)}")
+
+print(f"\n  Resultado: {'✅ todos batem' if not falhas else f'❌ {falhas} divergência(s)'}")
+
+print("\n" + "=" * 60)
+sys.exit(1 if falhas else 0)
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Análise de conflitos e ocupação dos horários do catálogo (o schedule_map do
+migration.py: (disciplina, turma, dia, início, fim, curso) de cada _ho).
+
+Relata:
+- duplicatas: o mesmo horário repetido na mesma turma
+- choques: turmas de disciplinas obrigatórias (não _el) do mesmo curso e
+  período que se sobrepõem no mesmo dia — e turmas que se sobrepõem a si
+  mesmas. Disciplinas com outra turma sem choque continuam cursáveis, mas o
+  choque aparece aqui e some das grades do gerador
+- combinações: por curso e período, quantas escolhas de uma turma por
+  obrigatória não têm choque nenhum (0 = o período não cabe na grade)
+- ocupação: por curso, quantas células (dia, horário) têm aula e o pico de
+  turmas numa mesma célula
+
+Índice: (curso, período, dia) → intervalos em minutos ordenados pelo início
+(TimetableIndex). Os choques saem de uma varredura com heap dos intervalos
+ativos — O(n log n + sobreposições) — e as combinações são contadas por
+componente do grafo de choques (disciplinas sem choque só multiplicam o
+total), com limite de COMBINATION_LIMIT por componente.
+
+Uso:
+    python timetable_analyzer.py [--excel Horarios.xlsx] [--sheets engcomp fisica] [--json relatorio.json]
+    python timetable_analyzer.py --catalog catalog.arrow --strict
+    python migration.py --check-timetable ...   (aborta a migração se houver choques)
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import sys
+from collections import Counter, defaultdict, namedtuple
+
+import instrumentation
+from migration import iter_schedule
+from workbook import ENGINES, EXCEL, Workbook
+
+ENGINE = "pandas"
+
+# escolhas contadas por componente antes de desistir (o total vira um mínimo)
+COMBINATION_LIMIT = 100_000
+
+# uma entrada do schedule_map com o período e o _el da disciplina
+ClassSlot = namedtuple("ClassSlot", "course semester subject turma elective day start end")
+
+
+def minutes(hhmm):
+    """'07:50' -> 470"""
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def iter_class_slots(book):
+    """
+    ClassSlot de cada entrada do schedule_map, lido pelo mesmo
+    migration.iter_schedule que gera as aulas da migração: o que é analisado
+    é exatamente o que vai para a tabela classes (_ho que o parser recusa
+    ficam de fora aqui também).
+    """
+    return class_slots_from_schedule(iter_schedule(book), book.subjects())
+
+
+def class_slots_from_schedule(schedule_map, subjects):
+    """schedule_map do migration.collect_schedule + as linhas de disciplina (para período e _el)."""
+    info = {(r.course, r.name): (r.semester, r.elective) for r in subjects}
+    for subject, turma, day, start, end, course in schedule_map:
+        semester, elective = info.get((course, subject), (None, False))
+        yield ClassSlot(course, semester, subject, turma, elective, day, start, end)
+
+
+# =====================================
+# ÍNDICE
+# =====================================
+class TimetableIndex:
+    """
+    Horários agrupados por (curso, período, dia), ordenados pelo início.
+
+    groups[(curso, período, dia)] = [(início, fim, id)] em minutos; id indexa
+    classes (a chave (curso, disciplina, turma)). overlapping() responde
+    "quem está em aula entre a e b" com bisect: como nenhum intervalo do
+    grupo dura mais que longest[grupo], basta olhar os que começam depois de
+    a - longest.
+    """
+
+    def __init__(self, slots):
+        self.classes = []              # id -> (curso, disciplina, turma)
+        self.class_info = []           # id -> (período, _el)
+        self.groups = defaultdict(list)
+        self.longest = {}
+        self.duplicates = []           # (ClassSlot, repetições)
+        self.cells = Counter()         # (curso, dia, início, fim) -> turmas
+        self.course_slots = defaultdict(set)
+        self.course_days = defaultdict(set)
+        ids = {}
+
+        seen = Counter(slots)
+        for s, n in seen.items():
+            if n > 1:
+                self.duplicates.append((s, n))
+            key = (s.course, s.subject, s.turma)
+            cid = ids.get(key)
+            if cid is None:
+                cid = ids[key] = len(self.classes)
+                self.classes.append(key)
+                self.class_info.append((s.semester, bool(s.elective)))
+            a, b = minutes(s.start), minutes(s.end)
+            self.groups[(s.course, s.semester, s.day)].append((a, b, cid))
+            self.cells[(s.course, s.day, s.start, s.end)] += 1
+            self.course_slots[s.course].add((s.start, s.end))
+            self.course_days[s.course].add(s.day)
+
+        for key, intervals in self.groups.items():
+            intervals.sort()
+            self.longest[key] = max(b - a for a, b, _ in intervals)
+        self._starts = {key: [a for a, _, _ in v] for key, v in self.groups.items()}
+
+    def __len__(self):
+        return sum(len(v) for v in self.groups.values())
+
+    def overlapping(self, course, semester, day, start, end):
+        """ids das turmas com aula em [start, end) (minutos) naquele curso, período e dia."""
+        key = (course, semester, day)
+        intervals = self.groups.get(key)
+        if not intervals:
+            return []
+        starts = self._starts[key]
+        lo = bisect.bisect_left(starts, start - self.longest[key])
+        hi = bisect.bisect_left(starts, end)
+        return [cid for a, b, cid in intervals[lo:hi] if b > start and a < end]
+
+    def mandatory(self, cid):
+        return not self.class_info[cid][1]
+
+    def iter_overlaps(self):
+        """(curso, período, dia, (a, b, id), (a, b, id)) de cada par sobreposto — varredura com heap."""
+        for (course, semester, day), intervals in self.groups.items():
+            active = []  # heap (fim, início, id)
+            for a, b, cid in intervals:
+                while active and active[0][0] <= a:
+                    heapq.heappop(active)
+                for b2, a2, other in active:
+                    yield course, semester, day, (a2, b2, other), (a, b, cid)
+                heapq.heappush(active, (b, a, cid))
+
+
+# =====================================
+# ANÁLISE
+# =====================================
+def _hhmm(m):
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+
+def find_clashes(index):
+    """
+    Choques entre turmas obrigatórias (ver o docstring do módulo).
+
+    Retorna (choques, conflitos): choques para o relatório e conflitos =
+    {id: set(ids)} entre turmas de disciplinas diferentes, para a contagem de
+    combinações. Turmas da mesma disciplina não se excluem (são alternativas).
+    """
+    clashes = []
+    conflicts = defaultdict(set)
+    for course, semester, day, x, y in index.iter_overlaps():
+        (a1, b1, c1), (a2, b2, c2) = x, y
+        if not (index.mandatory(c1) and index.mandatory(c2)):
+            continue
+        _, s1, t1 = index.classes[c1]
+        _, s2, t2 = index.classes[c2]
+        if s1 == s2 and t1 != t2:
+            continue
+        if c1 != c2:
+            conflicts[c1].add(c2)
+            conflicts[c2].add(c1)
+        clashes.append({
+            "course": course,
+            "semester": semester,
+            "day": day,
+            "a": {"subject": s1, "class": t1, "start": _hhmm(a1), "end": _hhmm(b1)},
+            "b": {"subject": s2, "class": t2, "start": _hhmm(a2), "end": _hhmm(b2)},
+        })
+    return clashes, conflicts
+
+
+def _count_component(options, conflicts, limit):
+    """Escolhas de uma turma por disciplina sem conflito (backtracking, até 'limit')."""
+    options = sorted(options, key=len)
+    total = 0
+    chosen = []
+
+    def visit(k):
+        nonlocal total
+        if total >= limit:
+            return
+        if k == len(options):
+            total += 1
+            return
+        for cid in options[k]:
+            if not any(c in conflicts.get(cid, ()) for c in chosen):
+                chosen.append(cid)
+                visit(k + 1)
+                chosen.pop()
+
+    visit(0)
+    return min(total, limit), total >= limit
+
+
+def count_combinations(index, conflicts, limit=COMBINATION_LIMIT):
+    """
+    [{curso, período, obrigatórias, turmas, combinações, limitado}] por curso
+    e período. Só entram obrigatórias com horário; disciplinas ligadas por
+    choques formam um componente, contado por backtracking; as demais só
+    multiplicam o total pelo número de turmas.
+    """
+    by_subject = defaultdict(list)   # (curso, período, disciplina) -> ids
+    for cid, (course, subject, _) in enumerate(index.classes):
+        semester, elective = index.class_info[cid]
+        if not elective:
+            by_subject[(course, semester, subject)].append(cid)
+
+    periods = defaultdict(list)      # (curso, período) -> [ids por disciplina]
+    for (course, semester, _), cids in by_subject.items():
+        periods[(course, semester)].append(cids)
+
+    # conflitos só ligam turmas do mesmo curso e período (ver find_clashes):
+    # separados uma vez por período, cada um é visitado uma vez no total
+    period_conflicts = defaultdict(list)
+    for cid in conflicts:
+        course, _, _ = index.classes[cid]
+        period_conflicts[(course, index.class_info[cid][0])].append(cid)
+
+    result = []
+    for (course, semester), options in periods.items():
+        owner = {cid: k for k, cids in enumerate(options) for cid in cids}
+        parent = list(range(len(options)))
+
+        def find(k):
+            while parent[k] != k:
+                parent[k] = parent[parent[k]]
+                k = parent[k]
+            return k
+
+        for cid in period_conflicts.get((course, semester), ()):
+            if cid in owner:
+                for other in conflicts[cid]:
+                    if other in owner:
+                        parent[find(owner[cid])] = find(owner[other])
+
+        components = defaultdict(list)
+        for k in range(len(options)):
+            components[find(k)].append(options[k])
+
+        total, capped = 1, False
+        for comp in components.values():
+            if len(comp) == 1:
+                total *= len(comp[0])
+                continue
+            n, hit = _count_component(comp, conflicts, limit)
+            total *= n
+            capped = capped or hit
+        result.append({
+            "course": course,
+            "semester": semester,
+            "subjects": len(options),
+            "classes": sum(len(c) for c in options),
+            "combinations": total,
+            "capped": capped and total > 0,
+        })
+    result.sort(key=lambda r: (r["course"], r["semester"] is None, r["semester"] or 0))
+    return result
+
+
+def slot_utilization(index):
+    """
+    [{curso, horários, dias, células, ocupadas, ocupação, pico}] — células =
+    dias x horários (início, fim) que aparecem nos _ho do curso.
+    """
+    per_course = defaultdict(list)
+    for (course, day, start, end), n in index.cells.items():
+        per_course[course].append((n, day, start, end))
+    result = []
+    for course in sorted(per_course):
+        cells = per_course[course]
+        total = len(index.course_slots[course]) * len(index.course_days[course])
+        n, day, start, end = max(cells, key=lambda c: c[0])
+        result.append({
+            "course": course,
+            "slots": len(index.course_slots[course]),
+            "days": len(index.course_days[course]),
+            "cells": total,
+            "used": len(cells),
+            "ratio": round(len(cells) / total, 4) if total else 0.0,
+            "peak": {"day": day, "start": start, "end": end, "classes": n},
+        })
+    return result
+
+
+def analyze(slots, limit=COMBINATION_LIMIT):
+    """ClassSlots → relatório (dict serializável em JSON)."""
+    with instrumentation.stage("index"):
+        index = TimetableIndex(slots)
+    with instrumentation.stage("clashes"):
+        clashes, conflicts = find_clashes(index)
+    with instrumentation.stage("combinations"):
+        semesters = count_combinations(index, conflicts, limit)
+    utilization = slot_utilization(index)
+    instrumentation.count("class_slots", len(index))
+    instrumentation.count("clashes", len(clashes))
+    return {
+        "class_slots": len(index),
+        "classes": len(index.classes),
+        "duplicates": [{**s._asdict(), "count": n} for s, n in index.duplicates],
+        "clashes": clashes,
+        "semesters": semesters,
+        "utilization": utilization,
+    }
+
+
+def analyze_book(book, limit=COMBINATION_LIMIT, schedule=None):
+    """schedule: o schedule_map já lido pelo migration.py (scan_schedule), para não reler os _ho."""
+    if schedule is None:
+        return analyze(iter_class_slots(book), limit)
+    return analyze(class_slots_from_schedule(schedule, book.subjects()), limit)
+
+
+def has_problems(report):
+    return bool(report["clashes"] or report["duplicates"])
+
+
+def _more(items, limit, out):
+    if len(items) > limit:
+        print(f"  ... e mais {len(items) - limit}", file=out)
+
+
+def print_report(report, out=sys.stdout, limit=20):
+    """Resumo legível; as listas longas são cortadas em 'limit' itens."""
+    print(f"{report['class_slots']} horários em {report['classes']} turmas", file=out)
+
+    if report["duplicates"]:
+        print(f"⚠️ {len(report['duplicates'])} horário(s) repetido(s) na mesma turma:", file=out)
+        for d in report["duplicates"][:limit]:
+            print(f"  {d['course']}: {d['subject']} ({d['turma']}) {d['day']} {d['start']}-{d['end']} "
+                  f"x{d['count']}", file=out)
+        _more(report["duplicates"], limit, out)
+
+    if report["clashes"]:
+        print(f"❌ {len(report['clashes'])} choque(s) entre obrigatórias:", file=out)
+        for c in report["clashes"][:limit]:
+            a, b = c["a"], c["b"]
+            print(f"  {c['course']} {c['semester']}º {c['day']}: "
+                  f"{a['subject']} ({a['class']}) {a['start']}-{a['end']} x "
+                  f"{b['subject']} ({b['class']}) {b['start']}-{b['end']}", file=out)
+        _more(report["clashes"], limit, out)
+
+    blocked = [s for s in report["semesters"] if s["combinations"] == 0]
+    if blocked:
+        print(f"❌ {len(blocked)} período(s) sem nenhuma combinação de obrigatórias:", file=out)
+        for s in blocked[:limit]:
+            print(f"  {s['course']} {s['semester']}º: {s['subjects']} disciplinas, {s['classes']} turmas", file=out)
+        _more(blocked, limit, out)
+
+    print(f"\n{'curso':<14} {'ocupação':>9} {'células':>9}  pico", file=out)
+    for u in report["utilization"]:
+        p = u["peak"]
+        print(f"{u['course']:<14} {u['ratio']:>8.1%} {u['used']:>4}/{u['cells']:<4}  "
+              f"{p['classes']} turmas em {p['day']} {p['start']}-{p['end']}", file=out)
+
+    if not has_problems(report) and not blocked:
+        print("✅ Nenhum choque entre obrigatórias", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Choques e ocupação dos horários do catálogo")
+    parser.add_argument("--excel", default=EXCEL)
+    parser.add_argument("--catalog", metavar="ARQUIVO",
+                        help="lê do catálogo colunar (.arrow/.parquet) em vez do --excel")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE)
+    parser.add_argument("--sheets", nargs="+", metavar="ABA",
+                        help="abas de disciplinas (padrão: engcomp, matematica, fisica)")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava o relatório completo em JSON")
+    parser.add_argument("--limit", type=int, default=COMBINATION_LIMIT,
+                        help="combinações contadas por componente antes de desistir")
+    parser.add_argument("--strict", action="store_true", help="sai com erro se houver choques ou repetições")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with instrumentation.Run.from_args("timetable_analyzer", args):
+        if args.catalog:
+            from catalog_columnar import CatalogBook
+            reader = CatalogBook(args.catalog)
+        else:
+            reader = Workbook(args.excel, subject_sheets=args.sheets, engine=args.engine)
+        with reader as book:
+            report = analyze_book(book, args.limit)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo: {args.json}")
+    if args.strict and has_problems(report):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Camada de leitura do Horarios.xlsx compartilhada pelos scripts de migração.
+
+Cada aba é lida UMA única vez e convertida em linhas tipadas (CourseRow,
+SubjectRow, UserRow), que ficam em cache e são reaproveitadas por todas as
+seções (SUBJECTS, REQUIREMENTS, TIME SLOTS...).
+
+Engines:
+- "pandas": pd.ExcelFile + parse() por aba (padrão)
+- "streaming": openpyxl em modo read_only, lendo linha a linha
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+EXCEL = "Horarios.xlsx"
+SUBJECT_SHEETS = ["engcomp", "matematica", "fisica"]
+ENGINES = ("pandas", "streaming")
+
+# chave extra nos registros brutos com o número da linha na planilha
+LINE = "__line__"
+
+
+@dataclass(frozen=True)
+class CourseRow:
+    code: str
+    name: str
+    grid: Optional[str] = None    # _da
+    hours: Optional[str] = None   # _hd
+
+
+@dataclass(frozen=True)
+class SubjectRow:
+    sheet: str
+    course: str                   # _cu
+    semester: Optional[int]       # _se
+    name: str                     # _di
+    requirements: Optional[str]   # _re
+    has_practical: bool           # _ap
+    has_theory: bool              # _at
+    elective: bool                # _el
+    schedule: Optional[str]       # _ho
+    turma: str = "A"              # _cl
+    line: int = 0                 # linha na planilha (cabeçalho = 1)
+
+
+@dataclass(frozen=True)
+class UserRow:
+    username: str
+    password_hash: str
+    name: str
+    role: str
+    active: bool
+    created_at: Optional[str]
+
+
+def _is_missing(v):
+    if v is None:
+        return True
+    # NaN / pd.NaT são diferentes de si mesmos; pd.NA nem pode ser comparado
+    try:
+        return bool(v != v)
+    except TypeError:
+        return True
+
+
+def _text(v):
+    """Célula → str (ou None). Floats inteiros (1.0) viram '1'."""
+    if _is_missing(v):
+        return None
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v).strip() if isinstance(v, str) else str(v)
+
+
+def _int(v):
+    if _is_missing(v):
+        return None
+    return int(float(v))
+
+
+def _bool(v):
+    if _is_missing(v):
+        return False
+    if isinstance(v, str):
+        return v.strip().lower() in ("1", "true", "t", "sim", "s", "x")
+    return bool(v)
+
+
+def _timestamp(v):
+    if _is_missing(v):
+        return None
+    if isinstance(v, datetime):
+        return v.strftime("%Y-%m-%d %H:%M:%S")
+    return str(v)
+
+
+class Workbook:
+    """
+    Workbook com cache por aba.
+
+    Uso:
+        with Workbook("Horarios.xlsx") as book:
+            for s in book.subjects():
+                ...
+    """
+
+    def __init__(self, path=EXCEL, subject_sheets=None, engine="pandas"):
+        if engine not in ENGINES:
+            raise ValueError(f"engine inválida: {engine!r} (use {', '.join(ENGINES)})")
+        self.path = path
+        self.engine = engine
+        self.subject_sheets = list(subject_sheets or SUBJECT_SHEETS)
+        self._records = {}
+        self._typed = {}
+        self._handle = None
+
+    # -------------------------------------
+    # Leitura bruta (uma vez por aba)
+    # -------------------------------------
+    def _open(self):
+        if self._handle is None:
+            if self.engine == "pandas":
+                import pandas as pd
+                self._handle = pd.ExcelFile(self.path)
+            else:
+                from openpyxl import load_workbook
+                self._handle = load_workbook(self.path, read_only=True, data_only=True)
+        return self._handle
+
+    def _read_pandas(self, name):
+        # dtype=object e só "" como vazio: o pandas devolve o valor da célula
+        # como o openpyxl (streaming), sem converter texto numérico ('000...'
+        # → 0) nem tratar 'NA'/'null' como ausente
+        df = self._open().parse(name, dtype=object, keep_default_na=False, na_values=[""])
+        if df.empty:
+            return []
+        df = df.dropna(how="all")
+        records = df.to_dict("records")
+        for line, record in zip(df.index, records):
+            record[LINE] = int(line) + 2
+        return records
+
+    def _read_streaming(self, name):
+        rows = self._open()[name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return []
+        columns = [str(h) if h is not None else None for h in header]
+        records = []
+        for line, values in enumerate(rows, start=2):
+            if all(v is None or v == "" for v in values):
+                continue
+            record = {c: v for c, v in zip(columns, values) if c is not None}
+            record[LINE] = line
+            records.append(record)
+        return records
+
+    def sheet(self, name):
+        """Linhas da aba como lista de dicts (lida só na primeira chamada)."""
+        if name not in self._records:
+            if self.engine == "pandas":
+                self._records[name] = self._read_pandas(name)
+            else:
+                self._records[name] = self._read_streaming(name)
+        return self._records[name]
+
+    # -------------------------------------
+    # Linhas tipadas
+    # -------------------------------------
+    def courses(self):
+        if "cursos" not in self._typed:
+            self._typed["cursos"] = [
+                CourseRow(
+                    code=_text(r.get("_cu")),
+                    name=_text(r.get("name")),
+                    grid=_text(r.get("_da")),
+                    hours=_text(r.get("_hd")),
+                )
+                for r in self.sheet("cursos")
+            ]
+        return self._typed["cursos"]
+
+    def subject_rows(self, sheet):
+        if sheet not in self._typed:
+            self._typed[sheet] = [
+                SubjectRow(
+                    sheet=sheet,
+                    course=_text(r.get("_cu")),
+                    semester=_int(r.get("_se")),
+                    name=_text(r.get("_di")),
+                    requirements=_text(r.get("_re")),
+                    has_practical=_bool(r.get("_ap")),
+                    has_theory=_bool(r.get("_at")),
+                    elective=_bool(r.get("_el")),
+                    schedule=_text(r.get("_ho")),
+                    turma=_text(r.get("_cl")) or "A",
+                    line=r[LINE],
+                )
+                for r in self.sheet(sheet)
+            ]
+        return self._typed[sheet]
+
+    def subjects(self):
+        """Disciplinas de todas as abas de curso, na ordem de subject_sheets."""
+        rows = []
+        for sheet in self.subject_sheets:
+            rows.extend(self.subject_rows(sheet))
+        return rows
+
+    def users(self):
+        if "users" not in self._typed:
+            self._typed["users"] = [
+                UserRow(
+                    username=_text(r.get("username")),
+                    password_hash=_text(r.get("passwordHash")),
+                    name=_text(r.get("name")),
+                    role=_text(r.get("role")),
+                    active=_bool(r.get("active")),
+                    created_at=_timestamp(r.get("createdAt")),
+                )
+                for r in self.sheet("users")
+            ]
+        return self._typed["users"]
+
+    # -------------------------------------
+    # Ciclo de vida
+    # -------------------------------------
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()